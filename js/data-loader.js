@@ -1,3 +1,191 @@
+// ==================== 数据清单（data/manifest.json，由采集脚本生成）====================
+// 清单列出所有日/月归档分区和最近几天的小时分片；分片和分区文件按内容哈希缓存，只有清单本身每次刷新
+let siteManifest = null;
+const loadedShards = new Set();
+
+async function loadManifest() {
+    try {
+        const response = await fetch(`/data/manifest.json?t=${Date.now()}`);
+        siteManifest = response.ok ? await response.json() : null;
+    } catch (e) {
+        console.log('⚠️ 读取 manifest.json 失败，按天加载:', e.message);
+        siteManifest = null;
+    }
+    return siteManifest;
+}
+
+// 北京时间（UTC+8）的小时键，与清单里的 'YYYY-MM-DD HH' 对应（与浏览器所在时区无关）
+const BEIJING_OFFSET_MS = 8 * 60 * 60 * 1000;
+
+function formatHourKey(date) {
+    const pad = n => String(n).padStart(2, '0');
+    const beijing = new Date(date.getTime() + BEIJING_OFFSET_MS);
+    return `${beijing.getUTCFullYear()}-${pad(beijing.getUTCMonth() + 1)}-${pad(beijing.getUTCDate())} ` +
+        pad(beijing.getUTCHours());
+}
+
+function parseJsonLines(text) {
+    // 每行一条新闻；同一标题可能出现多次，由 mergeNews 保留时间最新的
+    const data = [];
+    text.split('\n').forEach(line => {
+        if (!line.trim()) return;
+        try {
+            data.push(JSON.parse(line));
+        } catch (e) {
+            // 跳过正在写入的不完整行
+        }
+    });
+    return data;
+}
+
+// 按清单里的格式读取一个文件（json / jsonl / gzip），URL 带内容哈希，内容不变时直接走浏览器缓存
+async function fetchManifestFile(path, format, hash) {
+    const response = await fetch(`/data/${path}?h=${hash}`);
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    if (format === 'gzip') {
+        const stream = response.body.pipeThrough(new DecompressionStream('gzip'));
+        return await new Response(stream).json();
+    }
+    if (format === 'jsonl') {
+        return parseJsonLines(await response.text());
+    }
+    return await response.json();
+}
+
+// ==================== 按小时分片加载最近 hours 小时 ====================
+// 没有清单、或清单的分片覆盖不到这么长时间时返回 false，由调用方退回按天加载
+async function loadRecentShards(hours) {
+    if (!siteManifest || !siteManifest.shards || hours > (siteManifest.shard_days || 0) * 24) {
+        return false;
+    }
+
+    const now = new Date();
+    const wanted = new Set();
+    for (let i = 0; i <= hours; i++) {
+        wanted.add(formatHourKey(new Date(now.getTime() - i * 60 * 60 * 1000)));
+    }
+    const shards = siteManifest.shards.filter(shard => wanted.has(shard.hour) && !loadedShards.has(shard.hash));
+    console.log(`🧩 加载最近 ${hours} 小时的分片: ${shards.length} 个`);
+
+    const results = await Promise.all(shards.map(async shard => {
+        try {
+            const response = await fetch(`/data/${shard.path}`);
+            if (!response.ok) return null;
+            const data = await response.json();
+            loadedShards.add(shard.hash);
+            return data;
+        } catch (e) {
+            console.log(`⚠️ 分片 ${shard.hour} 加载失败:`, e.message);
+            return null;
+        }
+    }));
+
+    results.forEach(data => {
+        if (data && data.length > 0) {
+            allNews = mergeNews([...allNews, ...mergeNews(data)]);
+        }
+    });
+    allNews = sortByTime(allNews);
+    return true;
+}
+
+// ==================== 热窗口（data/feeds/hot-24h.json，最近 24 小时，每次采集增量更新）====================
+// 一个文件就覆盖 12h / 24h 两个时间范围（由 filterByTimeRange 过滤），读不到时返回 false，由调用方退回分片 / 按天加载
+const loadedHotWindows = new Set();
+
+async function loadHotWindow(name) {
+    if (loadedHotWindows.has(name)) return true;
+    try {
+        const response = await fetch(`/data/feeds/hot-${name}.json?t=${Date.now()}`);
+        if (!response.ok) return false;
+        const data = await response.json();
+        console.log(`🔥 热窗口 ${name}: ${data.length} 条`);
+        allNews = sortByTime(mergeNews([...allNews, ...data]));
+        loadedHotWindows.add(name);
+        return true;
+    } catch (e) {
+        console.log(`⚠️ 热窗口 ${name} 加载失败:`, e.message);
+        return false;
+    }
+}
+
+// ==================== 按清单加载全部分区（全库搜索）====================
+async function loadManifestPartitions() {
+    const canGunzip = typeof DecompressionStream !== 'undefined';
+    const partitions = siteManifest.partitions.filter(partition => !loadedDates.has(partition.name));
+    console.log(`🔄 按清单加载 ${partitions.length} 个分区...`);
+    showSearchLoading(`正在加载历史数据 (${partitions.length} 个分区)...`);
+
+    const results = await Promise.all(partitions.map(async partition => {
+        let { path, format } = partition;
+        if (format === 'gzip' && !canGunzip) {
+            // 浏览器不支持解压：日归档改读未压缩的 .json，月归档只有压缩版，跳过
+            if (partition.kind !== 'day') return null;
+            path = path.replace(/\.gz$/, '');
+            format = 'json';
+        }
+        try {
+            const data = await fetchManifestFile(path, format, partition.hash);
+            loadedDates.add(partition.name);
+            return data;
+        } catch (e) {
+            console.log(`⚠️ 加载 ${partition.name} 失败:`, e.message);
+            return null;
+        }
+    }));
+
+    let loadedCount = 0;
+    results.forEach(data => {
+        if (data && data.length > 0) {
+            allNews = mergeNews([...allNews, ...mergeNews(data)]);
+            loadedCount++;
+        }
+    });
+    allNews = sortByTime(allNews);
+    console.log(`✅ 全库搜索完成，新增 ${loadedCount} 个分区的数据`);
+}
+
+// ==================== 读取预压缩的日归档（已收盘的日期才有 .json.gz）====================
+async function fetchCompressedArchiveDay(dateStr) {
+    if (typeof DecompressionStream === 'undefined') return null;
+    try {
+        const response = await fetch(`/data/archive/${dateStr}.json.gz?t=${Date.now()}`);
+        if (!response.ok) return null;
+        const stream = response.body.pipeThrough(new DecompressionStream('gzip'));
+        const data = await new Response(stream).json();
+        return { ok: true, status: response.status, data: data };
+    } catch (e) {
+        // 解压失败时退回未压缩的文件
+        return null;
+    }
+}
+
+// ==================== 读取单日归档（当天未收盘时是段目录 archive/YYYY-MM-DD/NNNN-哈希.jsonl，段列表在清单里）====================
+async function fetchArchiveDay(dateStr) {
+    const compressed = await fetchCompressedArchiveDay(dateStr);
+    if (compressed) return compressed;
+
+    const response = await fetch(`/data/archive/${dateStr}.json?t=${Date.now()}`);
+    if (response.status !== 404) {
+        return { ok: response.ok, status: response.status, data: response.ok ? await response.json() : null };
+    }
+
+    // 没有日归档 JSON：按清单读当天的各个段
+    if (!siteManifest) await loadManifest();
+    const segments = (siteManifest?.partitions || []).filter(partition => partition.name === dateStr);
+    if (segments.length === 0) {
+        return { ok: false, status: 404, data: null };
+    }
+    try {
+        const results = await Promise.all(segments.map(segment =>
+            fetchManifestFile(segment.path, segment.format, segment.hash)));
+        return { ok: true, status: 200, data: results.flat() };
+    } catch (e) {
+        console.log(`⚠️ 读取 ${dateStr} 的段失败:`, e.message);
+        return { ok: false, status: 500, data: null };
+    }
+}
+
 // ==================== 加载单日数据（带详细日志）====================
 async function loadDateData(dateStr) {
     if (loadedDates.has(dateStr)) {
@@ -5,11 +193,10 @@ async function loadDateData(dateStr) {
         return null;
     }
 
-    const url = `/data/archive/${dateStr}.json?t=${Date.now()}`;
-    console.log(`🔍 尝试加载: ${url}`);
+    console.log(`🔍 尝试加载: ${dateStr}`);
 
     try {
-        const response = await fetch(url);
+        const response = await fetchArchiveDay(dateStr);
 
         if (!response.ok) {
             if (response.status === 404) {
@@ -20,7 +207,7 @@ async function loadDateData(dateStr) {
             return null;
         }
 
-        const data = await response.json();
+        const data = response.data;
         console.log(`✅ 加载成功: ${dateStr}.json, 共 ${data.length} 条新闻`);
         loadedDates.add(dateStr);
         return data;
@@ -32,6 +219,14 @@ async function loadDateData(dateStr) {
 
 // ==================== 加载所有未加载的历史数据（动态版）====================
 async function loadAllRemainingArchiveData() {
+    // 首屏走了热窗口时还没读过清单
+    if (!siteManifest) await loadManifest();
+    if (siteManifest && siteManifest.partitions) {
+        await loadManifestPartitions();
+        return;
+    }
+
+    // 没有清单（旧数据）：逐天试探最近 90 天
     const today = new Date();
     const maxDaysToTry = 90;
     let loadedCount = 0;
@@ -54,7 +249,7 @@ async function loadAllRemainingArchiveData() {
 
         try {
             showSearchLoading(`正在加载历史数据 (${dateStr})...`);
-            const response = await fetch(`/data/archive/${dateStr}.json?t=${Date.now()}`);
+            const response = await fetchArchiveDay(dateStr);
 
             if (response.status === 404) {
                 // 404 静默跳过，不显示警告
@@ -66,7 +261,7 @@ async function loadAllRemainingArchiveData() {
                 continue;
             }
 
-            const data = await response.json();
+            const data = response.data;
             if (data && data.length > 0) {
                 console.log(`  ✅ 加载 ${dateStr} 成功: ${data.length} 条`);
                 loadedDates.add(dateStr);
@@ -96,6 +291,21 @@ async function loadInitialData() {
         lastUpdateTime = updateTime;
         document.getElementById('update-time').textContent = updateTime.trim().slice(5, 16) || '--:--';
 
+        // 首屏只拉一个 24 小时热窗口文件，切到 24h 时不用再加载
+        if (await loadHotWindow('24h')) {
+            applyFilters();
+            console.log(`✅ 初始化完成: 总计 ${allNews.length} 条新闻`);
+            return;
+        }
+
+        // 有清单时只拉最近 12 小时的分片
+        await loadManifest();
+        if (await loadRecentShards(12)) {
+            applyFilters();
+            console.log(`✅ 初始化完成: 总计 ${allNews.length} 条新闻`);
+            return;
+        }
+
         const now = new Date();
         const startTime = new Date(now);
         startTime.setHours(startTime.getHours() - 12);
@@ -164,6 +374,16 @@ async function loadHistoricalData(range) {
     loadBtn.classList.add('disabled');
 
     try {
+        if (range === '24h' && await loadHotWindow('24h')) {
+            applyFilters();
+            return;
+        }
+        if (!siteManifest) await loadManifest();
+        if (await loadRecentShards(range === '24h' ? 24 : 72)) {
+            applyFilters();
+            return;
+        }
+
         const now = new Date();
         const days = range === '24h' ? 1 : 2;
         const datesToLoad = [];
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+"""
+东方财富快讯历史回补
+把一段时间切成多个独立的 sortEnd 窗口，用有界线程池并发采集，
+全局限速，按窗口记录检查点（中断后可续跑），结果写入对应的 archive/YYYY-MM-DD.json
+请求与定时采集走同一个 RequestPolicy（退避重试 + 重试预算），归档与定时采集走同一个存储后端：
+json 时当天写段、已收盘的日期并入日归档；NEWS_STORAGE_BACKEND=sqlite 时写入新闻库再导出日归档。
+命令行的时间按北京时间解释（与 showTime 相同），与运行机器的时区无关。
+
+运行方式：
+python backfill.py --start "2026-08-20 00:00" --end "2026-08-20 12:00"
+python backfill.py --start "2026-08-20 00:00" --end "2026-08-21 00:00" --window-minutes 60 --workers 6 --rate 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 添加 src 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from collectors.eastmoney_collector import EastMoneyCollector
+from collectors.run_github_action import merge_news_by_title, open_sqlite_store, safe_save_json, storage_backend
+from network.rate_limiter import RateLimiter
+from network.request_policy import RequestPolicy
+from storage import json_codec
+from storage.compression import write_gzip_sibling
+from storage.daily_log import DailyLog
+from storage.news_time import beijing_today, from_timestamp, to_timestamp
+from tags.tag_manager import TagManager
+
+DEFAULT_WINDOW_MINUTES = 30
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 4.0  # 全局每秒请求数
+MAX_PAGES_PER_WINDOW = 50
+
+TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+def parse_time(value: str) -> datetime:
+    """解析命令行时间参数"""
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"无法解析时间: {value}")
+
+
+def to_sort(dt: datetime) -> int:
+    """北京时间 -> 东方财富 realSort（微秒时间戳）"""
+    return int(to_timestamp(dt) * 1000000)
+
+
+class BackfillCheckpoint:
+    """回补检查点：记录每个任务已完成的窗口，写入后原子替换"""
+
+    def __init__(self, path: Path, job_key: str):
+        self.path = path
+        self.job_key = job_key
+        self.jobs = self._load()
+        self.done: Dict[str, int] = self.jobs.setdefault(job_key, {})
+
+    def _load(self) -> Dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json_codec.load_file(self.path)
+        except Exception as e:
+            print(f"⚠️ 检查点读取失败，从头开始: {e}")
+            return {}
+
+    def is_done(self, window_start: int) -> bool:
+        return str(window_start) in self.done
+
+    def mark_done(self, window_start: int, count: int):
+        self.done[str(window_start)] = count
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        json_codec.dump_file(temp_path, self.jobs)
+        os.replace(temp_path, self.path)
+
+
+class EastMoneyBackfill:
+    """东方财富窗口化并发回补"""
+
+    def __init__(self, start: datetime, end: datetime,
+                 window_minutes: int = DEFAULT_WINDOW_MINUTES,
+                 workers: int = DEFAULT_WORKERS,
+                 rate: float = DEFAULT_RATE,
+                 data_dir: Optional[Path] = None,
+                 collector: Optional[EastMoneyCollector] = None,
+                 tag_manager: Optional[TagManager] = None):
+        if end <= start:
+            raise ValueError("结束时间必须晚于开始时间")
+
+        project_root = Path(__file__).resolve().parent.parent.parent
+        self.data_dir = Path(data_dir) if data_dir else project_root / "data"
+        self.archive_dir = self.data_dir / "archive"
+
+        self.start = start
+        self.end = end
+        self.window = timedelta(minutes=window_minutes)
+        self.workers = workers
+        self.limiter = RateLimiter(rate, burst=workers)
+        # 回补不赶时间：不对冲（对冲请求会挤占限速），失败按策略退避重试，重试预算耗尽时窗口记为失败、下次续跑
+        self.collector = collector or EastMoneyCollector(policy=RequestPolicy(hedge=False))
+        self.policy = self.collector.policy
+        self.tag_manager = tag_manager or TagManager()
+        self.backend = storage_backend()
+        self.store = None
+
+        job_key = f"eastmoney:{start:%Y%m%d%H%M%S}-{end:%Y%m%d%H%M%S}:{window_minutes}"
+        self.checkpoint = BackfillCheckpoint(self.data_dir / "backfill_checkpoint.json", job_key)
+        self.stats = {'windows': 0, 'skipped': 0, 'failed': 0, 'requests': 0, 'items': 0}
+
+    def split_windows(self) -> List[Tuple[int, int]]:
+        """把 [start, end) 切成 (window_start_sort, window_end_sort) 列表"""
+        windows = []
+        current = self.start
+        while current < self.end:
+            window_end = min(current + self.window, self.end)
+            windows.append((to_sort(current), to_sort(window_end)))
+            current = window_end
+        return windows
+
+    def fetch_window(self, window_start: int, window_end: int) -> Tuple[List[Dict], int]:
+        """
+        从 window_end 往前翻页，直到越过 window_start
+        返回 (窗口内的新闻, 请求次数)；请求策略重试后仍失败时抛出异常
+        """
+        news = []
+        requests_made = [0]
+        sort_end = window_end
+
+        def fetch(timeout: float, sort_end: int) -> List[Dict]:
+            # 每次尝试（包括重试）都经过全局限速
+            self.limiter.acquire()
+            requests_made[0] += 1
+            return self.collector._fetch_page(sort_end, timeout)
+
+        for _ in range(MAX_PAGES_PER_WINDOW):
+            page = self.policy.call(lambda timeout, sort_end=sort_end: fetch(timeout, sort_end),
+                                    key=self.collector.source_name)
+            if not page:
+                break
+
+            page_min_sort = sort_end
+            crossed = False
+            for item in page:
+                item_sort = self.collector._to_sort(item.get('realSort', 0))
+                if item_sort and item_sort < page_min_sort:
+                    page_min_sort = item_sort
+                if item_sort < window_start:
+                    crossed = True
+                    continue
+                if item_sort >= window_end:
+                    continue
+                news_item = self.collector._parse_single_news(item)
+                if news_item:
+                    news.append(news_item)
+
+            if crossed or page_min_sort >= sort_end:
+                break
+            sort_end = page_min_sort
+
+        return news, requests_made[0]
+
+    def write_partitions(self, news: List[Dict]) -> Dict[str, int]:
+        """按 showTime 的日期写入对应的日归档（与已有内容按标题合并），sqlite 后端时写入新闻库再导出"""
+        by_day: Dict[str, List[Dict]] = {}
+        for item in news:
+            day = (item.get('showTime') or item.get('time') or '')[:10]
+            if day:
+                by_day.setdefault(day, []).append(item)
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        if self.store is not None:
+            return self._write_store(by_day)
+
+        today = beijing_today()
+        written = {}
+        for day, items in sorted(by_day.items()):
+            daily_log = DailyLog(self.archive_dir, day)
+            if day >= today:
+                # 当天还没收盘：和定时采集一样写成一个新段
+                written[day] = daily_log.append(items)
+                print(f"  ✅ 回补归档 {daily_log.segment_dir.name}/: 追加 {written[day]} 条")
+                continue
+            # 已收盘但段还没整理的先整理，再与 JSON 合并
+            daily_log.compact()
+            archive_path = self.archive_dir / f"{day}.json"
+            existing = []
+            if archive_path.exists():
+                try:
+                    existing = json_codec.load_file(archive_path)
+                except Exception as e:
+                    print(f"  ⚠️ 归档 {day}.json 读取失败: {e}")
+                    continue
+            merged = merge_news_by_title(existing, items)
+            if safe_save_json(archive_path, merged, f"回补归档 {day}.json"):
+                write_gzip_sibling(archive_path)
+                written[day] = len(items)
+        return written
+
+    def _write_store(self, by_day: Dict[str, List[Dict]]) -> Dict[str, int]:
+        """sqlite 后端：和定时采集一样按归档日写入新闻库，再由库导出日归档（库同步时已并入的段删掉）"""
+        written = {}
+        for day, items in sorted(by_day.items()):
+            written[day] = self.store.upsert_many(items, day)
+            daily_log = DailyLog(self.archive_dir, day)
+            exported = self.store.export_day(day, daily_log.json_path)
+            if daily_log.is_open:
+                daily_log.remove()
+            print(f"  ✅ 新闻库 {self.store.path.name}: 回补 {day} 写入 {written[day]} 条，导出 {exported} 条")
+        return written
+
+    def run(self) -> Dict:
+        """执行回补，返回统计信息"""
+        windows = self.split_windows()
+        pending = [w for w in windows if not self.checkpoint.is_done(w[0])]
+        self.stats['windows'] = len(windows)
+        self.stats['skipped'] = len(windows) - len(pending)
+
+        print(f"🔄 回补 {self.start} → {self.end}: 共 {len(windows)} 个窗口，"
+              f"已完成 {self.stats['skipped']}，待采集 {len(pending)}")
+
+        start_time = time.monotonic()
+        if self.backend == 'sqlite':
+            self.store = open_sqlite_store(self.data_dir, self.archive_dir, DailyLog(self.archive_dir, beijing_today()))
+        try:
+            self._run_windows(pending)
+        finally:
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+
+        self.stats['elapsed'] = round(time.monotonic() - start_time, 2)
+        # 请求数含失败窗口里的请求和重试
+        self.stats['requests'] = self.policy.stats['requests']
+        self.stats['retries'] = self.policy.stats['retries']
+        return self.stats
+
+    def _run_windows(self, pending: List[Tuple[int, int]]):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='backfill') as executor:
+            futures = {executor.submit(self.fetch_window, ws, we): (ws, we) for ws, we in pending}
+            # 采集在工作线程并发进行，打标签、写归档、记检查点都在主线程串行完成
+            for future in as_completed(futures):
+                window_start, window_end = futures[future]
+                label = from_timestamp(window_start / 1000000).strftime('%Y-%m-%d %H:%M')
+                try:
+                    news, requests_made = future.result()
+                except Exception as e:
+                    self.stats['failed'] += 1
+                    print(f"  ❌ 窗口 {label} 失败，下次续跑: {e}")
+                    continue
+
+                if news:
+                    tagged = self.tag_manager.add_to_news_list(news)
+                    self.write_partitions(tagged)
+                self.stats['items'] += len(news)
+                # 写完归档再记检查点：中断时最多重采一个窗口，重复条目在合并时按标题去重
+                self.checkpoint.mark_done(window_start, len(news))
+                print(f"  ✅ 窗口 {label}: {len(news)} 条，{requests_made} 次请求")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='东方财富快讯历史回补')
+    parser.add_argument('--start', type=parse_time, required=True, help='开始时间（北京时间），如 "2026-08-20 00:00"')
+    parser.add_argument('--end', type=parse_time, required=True, help='结束时间（不含）')
+    parser.add_argument('--window-minutes', type=int, default=DEFAULT_WINDOW_MINUTES, help='每个窗口的分钟数')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='并发线程数')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='全局每秒最大请求数')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🚀 东方财富快讯历史回补")
+    print("=" * 60)
+
+    backfill = EastMoneyBackfill(args.start, args.end, window_minutes=args.window_minutes,
+                                 workers=args.workers, rate=args.rate)
+    stats = backfill.run()
+
+    print("\n" + "=" * 60)
+    print(f"📊 回补完成: 窗口 {stats['windows']} 个（跳过 {stats['skipped']}，失败 {stats['failed']}）")
+    print(f"  新闻 {stats['items']} 条，请求 {stats['requests']} 次（重试 {stats['retries']}），耗时 {stats['elapsed']}s")
+    print("=" * 60)
+
+    sys.exit(1 if stats['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
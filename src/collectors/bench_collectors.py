@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+"""
+采集器/推送器离线基准测试
+默认启动本地替身服务器（network.stub_server），不联网测：
+- 东方财富、财联社首次采集（空游标，翻满页）和稳态采集（有游标，只有少量新条目）的吞吐
+- 每次请求的延迟分布（p50/p95）
+- 钉钉推送的吞吐
+可以注入延迟、抖动和错误；也可以用 --replay 回放录制的 fixture 代替替身服务器
+
+运行方式：
+  python bench_collectors.py [--rounds 3] [--latency 0.02] [--error-rate 0.05]
+  python bench_collectors.py --record fixtures.json [--live]   # 录制（默认录替身服务器，--live 录真实接口）
+  python bench_collectors.py --replay fixtures.json            # 回放
+"""
+
+import argparse
+import contextlib
+import io
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import sys
+
+# 添加 src 目录到 Python 路径
+current_file = Path(__file__).resolve()
+src_dir = current_file.parent.parent
+sys.path.insert(0, str(src_dir))
+
+from collectors.cailianshe_collector import CaiLianSheCollector
+from collectors.cursor_store import CursorStore
+from collectors.eastmoney_collector import EastMoneyCollector
+from network.http_transport import HttpTransport, set_transport
+from network.replay import RecordingTransport, ReplayTransport
+from network.stub_server import (StubConfig, StubServer, make_cailianshe_items,
+                                 make_eastmoney_items)
+from notifiers.dingtalk_notifier import DingTalkNotifier
+
+
+class TimingTransport:
+    """包一层传输层，按 path 记录每次请求的耗时"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.stats = inner.stats
+        self.timeout = inner.timeout
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+
+    def request(self, method: str, url: str, **kwargs):
+        path = urlsplit(url).path
+        start = time.perf_counter()
+        try:
+            return self.inner.request(method, url, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failures[path] = self.failures.get(path, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies.setdefault(path, []).append(elapsed)
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def get_stats(self):
+        return self.inner.get_stats()
+
+    def print_stats(self):
+        self.inner.print_stats()
+
+    def close(self):
+        self.inner.close()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_collector(name: str, factory, fetch, timing: TimingTransport, verbose: bool) -> Dict:
+    """跑一次采集，返回条数、请求数、耗时"""
+    path = urlsplit(factory().base_url).path
+    before = len(timing.latencies.get(path, []))
+    failures_before = timing.failures.get(path, 0)
+
+    collector = factory()
+    collector.page_delay = 0
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if verbose else output):
+        news = fetch(collector) or []
+    elapsed = time.perf_counter() - start
+
+    latencies = timing.latencies.get(path, [])[before:]
+    return {
+        'name': name,
+        'items': len(news),
+        'requests': len(latencies),
+        'failures': timing.failures.get(path, 0) - failures_before,
+        'elapsed': elapsed,
+        'latencies': latencies,
+    }
+
+
+def print_row(result: Dict):
+    latencies = result['latencies']
+    rate = result['items'] / result['elapsed'] if result['elapsed'] else 0.0
+    print(f"  {result['name']:16} {result['items']:6d} 条 {result['requests']:4d} 次请求 "
+          f"{result['failures']:3d} 失败 {result['elapsed'] * 1000:8.1f}ms {rate:9.0f} 条/秒 "
+          f"p50 {percentile(latencies, 50) * 1000:6.1f}ms p95 {percentile(latencies, 95) * 1000:6.1f}ms")
+
+
+def bench_sources(em_url: str, cls_url: str, timing: TimingTransport, rounds: int,
+                  stub: StubServer = None, verbose: bool = False):
+    """首次采集 + 稳态采集，每轮用新的游标文件"""
+    print(f"\n📥 采集吞吐（{rounds} 轮）")
+    for round_index in range(rounds):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CursorStore(Path(tmp) / 'cursors.json')
+            em_factory = lambda: EastMoneyCollector(cursor_store=store, base_url=em_url)
+            cls_factory = lambda: CaiLianSheCollector(cursor_store=store, base_url=cls_url)
+
+            print(f" 第 {round_index + 1} 轮")
+            print_row(run_collector('东方财富-首次', em_factory,
+                                    lambda c: c.fetch_news(max_items=500), timing, verbose))
+            print_row(run_collector('财联社-首次', cls_factory,
+                                    lambda c: c.fetch_news(limit=200), timing, verbose))
+
+            if stub is not None:
+                # 模拟两次运行之间上游新发了 10 条
+                now = time.time()
+                stub.publish(make_eastmoney_items(10, newest=now, interval=1, seed=round_index + 100),
+                             make_cailianshe_items(10, newest=now, interval=1, seed=round_index + 100))
+                print_row(run_collector('东方财富-稳态', em_factory,
+                                        lambda c: c.fetch_news(max_items=500), timing, verbose))
+                print_row(run_collector('财联社-稳态', cls_factory,
+                                        lambda c: c.fetch_news(limit=200), timing, verbose))
+
+
+def bench_dingtalk(webhook_url: str, timing: TimingTransport, messages: int, verbose: bool = False):
+    """连续推送 messages 条快讯"""
+    print(f"\n📤 钉钉推送（{messages} 条）")
+    notifier = DingTalkNotifier(webhook_url, secret='SECstub', importance_threshold=5)
+    news = [{
+        'title': f'基准测试快讯 {i}',
+        'content': '央行开展逆回购操作，维护银行体系流动性合理充裕。' * 3,
+        'source': '替身服务器',
+        'publish_time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'importance': 6,
+        'sentiment': 'neutral',
+    } for i in range(messages)]
+
+    path = urlsplit(webhook_url).path
+    before = len(timing.latencies.get(path, []))
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if verbose else output):
+        sent = notifier.send_news_stream(news)
+    elapsed = time.perf_counter() - start
+    latencies = timing.latencies.get(path, [])[before:]
+    print(f"  成功 {sent}/{messages} 条，{elapsed * 1000:.1f}ms，{sent / elapsed:.0f} 条/秒，"
+          f"p50 {percentile(latencies, 50) * 1000:.1f}ms p95 {percentile(latencies, 95) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='采集器/推送器离线基准测试')
+    parser.add_argument('--rounds', type=int, default=3, help='采集轮数')
+    parser.add_argument('--count', type=int, default=1000, help='替身服务器每个数据源的条目数')
+    parser.add_argument('--messages', type=int, default=50, help='钉钉推送条数')
+    parser.add_argument('--latency', type=float, default=0.0, help='替身服务器固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='替身服务器随机抖动上限（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='5xx 比例')
+    parser.add_argument('--api-error-rate', type=float, default=0.0, help='接口错误码比例')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='断开连接比例')
+    parser.add_argument('--seed', type=int, default=7, help='错误注入随机种子')
+    parser.add_argument('--record', help='把本次请求录制到 fixture 文件')
+    parser.add_argument('--live', action='store_true', help='与 --record 一起用：录制真实接口')
+    parser.add_argument('--replay', help='回放 fixture 文件代替替身服务器')
+    parser.add_argument('--replay-latency', action='store_true', help='回放时复现录制的耗时')
+    parser.add_argument('--verbose', action='store_true', help='显示采集器自身的输出')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🚀 采集器离线基准测试")
+    print("=" * 60)
+
+    if args.replay:
+        inner = ReplayTransport.from_file(args.replay, replay_latency=args.replay_latency)
+    elif args.record:
+        inner = RecordingTransport()
+    else:
+        inner = HttpTransport()
+    timing = TimingTransport(inner)
+    set_transport(timing)
+
+    stub = None
+    if args.replay or args.live:
+        em_url = cls_url = None
+        source = f"回放 {args.replay}" if args.replay else "真实接口"
+    else:
+        config = StubConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                            api_error_rate=args.api_error_rate, drop_rate=args.drop_rate, seed=args.seed)
+        stub = StubServer(make_eastmoney_items(args.count), make_cailianshe_items(args.count), config=config)
+        stub.start()
+        em_url, cls_url = stub.eastmoney_url, stub.cailianshe_url
+        source = f"替身服务器 {stub.base_url}（延迟 {args.latency}s±{args.jitter}s，5xx {args.error_rate}，" \
+                 f"错误码 {args.api_error_rate}，断连 {args.drop_rate}）"
+    print(f"数据来源: {source}")
+
+    try:
+        rounds = 1 if (args.replay or args.live) else args.rounds
+        bench_sources(em_url, cls_url, timing, rounds, stub=stub, verbose=args.verbose)
+        if stub is not None:
+            bench_dingtalk(stub.dingtalk_url, timing, args.messages, verbose=args.verbose)
+            print(f"\n🧪 替身服务器统计: {stub.stats.snapshot()}")
+        timing.print_stats()
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    if args.record:
+        count = inner.save(args.record)
+        print(f"\n💾 已录制 {count} 次请求到 {args.record}")
+
+    print("\n" + "=" * 60)
+    print("✅ 测试完成！")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+新闻记录内存/吞吐基准：__slots__ 记录 vs 旧版 20 键字典
+用 10 万条合成的东方财富原始条目，分别测：
+- 每条常驻内存（tracemalloc，原始 raw_data 两边共用，不计入）
+- 构建、打标签+按标题合并+排序、序列化 三段的吞吐
+运行方式：python bench_news_record.py [--count 100000]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径
+current_file = Path(__file__).resolve()
+src_dir = current_file.parent.parent
+sys.path.insert(0, str(src_dir))
+
+from collectors.eastmoney_collector import EastMoneyCollector
+from collectors.run_github_action import merge_news_item, news_sort_key
+from storage import json_codec
+
+WORDS = ['央行', '降准', '半导体', '芯片', '光伏', '新能源车', '券商', '银行', '黄金', '原油',
+         '人工智能', '算力', '医药', '白酒', '地产', '美联储', '利率', '出口', '订单', '业绩']
+
+
+def make_corpus(count: int):
+    """生成合成的东方财富原始条目"""
+    rng = random.Random(42)
+    base_sort = 1787435104029127
+    corpus = []
+    for i in range(count):
+        headline = ''.join(rng.choice(WORDS) for _ in range(4)) + f"{i}"
+        body = ''.join(rng.choice(WORDS) for _ in range(30))
+        corpus.append({
+            'code': f"2026082{i:011d}",
+            'title': headline,
+            'summary': f"【{headline}】{body}",
+            'showTime': f"2026-08-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:{(i * 7) % 60:02d}",
+            'realSort': str(base_sort - i * 1000000),
+            'stockList': [],
+            'pinglun_Num': 0,
+            'share': i % 5,
+        })
+    return corpus
+
+
+def measure_memory(build):
+    """返回 (结果, 常驻字节数)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def pipeline(items):
+    """模拟下游：打标签 → 按标题合并 → 排序"""
+    news_map = {}
+    for item in items:
+        item['tags'] = {'industries': [], 'concepts': [], 'industry_ids': [], 'concept_ids': []}
+        merge_news_item(news_map, item)
+    return sorted(news_map.values(), key=news_sort_key, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='新闻记录内存/吞吐基准')
+    parser.add_argument('--count', type=int, default=100000, help='合成条目数')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🚀 新闻记录基准测试（{args.count} 条合成数据）")
+    print("=" * 60)
+
+    collector = EastMoneyCollector()
+    corpus = make_corpus(args.count)
+
+    # 记录：直接解析成 __slots__ 对象
+    records, record_build = timed(lambda: [collector._parse_single_news(raw) for raw in corpus])
+    # 字典：解析后展开成旧版字典（与旧版 _parse_single_news 返回的结构逐键一致）
+    dicts, dict_build = timed(lambda: [record.to_dict() for record in records])
+    dict_build += record_build
+
+    # 常驻内存：两边都包含解析出的字段字符串；raw_data 是共用的原始条目，不计入
+    _, record_bytes = measure_memory(lambda: [collector._parse_single_news(raw) for raw in corpus])
+    _, dict_bytes = measure_memory(lambda: [collector._parse_single_news(raw).to_dict() for raw in corpus])
+
+    _, record_pipe = timed(lambda: pipeline(records))
+    _, dict_pipe = timed(lambda: pipeline(dicts))
+
+    _, record_dump = timed(lambda: json_codec.dumps(records))
+    _, dict_dump = timed(lambda: json_codec.dumps(dicts))
+
+    n = args.count
+    print(f"\n{'':14}{'记录':>12}{'字典':>12}{'比值':>8}")
+    print(f"{'每条内存':12}{record_bytes / n:10.0f}B {dict_bytes / n:10.0f}B {dict_bytes / record_bytes:7.2f}x")
+    print(f"{'构建 条/秒':12}{n / record_build:11.0f} {n / dict_build:11.0f} {dict_build / record_build:7.2f}x")
+    print(f"{'合并 条/秒':12}{n / record_pipe:11.0f} {n / dict_pipe:11.0f} {dict_pipe / record_pipe:7.2f}x")
+    print(f"{'序列化 条/秒':11}{n / record_dump:11.0f} {n / dict_dump:11.0f} {dict_dump / record_dump:7.2f}x")
+    print(f"\n（JSON 后端: {json_codec.get_backend().name}；记录序列化时才展开成字典）")
+
+
+if __name__ == "__main__":
+    main()
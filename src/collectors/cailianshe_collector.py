@@ -4,17 +4,41 @@
 
 import requests
 import json
-import time
 import hashlib
-from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+
+import sys
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from network.http_transport import get_transport
+from network.request_policy import DeadlineExceeded, RequestAborted, RequestPolicy
+from collectors.collection_engine import SourceIncomplete
+from collectors.cursor_store import CursorStore
+from collectors.news_record import CaiLianSheRecord
+from storage.news_time import from_timestamp
 
 
 class CaiLianSheCollector:
     """财联社快讯采集器"""
 
-    def __init__(self):
-        self.base_url = "https://www.cls.cn/nodeapi/updateTelegraphList"
+    source_name = 'cailianshe'
+
+    def __init__(self, cursor_store: CursorStore = None, base_url: str = None,
+                 policy: RequestPolicy = None):
+        # base_url 可指向本地替身服务器（network.stub_server）
+        self.base_url = base_url or "https://www.cls.cn/nodeapi/updateTelegraphList"
+        self.transport = get_transport()
+        # 翻页间隔（秒），基准测试时设为 0
+        self.page_delay = 0.5
+        # 截止时间 + 重试 + 对冲；由采集引擎传入时整次运行共用一个截止时间
+        self.policy = policy or RequestPolicy()
+        # 持久化游标：高水位（最大 ctime）+ 最近ID
+        self.cursor_store = cursor_store or CursorStore()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Referer': 'https://www.cls.cn/telegraph',
@@ -34,51 +58,114 @@ class CaiLianSheCollector:
 
     def fetch_news(self, limit: int = 50) -> Optional[List[Dict]]:
         """
-        获取财联社快讯（获取最新新闻）
+        获取财联社快讯（游标增量版）
+        从最新一页开始用 lastTime 往前翻，遇到第一条已采集过的新闻就停止
+        首次运行（没有游标）最多采集 limit 条
+        请求失败、熔断或到了截止时间时返回已采集到的部分
         """
         all_news = []
+        try:
+            for item in self.iter_news(limit=limit):
+                all_news.append(item)
+            return all_news
+        except SourceIncomplete as e:
+            print(f"⚠️ 采集未完整结束: {e}")
+            return all_news
+        except requests.exceptions.RequestException as e:
+            print(f"❌ 网络请求失败: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            print(f"❌ JSON解析失败: {e}")
+            return None
+        except Exception as e:
+            print(f"❌ 未知错误: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def iter_news(self, limit: int = 50) -> Iterator[Dict]:
+        """
+        流式采集：每页解析完立即逐条 yield
+        网络/解析异常直接抛给调用方；生成器正常结束时才推进游标
+        请求被截止时间、熔断拦下或 API 返回错误时，保存游标统计后抛出 SourceIncomplete
+        """
+        cursor = self.cursor_store.load(self.source_name)
+        page_size = int(self.base_params['rn'])
+        # 没有游标时需要的请求数，用于统计节省的请求
+        baseline_pages = max(1, -(-limit // page_size))
+        max_pages = 10
+        pages_requested = 0
+        skipped = 0
+        reached_seen = False
+        complete = False
+        yielded = []  # (id, ctime) 用于结束时推进游标
+        failure = None
 
         # 首次请求不传 lastTime，获取最新
         params = self.base_params.copy()
         params['sign'] = self.fixed_sign
 
-        print(f"🔄 开始采集财联社快讯...")
+        print(f"🔄 开始采集财联社快讯... 高水位: {cursor.high_watermark}")
 
         try:
-            while len(all_news) < limit:
-                print(f"  ⏳ 请求: lastTime={params.get('lastTime', '无')}")
-
-                response = requests.get(
-                    self.base_url,
-                    params=params,
-                    headers=self.headers,
-                    timeout=15
-                )
+            while pages_requested < max_pages:
+                if cursor.is_empty and len(yielded) >= limit:
+                    complete = True
+                    break
 
-                if response.status_code == 304:
-                    print("  ✅ 没有新数据 (304)")
+                if self.policy.deadline.expired:
+                    print("  ⏰ 已到截止时间，停止翻页")
+                    failure = SourceIncomplete("已到截止时间", 'timeout')
                     break
 
-                response.raise_for_status()
-                data = response.json()
+                print(f"  ⏳ 请求: lastTime={params.get('lastTime', '无')}")
+
+                pages_requested += 1
+                try:
+                    # 失败时按退避重试；参数复制一份绑定给本页，对冲请求不会读到下一页的 lastTime
+                    roll_data = self.policy.call(
+                        lambda timeout, page_params=dict(params): self._fetch_page(page_params, timeout),
+                        key=self.source_name)
+                except RequestAborted as e:
+                    # 截止时间到了或熔断打开
+                    print(f"  ⏰ {e}")
+                    failure = SourceIncomplete(str(e), 'timeout' if isinstance(e, DeadlineExceeded) else 'error')
+                    break
+                except ValueError as e:
+                    print(f"  ❌ {e}")
+                    failure = SourceIncomplete(str(e))
+                    break
 
-                if data.get('error') != 0:
-                    print(f"  ❌ API返回错误: {data}")
+                if roll_data is None:
+                    print("  ✅ 没有新数据 (304)")
+                    complete = True
                     break
 
-                # 解析新闻列表
-                roll_data = data.get('data', {}).get('roll_data', [])
                 if not roll_data:
                     print("  ✅ 没有更多数据")
+                    complete = True
                     break
 
                 print(f"  ✅ 获取到 {len(roll_data)} 条")
 
-                # 解析每条新闻
+                # 解析每条新闻，已采集过的直接跳过
                 for item in roll_data:
                     news_item = self._parse_single_news(item)
-                    if news_item:
-                        all_news.append(news_item)
+                    if news_item is None:
+                        continue
+                    if cursor.is_seen(news_item['id'], news_item.get('ctime', 0)):
+                        reached_seen = True
+                        skipped += 1
+                        continue
+                    if cursor.is_empty and len(yielded) >= limit:
+                        break
+                    yielded.append((news_item['id'], news_item.get('ctime', 0)))
+                    yield news_item
+
+                if reached_seen:
+                    print("  🔍 遇到已采集的新闻，停止翻页")
+                    complete = True
+                    break
 
                 # 关键修复：取最后一条的 ctime 作为下一次的 lastTime
                 # 这样下次请求会获取更早的历史数据
@@ -86,25 +173,50 @@ class CaiLianSheCollector:
                 params['lastTime'] = last_item.get('ctime', 0)
 
                 # 礼貌性延迟
-                time.sleep(0.5)
+                self.policy.sleep(self.page_delay)
+            else:
+                complete = True
+        finally:
+            # 中途出错时不推进游标，下次重新采集
+            requests_saved = max(0, baseline_pages - pages_requested) if reached_seen else 0
+            if complete:
+                for news_id, ctime in yielded:
+                    cursor.advance(news_id, ctime)
+            else:
+                print("  ⚠️ 本次采集未完整结束，游标不推进")
+            cursor.record_run(pages_requested, requests_saved, len(yielded), skipped)
+            self.cursor_store.save(cursor)
+
+            print(f"✅ 本次采集共获取 {len(yielded)} 条新闻，请求 {pages_requested} 次，节省 {requests_saved} 次请求")
+        if failure is not None:
+            raise failure
+
+    def _fetch_page(self, params: Dict, timeout: float = 15) -> Optional[List[Dict]]:
+        """
+        请求一页电报，304 时返回 None
+        HTTP 错误抛出 RequestException，API 返回错误码时抛出 ValueError
+        """
+        response = self.transport.get(
+            self.base_url,
+            params=params,
+            headers=self.headers,
+            timeout=timeout
+        )
+
+        if response.status_code == 304:
+            return None
 
-            print(f"✅ 本次采集共获取 {len(all_news)} 条新闻")
-            return all_news
+        response.raise_for_status()
+        data = response.json()
 
-        except requests.exceptions.RequestException as e:
-            print(f"❌ 网络请求失败: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON解析失败: {e}")
-            return None
-        except Exception as e:
-            print(f"❌ 未知错误: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+        if data.get('error') != 0:
+            raise ValueError(f"API返回错误: {data}")
+
+        # 解析新闻列表
+        return data.get('data', {}).get('roll_data', [])
 
-    def _parse_single_news(self, item: Dict) -> Optional[Dict]:
-        """解析单条新闻"""
+    def _parse_single_news(self, item: Dict) -> Optional[CaiLianSheRecord]:
+        """解析单条新闻（full_content、publish_time 等字段在序列化时推导）"""
         try:
             news_id = str(item.get('id', ''))
             ctime = item.get('ctime', 0)
@@ -123,7 +235,7 @@ class CaiLianSheCollector:
             content = item.get('content', '') or brief
 
             # 时间处理
-            time_str = datetime.fromtimestamp(ctime).strftime('%Y-%m-%d %H:%M:%S') if ctime else ''
+            time_str = from_timestamp(ctime).strftime('%Y-%m-%d %H:%M:%S') if ctime else ''
 
             # 提取相关股票
             stock_list = []
@@ -140,29 +252,25 @@ class CaiLianSheCollector:
                     subjects.append(subject_name)
 
             # 构建标准新闻对象
-            news_item = {
-                'id': hashlib.md5(f"{news_id}_{ctime}".encode()).hexdigest()[:16],
-                'code': news_id,
-                'title': title,
-                'summary': brief,
-                'content': content,
-                'full_content': content,
-                'time': time_str,
-                'publish_time': time_str,
-                'source': '财联社',
-                'url': item.get('shareurl', f"https://www.cls.cn/telegraph"),
-                'category': self._infer_category(title + ' ' + brief),
-                'importance': self._calculate_importance(item),
-                'sentiment': self._judge_sentiment(title + ' ' + brief),
-                'related_stocks': stock_list,
-                'has_stock_mention': len(stock_list) > 0,
-                'subjects': subjects,
-                'comment_count': item.get('comment_num', 0),
-                'share_count': item.get('share_num', 0),
-                'ctime': ctime,  # 保留原始时间戳，便于调试
-                'raw_data': item
-            }
-            return news_item
+            return CaiLianSheRecord(
+                id=hashlib.md5(f"{news_id}_{ctime}".encode()).hexdigest()[:16],
+                code=news_id,
+                title=title,
+                summary=brief,
+                content=content,
+                time=time_str,
+                source='财联社',
+                url=item.get('shareurl', f"https://www.cls.cn/telegraph"),
+                category=self._infer_category(title + ' ' + brief),
+                importance=self._calculate_importance(item),
+                sentiment=self._judge_sentiment(title + ' ' + brief),
+                related_stocks=stock_list,
+                subjects=subjects,
+                comment_count=item.get('comment_num', 0),
+                share_count=item.get('share_num', 0),
+                ctime=ctime,  # 保留原始时间戳，便于调试
+                raw_data=item,
+            )
 
         except Exception as e:
             print(f"⚠️ 解析单条新闻失败: {e}")
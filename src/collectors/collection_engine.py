@@ -0,0 +1,246 @@
+"""
+多数据源并发采集引擎
+所有注册的采集器在同一个截止时间内并发运行，结果合并后交给标签/归档流程
+一次运行的耗时约等于最慢的数据源，而不是所有数据源之和
+stream() 在任意数据源解析出一页后立即逐条产出，下游不必等所有数据源结束
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 整次采集的默认截止时间（秒）：Actions 任务上限 10 分钟，还要留出打标签、保存和推送的时间
+DEFAULT_RUN_DEADLINE = 240
+# 采集器自身的截止时间比引擎早这么多秒，让采集器在引擎强制截止前正常收尾（保存游标）
+COLLECTOR_DEADLINE_MARGIN = 10
+
+# 采集线程结束标记
+_DONE = object()
+
+
+class SourceIncomplete(Exception):
+    """
+    采集器没有完整结束（请求失败、熔断或到了截止时间）：已产出的条目照常保留，游标不推进
+    status 是记到 SourceResult 上的状态（error / timeout），用来和"游标已是最新、没有新内容"（empty）区分
+    """
+
+    def __init__(self, message: str, status: str = 'error'):
+        super().__init__(message)
+        self.status = status
+
+
+class CollectorSource:
+    """一个已注册的数据源：名称 + 采集函数（返回列表或生成器均可）"""
+
+    def __init__(self, name: str, fetch: Callable[[], Optional[Iterable[Dict]]]):
+        self.name = name
+        self.fetch = fetch
+
+
+class SourceResult:
+    """单个数据源的采集结果"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.news: List[Dict] = []  # 只有 run() 会保存完整列表，stream() 只计数
+        self.count = 0
+        # ok / empty（完整结束但没有新内容）/ error / timeout / skipped
+        self.status = 'pending'
+        self.error = ''
+        self.elapsed = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'status': self.status,
+            'count': self.count,
+            'elapsed': round(self.elapsed, 3),
+            'error': self.error,
+        }
+
+
+class CollectionEngine:
+    """并发采集引擎（每个数据源一个守护线程，采集器内部都是阻塞的 requests 调用）"""
+
+    def __init__(self, sources: List[CollectorSource] = None, deadline: float = DEFAULT_RUN_DEADLINE,
+                 health=None):
+        self.sources: List[CollectorSource] = list(sources or [])
+        self.deadline = deadline
+        # 健康登记（collectors.health_registry.HealthRegistry）：熔断中的数据源不启动，运行结束时写回
+        self.health = health
+        self.results: Dict[str, SourceResult] = {}
+        # 各数据源的请求策略（重试/对冲统计），由 build_default_engine 填入
+        self.request_policies: Dict[str, object] = {}
+        self._cancel_lock = threading.Lock()
+        self._cancelled = False
+
+    def register(self, name: str, fetch: Callable[[], Optional[Iterable[Dict]]]):
+        """注册一个数据源"""
+        self.sources.append(CollectorSource(name, fetch))
+
+    def _run_source(self, source: CollectorSource, result: SourceResult, out: queue.Queue):
+        """
+        在采集线程中运行：每拿到一条就放进队列，结束时（包括构造采集器或 fetch() 本身出错）一定放入结束标记
+        截止后不再放入新条目，并关闭采集器生成器（生成器未正常结束时不推进游标）
+        """
+        start = time.monotonic()
+        items = None
+        try:
+            items = iter(source.fetch() or [])
+            for item in items:
+                with self._cancel_lock:
+                    if self._cancelled:
+                        break
+                    result.count += 1
+                    out.put((source.name, item))
+            else:
+                result.status = 'ok' if result.count else 'empty'
+        except SourceIncomplete as e:
+            result.status = e.status
+            result.error = str(e)
+        except Exception as e:
+            result.status = 'error'
+            result.error = str(e)
+        finally:
+            try:
+                if hasattr(items, 'close'):
+                    items.close()
+            except Exception as e:
+                result.status = 'error'
+                result.error = result.error or str(e)
+            result.elapsed = time.monotonic() - start
+            out.put((source.name, _DONE))
+
+    def _iter_by_source(self) -> Iterator[Tuple[str, Dict]]:
+        """启动所有采集线程，按到达顺序产出 (数据源名称, 新闻)"""
+        self.results = {source.name: SourceResult(source.name) for source in self.sources}
+        self._cancelled = False
+        if not self.sources:
+            return
+
+        start = time.monotonic()
+        out = queue.Queue()
+        running = set()
+        # 守护线程：超时的数据源不会在进程退出时拖住整个任务
+        for source in self.sources:
+            if self.health is not None:
+                source_health = self.health.source(source.name)
+                if not source_health.allow_run():
+                    result = self.results[source.name]
+                    result.status = 'skipped'
+                    result.error = f"熔断中，{source_health.seconds_until_probe() / 60:.0f} 分钟后探测"
+                    continue
+            thread = threading.Thread(target=self._run_source, args=(source, self.results[source.name], out),
+                                      name=f"collector-{source.name}", daemon=True)
+            thread.start()
+            running.add(source.name)
+
+        try:
+            yield from self._drain(out, running, start)
+        finally:
+            if self.health is not None:
+                self.health.save()
+
+    def _drain(self, out: queue.Queue, running: set, start: float) -> Iterator[Tuple[str, Dict]]:
+        """从队列产出条目直到所有数据源结束或到达截止时间"""
+        while running:
+            remaining = self.deadline - (time.monotonic() - start)
+            try:
+                name, item = out.get(timeout=max(0.0, remaining))
+            except queue.Empty:
+                break
+            if item is _DONE:
+                running.discard(name)
+                continue
+            yield name, item
+
+        if not running:
+            return
+
+        # 截止：通知采集线程停止，再取走截止前已经放进队列的条目
+        with self._cancel_lock:
+            self._cancelled = True
+        pending = []
+        while True:
+            try:
+                pending.append(out.get_nowait())
+            except queue.Empty:
+                break
+        for name, item in pending:
+            if item is _DONE:
+                running.discard(name)
+            else:
+                yield name, item
+
+        for name in running:
+            result = self.results[name]
+            result.status = 'timeout'
+            result.error = f"超过截止时间 {self.deadline}s"
+            result.elapsed = time.monotonic() - start
+
+    def stream(self) -> Iterator[Dict]:
+        """
+        并发运行所有数据源，边采集边产出新闻（按 id 去重）
+        最多运行 deadline 秒，超时的数据源记为 timeout，已产出的部分保留
+        各数据源的结果统计在 self.results 中
+        """
+        seen_ids = set()
+        for _, item in self._iter_by_source():
+            news_id = item.get('id')
+            if news_id in seen_ids:
+                continue
+            seen_ids.add(news_id)
+            yield item
+
+    def run(self) -> Dict[str, SourceResult]:
+        """
+        并发运行所有数据源，收集每个数据源的完整新闻列表
+        超时的数据源记为 timeout，只保留截止前已采集到的部分
+        """
+        collected = {source.name: [] for source in self.sources}
+        for name, item in self._iter_by_source():
+            collected[name].append(item)
+        for name, result in self.results.items():
+            result.news = collected[name]
+        return self.results
+
+    def all_failed(self) -> bool:
+        """所有数据源都没有完整结束（出错、超时或熔断中）；没有新内容（empty）不算失败"""
+        return bool(self.results) and all(result.status in ('error', 'timeout', 'skipped')
+                                          for result in self.results.values())
+
+    @staticmethod
+    def merge_results(results: Dict[str, SourceResult]) -> List[Dict]:
+        """合并所有数据源的新闻：按 id 去重，按时间倒序"""
+        news_map = {}
+        for result in results.values():
+            for item in result.news:
+                news_map.setdefault(item.get('id'), item)
+        merged = list(news_map.values())
+        merged.sort(key=lambda x: x.get('showTime', x.get('time', '')), reverse=True)
+        return merged
+
+
+def build_default_engine(max_items: int = 50, deadline: float = DEFAULT_RUN_DEADLINE) -> CollectionEngine:
+    """按默认注册表构建引擎：东方财富 + 财联社"""
+    from collectors.eastmoney_collector import EastMoneyCollector
+    from collectors.cailianshe_collector import CaiLianSheCollector
+    from collectors.health_registry import HealthRegistry
+    from network.request_policy import Deadline, RequestPolicy, RetryBudget
+
+    # 所有数据源共用一个截止时间（跨页、跨重试传递）和一个重试预算
+    run_deadline = Deadline(max(0.0, deadline - COLLECTOR_DEADLINE_MARGIN))
+    budget = RetryBudget()
+    health = HealthRegistry()
+    em_policy = RequestPolicy(deadline=run_deadline, budget=budget, health=health.source('东方财富'))
+    cls_policy = RequestPolicy(deadline=run_deadline, budget=budget, health=health.source('财联社'))
+    # 用上次运行留下的耗时预热对冲阈值
+    em_policy.tracker.seed(EastMoneyCollector.source_name, em_policy.health.latencies)
+    cls_policy.tracker.seed(CaiLianSheCollector.source_name, cls_policy.health.latencies)
+
+    engine = CollectionEngine(deadline=deadline, health=health)
+    engine.register('东方财富', lambda: EastMoneyCollector(policy=em_policy).iter_news(max_items=max_items))
+    engine.register('财联社', lambda: CaiLianSheCollector(policy=cls_policy).iter_news(limit=max_items))
+    engine.request_policies = {'东方财富': em_policy, '财联社': cls_policy}
+    return engine
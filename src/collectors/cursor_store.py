@@ -0,0 +1,157 @@
+"""
+采集游标存储
+每个数据源持久化一个高水位（已采集到的最新排序值）和一个有界的最近ID集合，
+采集器遇到第一条已见过的新闻就停止翻页，稳态下每次运行每个数据源只需请求一页
+
+defer() 之后游标只在内存里前进，由 stage(commit) 放进本次运行的 GroupCommit，
+与归档一起提交：不会出现游标已经前进、归档却没写进去的情况
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from storage import json_codec
+
+# 每个数据源保留的最近ID数量
+DEFAULT_RECENT_IDS = 500
+
+
+def default_cursor_path() -> Path:
+    """默认路径：项目根目录/data/cursors.json"""
+    project_root = Path(__file__).resolve().parent.parent.parent
+    return project_root / "data" / "cursors.json"
+
+
+class SourceCursor:
+    """单个数据源的游标：高水位 + 最近ID + 计数器"""
+
+    def __init__(self, source: str, high_watermark: int = 0, recent_ids: Iterable[str] = (),
+                 stats: Optional[Dict] = None, max_recent: int = DEFAULT_RECENT_IDS):
+        self.source = source
+        self.high_watermark = high_watermark
+        self.max_recent = max_recent
+        self.recent_ids = OrderedDict((news_id, None) for news_id in recent_ids)
+        self.stats = {
+            'runs': 0,
+            'requests': 0,
+            'requests_saved': 0,
+            'items_new': 0,
+            'items_skipped': 0,
+        }
+        self.stats.update(stats or {})
+
+    @property
+    def is_empty(self) -> bool:
+        return self.high_watermark == 0 and not self.recent_ids
+
+    def is_seen(self, news_id: str, sort_key: int) -> bool:
+        """
+        是否已采集过
+        排序值严格小于高水位的一定采集过；等于高水位的可能是同一时刻的新条目，靠ID判断
+        """
+        if news_id in self.recent_ids:
+            return True
+        return bool(self.high_watermark) and sort_key < self.high_watermark
+
+    def advance(self, news_id: str, sort_key: int):
+        """记录一条新采集的新闻"""
+        if sort_key > self.high_watermark:
+            self.high_watermark = sort_key
+        self.recent_ids[news_id] = None
+        self.recent_ids.move_to_end(news_id)
+        while len(self.recent_ids) > self.max_recent:
+            self.recent_ids.popitem(last=False)
+
+    def record_run(self, requests: int, requests_saved: int, items_new: int, items_skipped: int):
+        """累计本次运行的计数"""
+        self.stats['runs'] += 1
+        self.stats['requests'] += requests
+        self.stats['requests_saved'] += requests_saved
+        self.stats['items_new'] += items_new
+        self.stats['items_skipped'] += items_skipped
+
+    def to_dict(self) -> Dict:
+        return {
+            'high_watermark': self.high_watermark,
+            'recent_ids': list(self.recent_ids),
+            'stats': self.stats,
+        }
+
+
+class CursorStore:
+    """所有数据源共用的游标文件，多个采集线程并发写入时加锁"""
+
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+    # 延迟写入中的游标文件：路径 -> 内存里的全部游标
+    _deferred: Dict[str, Dict] = {}
+
+    def __init__(self, path: Optional[Path] = None, max_recent: int = DEFAULT_RECENT_IDS):
+        self.path = Path(path) if path else default_cursor_path()
+        self.max_recent = max_recent
+        with self._locks_guard:
+            self._key = str(self.path.resolve())
+            self._lock = self._locks.setdefault(self._key, threading.Lock())
+
+    def _read_all(self) -> Dict:
+        if self._key in self._deferred:
+            return dict(self._deferred[self._key])
+        if not self.path.exists():
+            return {}
+        try:
+            return json_codec.load_file(self.path)
+        except Exception as e:
+            print(f"⚠️ 游标文件读取失败，将重新开始: {e}")
+            return {}
+
+    def load(self, source: str) -> SourceCursor:
+        """读取某个数据源的游标（不存在时返回空游标）"""
+        with self._lock:
+            data = self._read_all().get(source, {})
+        return SourceCursor(
+            source,
+            high_watermark=int(data.get('high_watermark', 0) or 0),
+            recent_ids=data.get('recent_ids', []),
+            stats=data.get('stats'),
+            max_recent=self.max_recent,
+        )
+
+    def save(self, cursor: SourceCursor):
+        """写回某个数据源的游标（读-改-写整个文件，原子替换）"""
+        with self._lock:
+            data = self._read_all()
+            data[cursor.source] = cursor.to_dict()
+            if self._key in self._deferred:
+                self._deferred[self._key] = data
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix('.tmp')
+            json_codec.dump_file(temp_path, data)
+            os.replace(temp_path, self.path)
+
+    def defer(self):
+        """之后的 save() 只更新内存（同一路径的所有 CursorStore 实例共享），直到 stage()"""
+        with self._lock:
+            if self._key not in self._deferred:
+                self._deferred[self._key] = self._read_all()
+
+    def stage(self, commit) -> bool:
+        """把延迟写入的游标放进 GroupCommit（结束延迟写入），返回是否有内容"""
+        with self._lock:
+            data = self._deferred.pop(self._key, None)
+        if data is None:
+            return False
+        commit.write_json(self.path, data)
+        return True
+
+    def summary(self) -> Dict[str, Dict]:
+        """各数据源的高水位和累计计数"""
+        with self._lock:
+            data = self._read_all()
+        return {
+            source: {'high_watermark': item.get('high_watermark', 0), **item.get('stats', {})}
+            for source, item in data.items()
+        }
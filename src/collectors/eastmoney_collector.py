@@ -1,20 +1,41 @@
-import requests
-import json
 import time
 import hashlib
 from datetime import datetime
+from typing import Iterator, List, Dict, Optional
+
+import sys
 from pathlib import Path
-from typing import List, Dict, Optional
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from network.http_transport import get_transport
+from network.request_policy import DeadlineExceeded, RequestAborted, RequestPolicy
+from collectors.collection_engine import SourceIncomplete
+from collectors.cursor_store import CursorStore
+from collectors.news_record import EastMoneyRecord
+from storage import json_codec
 
 
 class EastMoneyCollector:
-    """东方财富快讯采集器（修复增量方向版）"""
+    """东方财富快讯采集器（游标增量版）"""
 
-    def __init__(self):
-        self.base_url = "https://np-weblist.eastmoney.com/comm/web/getFastNewsList"
+    source_name = 'eastmoney'
 
-        # 用于记录最后一次采集到的最小 news_id（时间戳）
-        self.last_news_id = self._load_last_news_id()
+    def __init__(self, cursor_store: CursorStore = None, base_url: str = None,
+                 policy: RequestPolicy = None):
+        # base_url 可指向本地替身服务器（network.stub_server）
+        self.base_url = base_url or "https://np-weblist.eastmoney.com/comm/web/getFastNewsList"
+        self.transport = get_transport()
+        # 翻页间隔（秒），基准测试时设为 0
+        self.page_delay = 0.5
+        # 截止时间 + 重试 + 对冲；由采集引擎传入时整次运行共用一个截止时间
+        self.policy = policy or RequestPolicy()
+
+        # 持久化游标：高水位（最大 realSort）+ 最近ID
+        self.cursor_store = cursor_store or CursorStore()
 
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -30,132 +51,173 @@ class EastMoneyCollector:
             'pageSize': 50,
         }
 
-    def _load_last_news_id(self) -> int:
-        """加载最后一次采集的新闻ID（时间戳）"""
-        project_root = Path(__file__).parent.parent.parent
-        last_id_file = project_root / "data" / "eastmoney_last_id.txt"
+    @staticmethod
+    def _to_sort(value) -> int:
+        """realSort 可能是字符串，统一转成整数"""
+        try:
+            return int(value or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def _fetch_page(self, sort_end: int, timeout: float = 15) -> List[Dict]:
+        """
+        请求一页快讯（sortEnd 之前的 pageSize 条，按时间倒序）
+        响应不是 JSONP 或 API 返回错误时抛出 ValueError
+        """
+        params = self.base_params.copy()
+        params['sortEnd'] = sort_end
+        params['req_trace'] = int(time.time() * 1000)
+        params['_'] = int(time.time() * 1000)
+        params['callback'] = f'jQuery_{int(time.time() * 1000)}'
+
+        response = self.transport.get(
+            self.base_url,
+            params=params,
+            headers=self.headers,
+            timeout=timeout
+        )
+        response.raise_for_status()
 
-        if last_id_file.exists():
-            try:
-                with open(last_id_file, 'r') as f:
-                    return int(f.read().strip())
-            except:
-                # 如果文件损坏，返回一个很早的时间戳，确保能采集到所有新闻
-                return 0
-        return int(time.time() * 1000000)  # 默认当前时间
+        raw_text = response.text
+        json_start = raw_text.find('(')
+        json_end = raw_text.rfind(')')
 
-    def _save_last_news_id(self, news_id: int):
-        """保存最后一次采集的新闻ID"""
-        project_root = Path(__file__).parent.parent.parent
-        last_id_file = project_root / "data" / "eastmoney_last_id.txt"
+        if json_start == -1 or json_end == -1:
+            raise ValueError("响应不是JSONP格式")
 
-        with open(last_id_file, 'w') as f:
-            f.write(str(news_id))
+        json_str = raw_text[json_start + 1:json_end]
+        data = json_codec.loads(json_str)
+
+        if data.get('code') != "1":
+            raise ValueError(f"API返回错误: {data}")
+
+        return data.get('data', {}).get('fastNewsList', [])
 
     def fetch_news(self, max_items: int = 50) -> Optional[List[Dict]]:
         """
-        增量采集新闻 - 修复版
-        从当前时间开始，往前采集，直到遇到已采集过的新闻
+        增量采集新闻 - 游标版
+        从当前时间开始往前翻页，遇到第一条已采集过的新闻就停止
+        有游标时返回全部新条目；首次运行（没有游标）最多采集 max_items 条
+        中途失败时返回已采集到的部分
         """
         all_news = []
+        try:
+            for item in self.iter_news(max_items=max_items):
+                all_news.append(item)
+        except SourceIncomplete as e:
+            print(f"⚠️ 采集未完整结束: {e}")
+
+        # 按时间倒序排列（最新的在前）
+        all_news.sort(key=lambda x: self._to_sort(x.get('sort_time', 0)), reverse=True)
+        return all_news
+
+    def iter_news(self, max_items: int = 50) -> Iterator[Dict]:
+        """
+        流式增量采集：每页解析完立即逐条 yield，不等所有页都采集完
+        生成器正常结束时才推进游标；被提前关闭或中途出错时游标不动
+        请求失败、熔断或到了截止时间时，保存游标统计后抛出 SourceIncomplete（已产出的条目照常有效）
+        """
+        cursor = self.cursor_store.load(self.source_name)
 
-        # ===== 修复：从当前时间开始采集，而不是从 last_news_id =====
         current_sort_end = int(time.time() * 1000000)  # 当前时间戳
-        min_sort_end = current_sort_end
         max_pages = 10
+        pages_requested = 0
+        skipped = 0
+        reached_seen = False
+        complete = False
+        yielded = []  # (id, sort) 用于结束时推进游标
+        failure = None
 
-        print(f"🔄 开始增量采集，当前时间戳: {current_sort_end}, 上次最后ID: {self.last_news_id}")
-
-        for page in range(max_pages):
-            try:
-                params = self.base_params.copy()
-                params['sortEnd'] = current_sort_end
-                params['req_trace'] = int(time.time() * 1000)
-                params['_'] = int(time.time() * 1000)
-                params['callback'] = f'jQuery_{int(time.time() * 1000)}'
+        print(f"🔄 开始增量采集，当前时间戳: {current_sort_end}, 高水位: {cursor.high_watermark}")
 
+        try:
+            for page in range(max_pages):
+                if self.policy.deadline.expired:
+                    print("  ⏰ 已到截止时间，停止翻页")
+                    failure = SourceIncomplete("已到截止时间", 'timeout')
+                    break
                 print(f"  ⏳ 请求第 {page + 1} 页，sortEnd={current_sort_end}")
-
-                response = requests.get(
-                    self.base_url,
-                    params=params,
-                    headers=self.headers,
-                    timeout=15
-                )
-
-                raw_text = response.text
-                json_start = raw_text.find('(')
-                json_end = raw_text.rfind(')')
-
-                if json_start == -1 or json_end == -1:
-                    print("  ⚠️ 响应不是JSONP格式")
+                pages_requested += 1
+                try:
+                    # 失败时按退避重试；sort_end 绑定为默认参数，对冲请求不会读到下一页的值
+                    news_data = self.policy.call(
+                        lambda timeout, sort_end=current_sort_end: self._fetch_page(sort_end, timeout),
+                        key=self.source_name)
+                except RequestAborted as e:
+                    # 截止时间到了或熔断打开
+                    print(f"  ⏰ {e}")
+                    failure = SourceIncomplete(str(e), 'timeout' if isinstance(e, DeadlineExceeded) else 'error')
                     break
-
-                json_str = raw_text[json_start + 1:json_end]
-                data = json.loads(json_str)
-
-                if data.get('code') != "1":
-                    print(f"  ⚠️ API返回错误: {data}")
+                except Exception as e:
+                    print(f"  ❌ 采集失败: {e}")
+                    failure = SourceIncomplete(f"采集失败: {e}")
                     break
 
-                news_data = data.get('data', {}).get('fastNewsList', [])
                 if not news_data:
                     print("  ✅ 没有更多数据")
+                    complete = True
                     break
 
-                # 解析新闻
-                page_news = []
+                # 解析新闻，已采集过的直接跳过
+                page_new = 0
                 page_min_sort = current_sort_end
+                limit_reached = False
 
                 for item in news_data:
+                    item_sort = self._to_sort(item.get('realSort', 0))
+                    if item_sort and item_sort < page_min_sort:
+                        page_min_sort = item_sort
+
                     news_item = self._parse_single_news(item)
-                    if news_item:
-                        page_news.append(news_item)
-
-                        # 更新本页最小时间戳
-                        item_sort = item.get('realSort', 0)
-                        try:
-                            if isinstance(item_sort, str):
-                                item_sort = int(item_sort)
-                            if item_sort and item_sort < page_min_sort:
-                                page_min_sort = item_sort
-                        except:
-                            pass
-
-                print(f"  ✅ 本页获取 {len(page_news)} 条，本页最小时间戳: {page_min_sort}")
-
-                # 如果这一页的新闻都小于上次的最后ID，说明已经采集过
-                if page_min_sort <= self.last_news_id:
-                    # 只保留比上次最后ID大的新闻
-                    new_in_page = [n for n in page_news if n.get('sort_time', 0) > self.last_news_id]
-                    print(f"  🔍 本页新增 {len(new_in_page)} 条（过滤掉已采集的）")
-                    all_news.extend(new_in_page)
+                    if news_item is None:
+                        continue
+                    if cursor.is_seen(news_item['id'], item_sort):
+                        reached_seen = True
+                        skipped += 1
+                        continue
+                    if cursor.is_empty and len(yielded) >= max_items:
+                        limit_reached = True
+                        break
+
+                    yielded.append((news_item['id'], item_sort))
+                    page_new += 1
+                    yield news_item
+
+                print(f"  ✅ 本页新增 {page_new} 条，累计跳过已采集 {skipped} 条，本页最小时间戳: {page_min_sort}")
+
+                if reached_seen:
+                    print("  🔍 遇到已采集的新闻，停止翻页")
+                    complete = True
+                    break
+                if cursor.is_empty and len(yielded) >= max_items:
+                    limit_reached = True
+                if limit_reached or page_min_sort >= current_sort_end:
+                    # 达到首次采集上限，或时间戳没有前进（避免重复请求同一页）
+                    complete = True
                     break
-                else:
-                    all_news.extend(page_news)
-                    current_sort_end = page_min_sort
-                    min_sort_end = min(min_sort_end, page_min_sort)
-
-                time.sleep(0.5)
-
-            except Exception as e:
-                print(f"  ❌ 采集失败: {e}")
-                break
 
-        # 更新 last_news_id 为本次采集到的最小时间戳
-        if all_news and min_sort_end < self.last_news_id:
-            self.last_news_id = min_sort_end
-            self._save_last_news_id(min_sort_end)
-            print(f"✅ 更新最后ID为: {min_sort_end}")
+                current_sort_end = page_min_sort
+                self.policy.sleep(self.page_delay)
+            else:
+                # 翻满 max_pages 页，更早的缺口交给回补任务
+                complete = True
+        finally:
+            # 只有完整走到已采集区间（或没有更多数据）时才推进游标，中途失败的下次重新采集
+            requests_saved = max_pages - pages_requested if reached_seen else 0
+            if complete:
+                for news_id, item_sort in yielded:
+                    cursor.advance(news_id, item_sort)
+            else:
+                print("  ⚠️ 本次采集未完整结束，游标不推进")
+            cursor.record_run(pages_requested, requests_saved, len(yielded), skipped)
+            self.cursor_store.save(cursor)
 
-        print(f"✅ 本次共采集 {len(all_news)} 条新新闻")
+            print(f"✅ 本次共采集 {len(yielded)} 条新新闻，请求 {pages_requested} 页，节省 {requests_saved} 次请求")
+        if failure is not None:
+            raise failure
 
-        # 按时间倒序排列（最新的在前）
-        all_news.sort(key=lambda x: x.get('sort_time', 0), reverse=True)
-        return all_news[:max_items]
-
-    def _parse_single_news(self, item) -> Optional[Dict]:
-        """解析单条新闻"""
+    def _parse_single_news(self, item) -> Optional[EastMoneyRecord]:
+        """解析单条新闻（url、time、publish_time 等字段在序列化时推导）"""
         try:
             unique_str = f"{item.get('title', '')}_{item.get('showTime', '')}_{item.get('code', '')}"
             news_id = hashlib.md5(unique_str.encode()).hexdigest()[:16]
@@ -171,48 +233,33 @@ class EastMoneyCollector:
                 bracket_title = summary.split('】')[0].replace('【', '')
                 title = bracket_title
                 content = summary
-                full_content = summary
             else:
                 title = title_raw
                 content = summary if summary else title
-                full_content = content
-
-            news_item = {
-                'id': news_id,
-                'code': code,
-                'title': title,
-                'summary': summary,
-                'content': content,
-                'full_content': full_content,
-                'sort_time': sort_time,
-                'showTime': show_time,  # 保留用于排序
-                'time': show_time,
-                'publish_time': show_time,
-                'raw_data': item
-            }
 
             # 来源
             source = item.get('mediaName', item.get('source', ''))
-            news_item['source'] = source.strip() if source else '东方财富快讯'
-
-            # URL
-            news_item[
-                'url'] = f"https://kuaixun.eastmoney.com/news/{code}.html" if code else "https://kuaixun.eastmoney.com/"
-
-            # 其他字段
-            news_item['category'] = self._infer_category(title + ' ' + summary)
-            news_item['importance'] = self._calculate_importance(item)
-            news_item['sentiment'] = self._judge_sentiment(title + ' ' + summary)
 
             # 股票关联
             stock_list = item.get('stockList', [])
-            news_item['related_stocks'] = stock_list if isinstance(stock_list, list) else []
-            news_item['has_stock_mention'] = len(news_item['related_stocks']) > 0
-
-            news_item['comment_count'] = item.get('pinglun_Num', 0)
-            news_item['share_count'] = item.get('share', 0)
 
-            return news_item
+            return EastMoneyRecord(
+                id=news_id,
+                code=code,
+                title=title,
+                summary=summary,
+                content=content,
+                sort_time=sort_time,
+                show_time=show_time,  # 保留用于排序
+                raw_data=item,
+                source=source.strip() if source else '东方财富快讯',
+                category=self._infer_category(title + ' ' + summary),
+                importance=self._calculate_importance(item),
+                sentiment=self._judge_sentiment(title + ' ' + summary),
+                related_stocks=stock_list if isinstance(stock_list, list) else [],
+                comment_count=item.get('pinglun_Num', 0),
+                share_count=item.get('share', 0),
+            )
 
         except Exception as e:
             print(f"解析单条新闻异常: {e}")
@@ -0,0 +1,232 @@
+"""
+数据源健康登记 + 熔断器
+每个数据源持久化最近的请求结果（成功/失败）和耗时，按此维护一个三态熔断器：
+- closed：正常采集
+- open：连续失败太多或成功率太低，冷却期内的运行直接跳过这个数据源，不占用截止时间
+- half_open：冷却期过后的下一次运行只放行一个探测请求，成功则恢复，失败则冷却期翻倍后重新打开
+
+状态写在 data/source_health.json，跨运行（每 15 分钟一个新进程）保留
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from storage import json_codec
+
+# 最近保留的请求结果/耗时个数
+DEFAULT_WINDOW = 50
+# 连续失败多少次打开熔断
+FAILURE_THRESHOLD = 5
+# 窗口内至少有这么多请求时，成功率低于下限也打开熔断
+MIN_REQUESTS_FOR_RATE = 10
+MIN_SUCCESS_RATE = 0.5
+# 冷却期：首次 15 分钟（跳过一次定时运行），每次探测失败翻倍，最长 2 小时
+BASE_COOLDOWN = 15 * 60
+MAX_COOLDOWN = 2 * 60 * 60
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def default_health_path() -> Path:
+    """默认路径：项目根目录/data/source_health.json"""
+    project_root = Path(__file__).resolve().parent.parent.parent
+    return project_root / "data" / "source_health.json"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class SourceHealth:
+    """单个数据源的健康状态和熔断器（线程安全）"""
+
+    def __init__(self, name: str, data: Optional[Dict] = None, window: int = DEFAULT_WINDOW):
+        data = data or {}
+        self.name = name
+        self.state = data.get('state', CLOSED)
+        self.opened_at = data.get('opened_at', 0.0)
+        self.cooldown = data.get('cooldown', BASE_COOLDOWN)
+        self.consecutive_failures = data.get('consecutive_failures', 0)
+        self.outcomes = deque(data.get('outcomes', []), maxlen=window)
+        self.latencies = deque(data.get('latencies', []), maxlen=window)
+        self.last_error = data.get('last_error', '')
+        self.totals = {
+            'requests': 0,
+            'failures': 0,
+            'skipped_runs': 0,
+            'probes': 0,
+            'trips': 0,
+        }
+        self.totals.update(data.get('totals', {}))
+        # 本次运行的计数（不持久化）
+        self.run_requests = 0
+        self.run_failures = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    # ---------- 统计 ----------
+
+    @property
+    def success_rate(self) -> float:
+        if not self.outcomes:
+            return 1.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def latency_percentile(self, pct: float) -> float:
+        return _percentile(list(self.latencies), pct)
+
+    # ---------- 熔断 ----------
+
+    def allow_run(self, now: Optional[float] = None) -> bool:
+        """运行开始时调用：open 且仍在冷却期内返回 False；冷却期已过则转为 half_open 放行探测"""
+        now = now or time.time()
+        with self._lock:
+            if self.state == OPEN:
+                if now - self.opened_at < self.cooldown:
+                    self.totals['skipped_runs'] += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            return True
+
+    def allow_request(self) -> bool:
+        """每个请求前调用：half_open 时同一时刻只放行一个探测请求"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self.totals['probes'] += 1
+                return True
+            return False
+
+    def record_success(self, elapsed: float):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                print(f"  💚 {self.name} 探测成功，熔断恢复")
+                self.state = CLOSED
+                self.cooldown = BASE_COOLDOWN
+                self._probe_in_flight = False
+                # 清掉故障期间的结果，否则恢复后一次失败就会因为成功率低再次熔断
+                self.outcomes.clear()
+            self._record(True)
+            self.latencies.append(round(elapsed, 4))
+            self.consecutive_failures = 0
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self._record(False)
+            self.consecutive_failures += 1
+            self.last_error = str(error)[:200]
+            if self.state == HALF_OPEN:
+                self._trip(min(MAX_COOLDOWN, self.cooldown * 2))
+            elif self.state == CLOSED and self._should_trip():
+                self._trip(BASE_COOLDOWN)
+
+    def _record(self, ok: bool):
+        self.outcomes.append(1 if ok else 0)
+        self.totals['requests'] += 1
+        self.run_requests += 1
+        if not ok:
+            self.totals['failures'] += 1
+            self.run_failures += 1
+
+    def _should_trip(self) -> bool:
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            return True
+        return len(self.outcomes) >= MIN_REQUESTS_FOR_RATE and self.success_rate < MIN_SUCCESS_RATE
+
+    def _trip(self, cooldown: float):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.cooldown = cooldown
+        self._probe_in_flight = False
+        self.totals['trips'] += 1
+        print(f"  🔴 {self.name} 熔断打开，{cooldown / 60:.0f} 分钟内跳过（最近错误: {self.last_error}）")
+
+    def seconds_until_probe(self, now: Optional[float] = None) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - (now or time.time()))
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'opened_at': self.opened_at,
+                'cooldown': self.cooldown,
+                'consecutive_failures': self.consecutive_failures,
+                'outcomes': list(self.outcomes),
+                'latencies': list(self.latencies),
+                'last_error': self.last_error,
+                'totals': dict(self.totals),
+            }
+
+
+class HealthRegistry:
+    """所有数据源的健康状态，运行开始时读入，结束时整体写回"""
+
+    def __init__(self, path: Optional[Path] = None, window: int = DEFAULT_WINDOW):
+        self.path = Path(path) if path else default_health_path()
+        self.window = window
+        self._sources: Dict[str, SourceHealth] = {}
+        self._lock = threading.Lock()
+        self._data = self._read_all()
+
+    def _read_all(self) -> Dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json_codec.load_file(self.path)
+        except Exception as e:
+            print(f"⚠️ 健康状态文件读取失败，将重新统计: {e}")
+            return {}
+
+    def source(self, name: str) -> SourceHealth:
+        """取某个数据源的健康状态（首次访问时从文件恢复）"""
+        with self._lock:
+            if name not in self._sources:
+                self._sources[name] = SourceHealth(name, self._data.get(name), window=self.window)
+            return self._sources[name]
+
+    def save(self):
+        """写回所有数据源（原子替换）"""
+        with self._lock:
+            data = dict(self._data)
+            for name, health in self._sources.items():
+                data[name] = health.to_dict()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        json_codec.dump_file(temp_path, data)
+        os.replace(temp_path, self.path)
+
+    def print_summary(self, elapsed: Optional[Dict[str, float]] = None, total: float = 0.0):
+        """
+        打印每个数据源的熔断状态、成功率、耗时分位数
+        传入本次各数据源的耗时时，同时显示占用截止时间的比例
+        """
+        icons = {CLOSED: '🟢', HALF_OPEN: '🟡', OPEN: '🔴'}
+        print("🩺 数据源健康:")
+        for name, health in self._sources.items():
+            line = (f"  {icons.get(health.state, '⚪')} {name}: {health.state}, "
+                    f"成功率 {health.success_rate:.0%} (近 {len(health.outcomes)} 次), "
+                    f"p50 {health.latency_percentile(50) * 1000:.0f}ms p95 {health.latency_percentile(95) * 1000:.0f}ms, "
+                    f"本次请求 {health.run_requests} 次/失败 {health.run_failures} 次")
+            if elapsed and name in elapsed:
+                share = elapsed[name] / total if total else 0.0
+                line += f", 耗时 {elapsed[name]:.1f}s ({share:.0%})"
+            if health.state == OPEN:
+                line += f", {health.seconds_until_probe() / 60:.0f} 分钟后探测"
+            print(line)
+            if health.state != CLOSED and health.last_error:
+                print(f"      最近错误: {health.last_error}")
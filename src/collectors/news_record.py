@@ -0,0 +1,184 @@
+"""
+紧凑新闻记录
+采集 → 打标签 → 合并 这段内存流水线里用 __slots__ 对象代替 20 个键的字典：
+- content/full_content/summary、time/publish_time/showTime 这类重复字段只存一份
+- url、has_stock_mention 等可推导字段在序列化时才计算
+- raw_data 只保存上游条目的引用，不复制
+
+记录同时提供字典式读写（get / [] / in），现有按字典访问的代码不用改；
+写文件时由 json_codec 调用 to_dict() 按原有 JSON 格式输出，键顺序与旧版完全一致
+"""
+
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional
+
+_MISSING = object()
+_NOT_FOUND = object()
+
+
+class NewsRecord:
+    """新闻记录基类：公共字段 + 字典式访问"""
+
+    __slots__ = (
+        'id', 'code', 'title', 'summary', 'content', 'source', 'category',
+        'importance', 'sentiment', 'related_stocks', 'comment_count', 'share_count',
+        'raw_data', 'tags', '_extra',
+    )
+
+    # 序列化时的键顺序（子类定义）
+    FIELDS: tuple = ()
+    _FIELD_SET: frozenset = frozenset()
+    _get_fields = staticmethod(lambda record: ())
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 一次 C 层调用取出全部字段，序列化时不逐个 getattr
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+        cls._get_fields = staticmethod(attrgetter(*cls.FIELDS))
+
+    def __init__(self, id: str, code: str, title: str, summary: str, content: str,
+                 source: str, category: str, importance: int, sentiment: str,
+                 related_stocks: List, comment_count: int, share_count: int,
+                 raw_data: Optional[Dict] = None):
+        self.id = id
+        self.code = code
+        self.title = title
+        self.summary = summary
+        self.content = content
+        self.source = source
+        self.category = category
+        self.importance = importance
+        self.sentiment = sentiment
+        self.related_stocks = related_stocks
+        self.comment_count = comment_count
+        self.share_count = share_count
+        self.raw_data = raw_data
+        self.tags = None
+        self._extra = None
+
+    # ---------- 推导字段 ----------
+
+    @property
+    def full_content(self) -> str:
+        return self.content
+
+    @property
+    def has_stock_mention(self) -> bool:
+        return len(self.related_stocks) > 0
+
+    # ---------- 字典式访问 ----------
+
+    def _lookup(self, key: str, default: Any = _MISSING) -> Any:
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        if key == 'tags' and self.tags is not None:
+            return self.tags
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._lookup(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._lookup(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key == 'tags':
+            self.tags = value
+        elif key in self._FIELD_SET and not isinstance(getattr(type(self), key, None), property):
+            setattr(self, key, value)
+        else:
+            # 推导字段或额外字段：写入后以写入值为准
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key, _NOT_FOUND) is not _NOT_FOUND
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.to_dict().keys())
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __bool__(self) -> bool:
+        # 记录总有固定字段，不为空；不定义时 `if record:` 会走 __len__ 展开整个字典
+        return True
+
+    def to_dict(self) -> Dict:
+        """按原有 JSON 格式展开（键顺序与旧版字典一致）"""
+        result = dict(zip(self.FIELDS, self._get_fields(self)))
+        if self.tags is not None:
+            result['tags'] = self.tags
+        if self._extra:
+            # 已有键原位覆盖，新键追加在末尾
+            result.update(self._extra)
+        return result
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, title={self.title[:20]!r})"
+
+
+class EastMoneyRecord(NewsRecord):
+    """东方财富快讯记录"""
+
+    __slots__ = ('sort_time', 'show_time')
+
+    FIELDS = (
+        'id', 'code', 'title', 'summary', 'content', 'full_content', 'sort_time',
+        'showTime', 'time', 'publish_time', 'raw_data', 'source', 'url', 'category',
+        'importance', 'sentiment', 'related_stocks', 'has_stock_mention',
+        'comment_count', 'share_count',
+    )
+
+    def __init__(self, sort_time: Any = 0, show_time: str = '', **kwargs):
+        super().__init__(**kwargs)
+        self.sort_time = sort_time
+        self.show_time = show_time
+
+    @property
+    def showTime(self) -> str:
+        return self.show_time
+
+    time = showTime
+    publish_time = showTime
+
+    @property
+    def url(self) -> str:
+        if self.code:
+            return f"https://kuaixun.eastmoney.com/news/{self.code}.html"
+        return "https://kuaixun.eastmoney.com/"
+
+
+class CaiLianSheRecord(NewsRecord):
+    """财联社快讯记录"""
+
+    __slots__ = ('time', 'url', 'subjects', 'ctime')
+
+    FIELDS = (
+        'id', 'code', 'title', 'summary', 'content', 'full_content', 'time',
+        'publish_time', 'source', 'url', 'category', 'importance', 'sentiment',
+        'related_stocks', 'has_stock_mention', 'subjects', 'comment_count',
+        'share_count', 'ctime', 'raw_data',
+    )
+
+    def __init__(self, time: str = '', url: str = '', subjects: List = None, ctime: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.time = time
+        self.url = url
+        self.subjects = subjects or []
+        self.ctime = ctime
+
+    @property
+    def publish_time(self) -> str:
+        return self.time
@@ -2,25 +2,60 @@
 """
 财经新闻采集器 - 最终版
 功能：
-- 增量采集东方财富快讯
+- 并发采集所有注册的数据源（东方财富、财联社）
 - 只维护 latest.json（最新50条）
-- 按日归档到 archive/YYYY-MM-DD.json
+- 当天的归档分段写到 archive/YYYY-MM-DD/（每次运行只新增一个只含新条目的不可变段文件），
+  日期结束后整理成 archive/YYYY-MM-DD.json
 - 超过30天的自动按月合并
+- 生成网页读取的 manifest.json 和最近几天的小时分片 shards/
+- 增量维护最近 24 小时的热窗口 feeds/hot-24h.json（网页首屏只拉这一个文件，12 小时由网页过滤）
+- tags.json 更新后只重打归档里含有变化关键词的新闻（tags.retag）
+- NEWS_STORAGE_BACKEND=sqlite 时写入 data/news.db，再从库里导出 latest.json 和当天归档
 - 不再维护庞大的 today.json
+- latest.json、当天归档、游标、last_update.txt 成组提交（storage.group_commit），
+  中途崩溃时下次运行前滚或回滚，不会出现游标前进而归档丢失
 """
 
-import json
 import sys
 import os
 from pathlib import Path
 from datetime import datetime, date, timedelta
-from eastmoney_collector import EastMoneyCollector
 
-# 导入标签管理器
+# 添加 src 目录到 Python 路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from collectors.collection_engine import build_default_engine
+from collectors.cursor_store import CursorStore
+from network.http_transport import get_transport
+from storage import json_codec
+from storage.daily_log import DailyLog, compact_closed_days
+from storage.group_commit import GroupCommit, recover
+from storage.hot_window import HOT_HOURS, update_hot_windows
+from storage.month_archive import compact_expired_days
+from storage.news_time import beijing_now, beijing_today
+from storage.search_index import update_search_index
+from storage.site_publisher import publish_site
+from storage.sqlite_store import SqliteNewsStore
+from tags.retag import retag_archive
 from tags.tag_manager import TagManager
 
 
+def news_sort_key(item):
+    """新闻排序键：优先 showTime，没有则用 time"""
+    return item.get('showTime', item.get('time', ''))
+
+
+def merge_news_item(news_map, item):
+    """把一条新闻按标题合并进 news_map，标题重复时保留时间更新的那条"""
+    title = item.get('title', '')
+    if not title:
+        return
+    if title in news_map:
+        if news_sort_key(item) > news_sort_key(news_map[title]):
+            news_map[title] = item
+    else:
+        news_map[title] = item
+
+
 def merge_news_by_title(existing_news, new_news):
     """
     按标题去重合并新闻列表（强制按 showTime 排序）
@@ -28,29 +63,17 @@ def merge_news_by_title(existing_news, new_news):
     """
     news_map = {}
 
-    # 先添加已有的
+    # 先添加已有的，再添加新的，如果标题重复，保留时间更新的那条
     for item in existing_news:
-        title = item.get('title', '')
-        if title:
-            news_map[title] = item
-
-    # 再添加新的，如果标题重复，保留时间更新的那条
+        merge_news_item(news_map, item)
     for item in new_news:
-        title = item.get('title', '')
-        if title:
-            if title in news_map:
-                old_time = news_map[title].get('showTime', news_map[title].get('time', ''))
-                new_time = item.get('showTime', item.get('time', ''))
-                if new_time > old_time:
-                    news_map[title] = item
-            else:
-                news_map[title] = item
+        merge_news_item(news_map, item)
 
     # 转回列表
     result = list(news_map.values())
 
     # 强制按 showTime 倒序排序（最新的在前）
-    result.sort(key=lambda x: x.get('showTime', x.get('time', '')), reverse=True)
+    result.sort(key=news_sort_key, reverse=True)
 
     # 打印时间范围供调试
     if result:
@@ -64,67 +87,54 @@ def merge_news_by_title(existing_news, new_news):
     return result
 
 
-def merge_monthly_files(archive_dir, merged_dir, cutoff_date):
-    """将超过30天的日文件合并到月文件"""
+def build_latest(latest_path, new_news, daily_log=None, limit=50):
+    """
+    latest.json 的内容：已有的 latest.json 并入本次新条目，按标题去重、时间倒序取前 limit 条
+    （有游标时每次只采到新条目，不能直接拿本次结果覆盖）；latest.json 缺失或损坏时用当天归档补齐
+    """
+    existing = []
+    if latest_path.exists():
+        try:
+            existing = json_codec.load_file(latest_path)
+        except Exception as e:
+            print(f"  ⚠️ latest.json 读取失败，从当天归档重建: {e}")
+    if not existing and daily_log is not None and daily_log.is_open:
+        existing = daily_log.read_all()
+    return merge_news_by_title(existing, new_news)[:limit]
+
+
+def merge_monthly_files(archive_dir, merged_dir, cutoff_date, commit=None):
+    """将超过30天的日文件按月合并到月文件（每个月一次归并、一次写入，有 commit 时每个月成组提交）"""
     print(f"\n🔄 检查需要合并的旧文件（{cutoff_date} 之前的）...")
-    daily_files = sorted(archive_dir.glob("20??-??-??.json"))
+    stats = compact_expired_days(archive_dir, merged_dir, cutoff_date, commit)
+    if stats['days']:
+        print(f"  ✅ 已合并并删除 {stats['days']} 个日文件 → {stats['months']} 个月文件，"
+              f"读取 {stats['bytes_read'] / 1024 / 1024:.1f} MB，写入 {stats['bytes_written'] / 1024 / 1024:.1f} MB")
+    return stats
 
-    for daily_file in daily_files:
-        file_date_str = daily_file.stem
-        try:
-            file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
-        except:
-            continue
 
-        if file_date < cutoff_date:
-            print(f"  📦 合并 {file_date_str} 到月文件")
-            try:
-                with open(daily_file, 'r', encoding='utf-8') as f:
-                    daily_news = json.load(f)
-            except:
-                print(f"    ⚠️ 读取失败，跳过")
-                continue
-
-            month_str = file_date_str[:7]
-            month_file = merged_dir / f"{month_str}.json"
-
-            month_news = []
-            if month_file.exists():
-                try:
-                    with open(month_file, 'r', encoding='utf-8') as f:
-                        month_news = json.load(f)
-                except:
-                    month_news = []
-
-            merged = merge_news_by_title(month_news, daily_news)
-            with open(month_file, 'w', encoding='utf-8') as f:
-                json.dump(merged, f, ensure_ascii=False, indent=2)
-            daily_file.unlink()
-            print(f"    ✅ 已合并并删除 {file_date_str}.json")
-
-
-def safe_save_json(file_path, data, description=""):
-    """安全保存JSON文件，包含完整性检查"""
+def safe_save_json(file_path, data, description="", commit=None):
+    """
+    保存JSON文件（空数据不覆盖已有文件）
+    commit（GroupCommit）不为空时只暂存，与本次运行的其它文件一起提交；
+    否则写临时文件、fsync 后原子替换
+    """
     if not data:
         print(f"⚠️ 警告: {description} 数据为空，跳过保存 {file_path}")
         return False
 
-    if len(data) == 0:
-        print(f"⚠️ 警告: {description} 数据为空数组，跳过保存 {file_path}")
-        return False
+    if commit is not None:
+        commit.write_json(file_path, data)
+        print(f"  ✅ {description}: {len(data)} 条")
+        return True
 
     temp_path = file_path.with_suffix('.tmp')
 
     try:
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-        # 验证临时文件
-        with open(temp_path, 'r', encoding='utf-8') as f:
-            test_data = json.load(f)
-            if len(test_data) != len(data):
-                raise ValueError("数据长度不匹配")
-
+        with open(temp_path, 'wb') as f:
+            f.write(json_codec.dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
         temp_path.replace(file_path)
         print(f"  ✅ {description}: {len(data)} 条")
         return True
@@ -136,6 +146,28 @@ def safe_save_json(file_path, data, description=""):
         return False
 
 
+def storage_backend():
+    """归档后端：NEWS_STORAGE_BACKEND=json（默认）/ sqlite，定时采集和回补共用"""
+    return os.environ.get('NEWS_STORAGE_BACKEND', 'json').lower()
+
+
+def open_sqlite_store(data_dir, archive_dir, daily_log):
+    """
+    打开新闻库，并按内容哈希同步 JSON 归档（库不提交进仓库，缓存丢了就整个重建；
+    回补、重打标签、月合并改过的分区重新导入，并进月归档的日归档从库里删掉）
+    当天还有段（切换后端当天、或回补任务写过）时先导出当天归档再删段，之后当天归档由库导出
+    """
+    store = SqliteNewsStore(data_dir / "news.db")
+    synced = store.sync_archive_dir(archive_dir)
+    if synced['imported'] or synced['removed']:
+        print(f"🗄️ 新闻库同步归档: 导入 {synced['imported']} 个分区（{synced['rows']} 条），"
+              f"删除 {synced['removed']} 个，共 {store.count()} 条")
+    if daily_log.is_open:
+        store.export_day(daily_log.day, daily_log.json_path)
+        daily_log.remove()
+    return store
+
+
 def main():
     print("=" * 50)
     print("🚀 财经新闻采集器（最终版 - 无today.json）")
@@ -157,6 +189,14 @@ def main():
     print(f"📁 日归档目录: {archive_dir}")
     print(f"📁 月合并目录: {merged_dir}")
 
+    # 上次运行中断：已提交的前滚，未提交的暂存文件丢弃
+    recovered = recover(data_dir)
+    if recovered == 'forward':
+        print("🔁 上次运行已提交但未写完，已重放提交日志")
+    elif recovered == 'back':
+        print("↩️ 上次运行在提交前中断，已丢弃暂存文件")
+    commit = GroupCommit(data_dir)
+
     # 初始化标签管理器
     print("\n🏷️ 初始化标签管理器...")
     tag_manager = TagManager()
@@ -164,42 +204,102 @@ def main():
     print(f"  标签库版本: {stats['version']}")
     print(f"  行业数: {stats['industries']}, 概念数: {stats['concepts']}")
 
-    # ========== 1. 采集东方财富 ==========
+    # 之前日期还没整理的段先收盘，整理成按时间倒序的 JSON 数组
+    today_str = beijing_today()
+    compact_closed_days(archive_dir, today_str)
+
+    # 归档后端：默认 json（当天的段目录）；sqlite 时新闻库是权威数据，网页读的 JSON 由库导出
+    store = None
+    daily_log = DailyLog(archive_dir, today_str)
+    if storage_backend() == 'sqlite':
+        store = open_sqlite_store(data_dir, archive_dir, daily_log)
+        existing_count = store.count(today_str)
+        time_range = store.day_time_range(today_str)
+        archive_name = f"{today_str}.json"
+    else:
+        # 当天的段目录：去重索引从段重建
+        existing_count = daily_log.count
+        time_range = daily_log.time_range() if existing_count else None
+        archive_name = f"{daily_log.segment_dir.name}/"
+    print(f"🗄️ 归档后端: {storage_backend()}")
+    if existing_count:
+        print(f"📖 当天归档 {archive_name}: {existing_count} 条")
+        if time_range:
+            print(f"   ├─ 最早: {time_range[0]}")
+            print(f"   └─ 最新: {time_range[1]}")
+
+    # ========== 1. 并发流式采集 + 打标签 + 合并归档 ==========
     print("\n" + "=" * 40)
-    print("📈 开始采集东方财富快讯...")
+    print("📈 开始并发采集所有数据源...")
     print("=" * 40)
 
-    eastmoney_collector = EastMoneyCollector()
-    eastmoney_news = eastmoney_collector.fetch_news(max_items=50)
-
-    if not eastmoney_news:
-        print("⚠️ 东方财富采集失败")
-        eastmoney_news = []
-    else:
-        print(f"✅ 东方财富: {len(eastmoney_news)} 条")
-
-    # ========== 2. 合并所有新闻 ==========
-    all_raw_news = eastmoney_news
-
-    if not all_raw_news:
+    # 游标只在内存里前进，与归档一起提交
+    cursor_store = CursorStore()
+    cursor_store.defer()
+    engine = build_default_engine(max_items=50)
+    collect_start = datetime.now()
+    first_item_elapsed = None
+    tagged_news = []
+
+    # 任意数据源解析出一页就开始打标签，不等所有数据源结束
+    for item in tag_manager.iter_tagged(engine.stream()):
+        if first_item_elapsed is None:
+            first_item_elapsed = (datetime.now() - collect_start).total_seconds()
+        tagged_news.append(item)
+
+    collect_elapsed = (datetime.now() - collect_start).total_seconds()
+
+    for name, result in engine.results.items():
+        if result.status == 'ok':
+            print(f"✅ {name}: {result.count} 条 ({result.elapsed:.1f}s)")
+        elif result.status == 'empty':
+            print(f"✅ {name}: 没有新内容 ({result.elapsed:.1f}s)")
+        elif result.status == 'skipped':
+            print(f"⏭️ {name} 已跳过: {result.error}")
+        else:
+            print(f"⚠️ {name} 采集失败: {result.status} {result.error} ({result.elapsed:.1f}s)")
+    if first_item_elapsed is not None:
+        print(f"⏱️ 首条新闻耗时: {first_item_elapsed:.1f}s")
+    print(f"⏱️ 采集总耗时: {collect_elapsed:.1f}s (截止时间 {engine.deadline}s)")
+    for name, policy in engine.request_policies.items():
+        stats = policy.stats
+        print(f"🔁 {name}: 请求 {stats['requests']} 次, 重试 {stats['retries']}, "
+              f"对冲 {stats['hedges']} (胜出 {stats['hedge_wins']}), 截止 {stats['deadline_hits']}, "
+              f"预算耗尽 {stats['budget_exhausted']}")
+    if engine.health is not None:
+        engine.health.print_summary({name: result.elapsed for name, result in engine.results.items()},
+                                    total=collect_elapsed)
+    get_transport().print_stats()
+    for source, cursor_stats in cursor_store.summary().items():
+        print(f"🧭 游标 {source}: 累计请求 {cursor_stats.get('requests', 0)} 次, "
+              f"节省 {cursor_stats.get('requests_saved', 0)} 次")
+
+    # ========== 2. 汇总所有新闻 ==========
+    # 有游标时安静的 15 分钟窗口本来就没有新条目（empty），只有所有数据源都出错/超时/熔断才算失败
+    if not tagged_news and engine.all_failed():
         print("❌ 所有数据源都采集失败")
+        if store is not None:
+            store.close()
+        # 游标的计数照常保存
+        if cursor_store.stage(commit):
+            commit.commit()
         # 即使采集失败，也要检查现有文件是否正常
         print("\n🔍 检查现有数据文件完整性...")
         latest_path = data_dir / "latest.json"
         if latest_path.exists():
             try:
-                with open(latest_path, 'r', encoding='utf-8') as f:
-                    latest_data = json.load(f)
+                latest_data = json_codec.load_file(latest_path)
                 print(f"✅ latest.json 当前有 {len(latest_data)} 条新闻")
             except Exception as e:
                 print(f"❌ latest.json 可能已损坏: {e}")
         sys.exit(1)
 
-    print(f"\n📊 原始新闻总数: {len(all_raw_news)} 条")
+    if not tagged_news:
+        print("\n✅ 所有数据源都没有新内容（游标已是最新），照常整理归档和热窗口")
 
-    # 添加标签
-    print("\n🏷️ 正在添加行业和概念标签...")
-    tagged_news = tag_manager.add_to_news_list(all_raw_news)
+    # 多个数据源交错到达，按时间倒序排列（最新的在前）
+    tagged_news.sort(key=news_sort_key, reverse=True)
+    print(f"\n📊 原始新闻总数: {len(tagged_news)} 条")
 
     tagged_count = sum(1 for item in tagged_news
                        if item.get('tags', {}).get('industries') or item.get('tags', {}).get('concepts'))
@@ -208,59 +308,108 @@ def main():
     # ========== 3. 保存文件 ==========
     print("\n💾 正在保存文件...")
 
-    # 3.1 latest.json（最新50条）
     latest_path = data_dir / "latest.json"
-    safe_save_json(latest_path, tagged_news[:50], "latest.json")
-
-    # ===== 注意：today.json 不再维护 =====
+    # 归档没写成时游标不能前进，否则这批新闻下次不会再采集
+    archive_saved = False
+    if store is not None:
+        # 3.1 写入新闻库（一个事务），再导出当天归档和 latest.json
+        try:
+            written = store.upsert_many(tagged_news, today_str)
+            archive_saved = True
+            exported = store.export_day(today_str, archive_dir / archive_name, commit)
+            print(f"  ✅ 新闻库 {store.path.name}: 写入 {written} 条，导出 {archive_name} {exported} 条 "
+                  f"(原{existing_count} + 新{len(tagged_news)})")
+            safe_save_json(latest_path, store.latest(50), "latest.json", commit)
+            archive_count = exported
+        except Exception as e:
+            print(f"  ❌ 写入新闻库失败: {e}")
+            archive_count = existing_count
+        finally:
+            store.close()
+    else:
+        # 3.1 latest.json（最新50条）：本次新条目并入已有的，没有新条目时不改写
+        if tagged_news:
+            safe_save_json(latest_path, build_latest(latest_path, tagged_news, daily_log), "latest.json", commit)
+        else:
+            print("  ⏭️ latest.json: 没有新条目，保持不变")
 
-    # 3.2 按日归档
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    archive_path = archive_dir / f"{today_str}.json"
+        # ===== 注意：today.json 不再维护 =====
 
-    # 读取现有的归档文件
-    existing_archive = []
-    if archive_path.exists():
+        # 3.2 按日归档：去重索引里没有的（或同标题时间更新的）条目写成一个新段
         try:
-            with open(archive_path, "r", encoding="utf-8") as f:
-                existing_archive = json.load(f)
-            print(f"📖 读取现有归档 {today_str}.json: {len(existing_archive)} 条")
-
-            if len(existing_archive) > 0:
-                first = existing_archive[0]
-                last = existing_archive[-1]
-                print(f"   ├─ 最早: {last.get('showTime', last.get('time', '未知'))}")
-                print(f"   └─ 最新: {first.get('showTime', first.get('time', '未知'))}")
+            appended = daily_log.append(tagged_news, commit)
+            archive_saved = True
+            print(f"  ✅ 归档 {archive_name}: 追加 {appended} 条，共 {daily_log.count} 条 "
+                  f"(原{existing_count} + 新{len(tagged_news)})")
         except Exception as e:
-            print(f"⚠️ 归档文件读取失败: {e}")
-            existing_archive = []
+            print(f"  ❌ 追加归档 {archive_name} 失败: {e}")
+        archive_count = daily_log.count
 
-    # 合并去重
-    merged_archive = merge_news_by_title(existing_archive, tagged_news)
-    safe_save_json(archive_path, merged_archive, f"归档 {today_str}.json")
+    # 3.3 热窗口：淘汰过期条目、插入本次新条目
+    try:
+        hot_stats = update_hot_windows(data_dir, tagged_news, commit=commit)
+        seeded = f"，从归档初始化 {hot_stats['seeded']} 条" if hot_stats['seeded'] else ""
+        print(f"  ✅ 热窗口 {HOT_HOURS}h: {hot_stats['window']} 条 "
+              f"(插入 {hot_stats['inserted']}，淘汰 {hot_stats['evicted']}{seeded})")
+    except Exception as e:
+        print(f"  ❌ 更新热窗口失败: {e}")
 
-    # 3.3 合并超过30天的旧文件
+    # 3.4 更新时间戳，连同游标一起提交
+    current_time = beijing_now().strftime("%Y-%m-%d %H:%M:%S")
+    commit.write_bytes(data_dir / "last_update.txt", current_time.encode('utf-8'))
+    if archive_saved:
+        cursor_store.stage(commit)
+    else:
+        print("  ⚠️ 归档未保存，游标不前进")
+    try:
+        committed = commit.commit()
+        print(f"  ✅ 成组提交 {committed} 个文件 (last_update.txt: {current_time})")
+    except Exception as e:
+        # 日志写成之前失败的由下次运行回滚，之后失败的由下次运行前滚
+        print(f"  ❌ 提交失败: {e}")
+        sys.exit(1)
+
+    # 3.5 合并超过30天的旧文件
     cutoff_date = date.today() - timedelta(days=30)
-    merge_monthly_files(archive_dir, merged_dir, cutoff_date)
+    merge_monthly_files(archive_dir, merged_dir, cutoff_date, commit)
 
-    # 3.4 更新时间戳
-    timestamp_path = data_dir / "last_update.txt"
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(timestamp_path, "w", encoding="utf-8") as f:
-        f.write(current_time)
-    print(f"  ✅ last_update.txt: {current_time}")
+    # 3.6 标签库更新过：只重打含有变化关键词的归档新闻
+    try:
+        retag_stats = retag_archive(data_dir, manager=tag_manager)
+        if retag_stats['baseline']:
+            print(f"  ✅ 标签库基线已记录: {tag_manager.version}")
+        elif retag_stats['keywords']:
+            print(f"  ✅ 重打标签: 变化关键词 {retag_stats['keywords']} 个，候选 {retag_stats['candidates']} 条，"
+                  f"重打 {retag_stats['retagged']} 条，重写 {retag_stats['files']} 个文件")
+    except Exception as e:
+        print(f"  ❌ 重打标签失败（下次运行重试）: {e}")
+
+    # 3.7 网页用的数据清单和小时分片
+    try:
+        site_stats = publish_site(data_dir, today_str)
+        print(f"  ✅ manifest.json: {site_stats['partitions']} 个分区，{site_stats['shards']} 个小时分片 "
+              f"(新写 {site_stats['shards_written']}，删除 {site_stats['shards_removed']})")
+    except Exception as e:
+        print(f"  ❌ 生成 manifest.json 失败: {e}")
+
+    # 3.8 全文检索索引（只重建内容有变化的分区）
+    try:
+        search_stats = update_search_index(data_dir)
+        print(f"  ✅ search/: {search_stats['segments']} 个分区，{search_stats['docs']} 篇 "
+              f"(重建 {search_stats['rebuilt']}，删除 {search_stats['removed']})")
+    except Exception as e:
+        print(f"  ❌ 更新全文检索索引失败: {e}")
 
     # 显示最终统计
     print("\n" + "=" * 50)
     print("📊 最终统计:")
     if latest_path.exists():
-        with open(latest_path, 'r', encoding='utf-8') as f:
-            final_latest = json.load(f)
+        final_latest = json_codec.load_file(latest_path)
         print(f"  latest.json 最新条数: {len(final_latest)}")
         if final_latest:
             print(f"  最新新闻时间: {final_latest[0].get('showTime', final_latest[0].get('time', '未知'))}")
     print(f"  本次新增: {len(tagged_news)}")
-    print(f"  归档文件: {archive_path.name} ({len(merged_archive)} 条)")
+    print(f"  归档文件: {archive_name} ({archive_count} 条)")
 
     # 显示示例
     if len(tagged_news) > 0:
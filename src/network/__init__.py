@@ -0,0 +1 @@
+﻿# 空文件，标记为Python包
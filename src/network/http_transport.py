@@ -0,0 +1,206 @@
+"""
+共享 HTTP 传输层
+所有采集器、钉钉推送器共用一个带连接池的 Session：
+- 按 host 维护连接池，keep-alive 复用 TCP+TLS 连接
+- 连接池大小可调
+- 默认协商 gzip 压缩
+- 按 host 统计：新建连接数、复用次数、握手耗时
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# 连接池默认参数：缓存的 host 连接池个数 / 每个 host 最多保持的连接数
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_TIMEOUT = 15
+
+
+class HostStats:
+    """单个 host 的连接统计"""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.requests = 0
+        self.new_connections = 0
+        self.handshake_time = 0.0
+        self.errors = 0
+
+    @property
+    def reused_connections(self) -> int:
+        return max(0, self.requests - self.new_connections)
+
+    def to_dict(self) -> Dict:
+        return {
+            'host': self.host,
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'reused_connections': self.reused_connections,
+            'handshake_time': round(self.handshake_time, 4),
+            'avg_handshake_ms': round(self.handshake_time / self.new_connections * 1000, 1)
+            if self.new_connections else 0.0,
+            'errors': self.errors,
+        }
+
+
+class TransportStats:
+    """按 host 汇总的连接统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, HostStats] = {}
+
+    def _get(self, host: str) -> HostStats:
+        if host not in self._hosts:
+            self._hosts[host] = HostStats(host)
+        return self._hosts[host]
+
+    def record_connect(self, host: str, elapsed: float):
+        with self._lock:
+            stats = self._get(host)
+            stats.new_connections += 1
+            stats.handshake_time += elapsed
+
+    def record_request(self, host: str, ok: bool = True):
+        with self._lock:
+            stats = self._get(host)
+            stats.requests += 1
+            if not ok:
+                stats.errors += 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {host: stats.to_dict() for host, stats in self._hosts.items()}
+
+
+def _timed_pool_classes(stats: TransportStats) -> Dict[str, type]:
+    """生成会记录建连（TCP+TLS 握手）耗时的连接池类"""
+
+    class TimedHTTPConnection(HTTPConnection):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.record_connect(self.host, time.perf_counter() - start)
+
+    class TimedHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.record_connect(self.host, time.perf_counter() - start)
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+
+    return {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+class PooledAdapter(HTTPAdapter):
+    """使用计时连接池的 HTTPAdapter"""
+
+    def __init__(self, stats: TransportStats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _timed_pool_classes(self._stats)
+
+
+class HttpTransport:
+    """带连接池和统计的 HTTP 传输层"""
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.stats = TransportStats()
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        adapter = PooledAdapter(self.stats, pool_connections=pool_connections,
+                                pool_maxsize=pool_maxsize, pool_block=False)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """发送请求，未指定 timeout 时使用默认超时"""
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).hostname or ''
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.stats.record_request(host, ok=False)
+            raise
+        self.stats.record_request(host)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """按 host 返回连接统计"""
+        return self.stats.snapshot()
+
+    def print_stats(self):
+        """打印连接复用统计"""
+        stats = self.get_stats()
+        if not stats:
+            return
+        print("🔌 HTTP 连接统计:")
+        for host, item in stats.items():
+            print(f"  {host}: 请求 {item['requests']} 次, 新建连接 {item['new_connections']}, "
+                  f"复用 {item['reused_connections']}, 握手 {item['avg_handshake_ms']}ms/次")
+
+    def close(self):
+        self.session.close()
+
+
+_shared_transport: Optional[HttpTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """获取进程内共享的传输层实例"""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport()
+        return _shared_transport
+
+
+def configure_transport(**kwargs) -> HttpTransport:
+    """按指定参数（连接池大小、超时）重建共享传输层"""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is not None:
+            _shared_transport.close()
+        _shared_transport = HttpTransport(**kwargs)
+        return _shared_transport
+
+
+def set_transport(transport) -> Optional[HttpTransport]:
+    """
+    替换共享传输层（如换成 network.replay 的录制/回放传输层），返回原来的实例
+    只影响之后创建的采集器/推送器
+    """
+    global _shared_transport
+    with _shared_lock:
+        previous = _shared_transport
+        _shared_transport = transport
+        return previous
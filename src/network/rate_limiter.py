@@ -0,0 +1,33 @@
+"""
+全局限速器（令牌桶）
+多个工作线程共用一个实例，保证对同一上游的总请求速率不超过设定值
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """令牌桶限速：平均每秒 rate 次，允许 burst 次突发"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取一个令牌，不够时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,194 @@
+"""
+HTTP 录制/回放
+RecordingTransport 在真实请求的同时把每次交互（请求 + 响应）记下来，保存成 fixture 文件；
+ReplayTransport 读取 fixture，按同样的接口（get/post/request）返回录制的响应，完全不联网。
+
+匹配规则：
+- 请求键 = 方法 + path + 查询参数（去掉时间戳、回调名、签名这类每次都变的参数）
+- 先找键完全相同且还没用过的录制；找不到时按同一接口的录制顺序依次返回
+  （东方财富第一页的 sortEnd 取当前时间，回放时不可能与录制时相同）
+- 不比较 host：对着替身服务器录的 fixture 也能给默认地址的采集器回放
+- 同一接口的录制都用完后抛出 ConnectionError，和断网时采集器看到的一样
+
+access_token 等敏感参数在写入 fixture 前脱敏
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import sys
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from network.http_transport import HttpTransport, TransportStats
+from storage import json_codec
+
+# 每次请求都会变化、不参与匹配的参数
+VOLATILE_PARAMS = {'req_trace', '_', 'callback', 'timestamp', 'sign'}
+# 写入 fixture 前替换掉的敏感参数
+REDACTED_PARAMS = {'access_token'}
+# 录制时保留的响应头
+KEPT_HEADERS = ('Content-Type', 'Content-Encoding', 'Last-Modified', 'ETag')
+
+
+def _redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(key, '***' if key in REDACTED_PARAMS else value)
+             for key, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+def endpoint_of(method: str, url: str) -> str:
+    """接口标识：方法 + path"""
+    return f"{method.upper()} {urlsplit(url).path}"
+
+
+def request_key(method: str, url: str) -> str:
+    """请求键：接口标识 + 排序后的稳定查询参数"""
+    parts = urlsplit(url)
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if key not in VOLATILE_PARAMS and key not in REDACTED_PARAMS)
+    return f"{endpoint_of(method, url)}?{urlencode(query)}"
+
+
+def _full_url(url: str, params: Optional[Dict]) -> str:
+    """把 params 拼进 URL（与 requests 发出的 URL 一致）"""
+    if not params:
+        return url
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+class RecordingTransport(HttpTransport):
+    """真实请求 + 录制，用法与 HttpTransport 相同，结束后调用 save() 写出 fixture"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.exchanges: List[Dict] = []
+        self._record_lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        response = super().request(method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        sent_url = response.request.url if response.request is not None else _full_url(url, kwargs.get('params'))
+        exchange = {
+            'method': method.upper(),
+            'url': _redact_url(sent_url),
+            'key': request_key(method, sent_url),
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            'body': response.content.decode(response.encoding or 'utf-8', errors='replace'),
+            'elapsed': round(elapsed, 4),
+        }
+        with self._record_lock:
+            self.exchanges.append(exchange)
+        return response
+
+    def save(self, path) -> int:
+        """写出 fixture 文件，返回录制条数"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._record_lock:
+            exchanges = list(self.exchanges)
+        json_codec.dump_file(path, {'version': 1, 'exchanges': exchanges}, pretty=True)
+        return len(exchanges)
+
+
+class ReplayTransport:
+    """
+    从 fixture 回放的传输层（接口与 HttpTransport 相同，可直接替换给采集器/推送器）
+    replay_latency=True 时按录制时的耗时 sleep，用来复现真实的延迟分布
+    """
+
+    def __init__(self, exchanges: List[Dict], replay_latency: bool = False):
+        self.replay_latency = replay_latency
+        self.stats = TransportStats()
+        self.timeout = 0
+        self._lock = threading.Lock()
+        self._by_endpoint: Dict[str, Deque[Tuple[int, Dict]]] = {}
+        for index, exchange in enumerate(exchanges):
+            endpoint = endpoint_of(exchange['method'], exchange['url'])
+            self._by_endpoint.setdefault(endpoint, deque()).append((index, exchange))
+        self.unmatched = 0
+
+    @classmethod
+    def from_file(cls, path, replay_latency: bool = False) -> 'ReplayTransport':
+        data = json_codec.load_file(path)
+        return cls(data.get('exchanges', []), replay_latency=replay_latency)
+
+    def _take(self, method: str, url: str) -> Optional[Dict]:
+        endpoint = endpoint_of(method, url)
+        key = request_key(method, url)
+        with self._lock:
+            queue = self._by_endpoint.get(endpoint)
+            if not queue:
+                return None
+            # 先找键完全匹配的，再按录制顺序取下一条
+            chosen = None
+            for index, exchange in queue:
+                if exchange.get('key') == key:
+                    chosen = (index, exchange)
+                    break
+            if chosen is None:
+                chosen = queue[0]
+                self.unmatched += 1
+            queue.remove(chosen)
+            return chosen[1]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        full_url = _full_url(url, kwargs.get('params'))
+        host = urlsplit(full_url).hostname or ''
+        exchange = self._take(method, full_url)
+        if exchange is None:
+            self.stats.record_request(host, ok=False)
+            raise requests.exceptions.ConnectionError(f"没有可回放的录制: {endpoint_of(method, full_url)}")
+
+        if self.replay_latency and exchange.get('elapsed'):
+            time.sleep(exchange['elapsed'])
+
+        response = requests.Response()
+        response.status_code = exchange['status']
+        response.headers = CaseInsensitiveDict(exchange.get('headers', {}))
+        response._content = exchange.get('body', '').encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = full_url
+        response.request = requests.Request(method.upper(), full_url).prepare()
+        self.stats.record_request(host)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def remaining(self) -> int:
+        """还没被用到的录制条数"""
+        with self._lock:
+            return sum(len(queue) for queue in self._by_endpoint.values())
+
+    def get_stats(self) -> Dict[str, Dict]:
+        return self.stats.snapshot()
+
+    def print_stats(self):
+        stats = self.get_stats()
+        if not stats:
+            return
+        print("🔁 回放统计:")
+        for host, item in stats.items():
+            print(f"  {host}: 请求 {item['requests']} 次, 失败 {item['errors']}")
+        print(f"  按顺序匹配 {self.unmatched} 次，剩余录制 {self.remaining()} 条")
+
+    def close(self):
+        pass
@@ -0,0 +1,257 @@
+"""
+上游请求的尾延迟控制
+- Deadline：整次运行的截止时间，跨页传递，每个请求的超时都不超过剩余时间
+- RetryBudget：重试/对冲请求的令牌桶，按正常请求数的比例补充，防止上游故障时重试风暴
+- LatencyTracker：按接口保留最近的请求耗时，用 p95 作为对冲阈值
+- RequestPolicy：单页请求 = 墙钟超时 + 指数退避重试 + 可选对冲（超过 p95 仍未返回时再发一个相同请求，先到先用）
+
+只对幂等的 GET（翻页）使用对冲；钉钉推送等 POST 不经过这里
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Deque, Dict, Optional
+
+import requests
+
+# 单个请求默认超时（秒）
+DEFAULT_REQUEST_TIMEOUT = 15
+# 每页最多尝试次数（含第一次）
+DEFAULT_MAX_ATTEMPTS = 3
+# 退避：首次等待、倍数、上限（秒）
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_FACTOR = 2.0
+DEFAULT_BACKOFF_MAX = 4.0
+# 重试预算：每个正常请求补充的令牌 / 起始令牌
+DEFAULT_RETRY_RATIO = 0.2
+DEFAULT_RETRY_MIN_TOKENS = 3
+# 样本不足时的对冲阈值（秒），样本足够后用 p95
+DEFAULT_HEDGE_AFTER = 3.0
+HEDGE_MIN_SAMPLES = 5
+HEDGE_FLOOR = 0.2
+
+# 请求线程池：对冲时同时跑两个请求，墙钟超时后原请求在后台自然结束（受 socket 超时约束）
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='upstream')
+
+# 可重试的错误：网络错误、5xx（raise_for_status）、响应格式/接口错误码（ValueError）
+RETRYABLE_ERRORS = (requests.exceptions.RequestException, ValueError)
+
+
+class RequestAborted(Exception):
+    """不再继续发请求（采集器应停止翻页，游标不推进）"""
+
+
+class DeadlineExceeded(RequestAborted):
+    """剩余时间不足以再发一个请求"""
+
+
+class CircuitOpen(RequestAborted):
+    """数据源熔断中，请求被拦下"""
+
+
+class Deadline:
+    """截止时间（seconds=None 表示不限时）"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self._expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> float:
+        if self._expires_at is None:
+            return float('inf')
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: float) -> float:
+        """本次请求可用的超时：不超过 cap，也不超过剩余时间"""
+        return min(cap, self.remaining())
+
+
+class RetryBudget:
+    """重试/对冲令牌：一次运行内所有数据源共用"""
+
+    def __init__(self, ratio: float = DEFAULT_RETRY_RATIO, min_tokens: float = DEFAULT_RETRY_MIN_TOKENS):
+        self.ratio = ratio
+        self.tokens = float(min_tokens)
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.tokens += self.ratio
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class LatencyTracker:
+    """按接口记录最近 window 次成功请求的耗时"""
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, elapsed: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(elapsed)
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def seed(self, key: str, samples):
+        """用持久化的历史耗时预热（已有样本时不覆盖）"""
+        with self._lock:
+            if key not in self._samples and samples:
+                self._samples[key] = deque(samples, maxlen=self.window)
+
+    def hedge_delay(self, key: str, default: float) -> float:
+        p95 = self.percentile(key, 95)
+        return max(HEDGE_FLOOR, p95) if p95 is not None else default
+
+
+# 进程内共用的耗时记录：同一进程里后创建的采集器直接沿用已有样本
+_shared_tracker = LatencyTracker()
+
+
+class RequestPolicy:
+    """
+    单页请求的执行策略（每个数据源一个实例，截止时间和重试预算可在数据源之间共用）
+    用法: policy.call(lambda timeout: fetch(timeout), key='eastmoney')
+    fetch 抛出 RETRYABLE_ERRORS 中的异常时按退避重试；预算用完、次数用完或剩余时间不够时抛出最后一次的异常
+    传入 health（collectors.health_registry.SourceHealth）时，每次尝试的结果计入健康统计，熔断打开后直接抛出 CircuitOpen
+    """
+
+    def __init__(self, deadline: Optional[Deadline] = None, budget: Optional[RetryBudget] = None,
+                 tracker: Optional[LatencyTracker] = None,
+                 request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 hedge: bool = True, hedge_after: float = DEFAULT_HEDGE_AFTER, health=None):
+        self.deadline = deadline or Deadline()
+        self.budget = budget or RetryBudget()
+        self.tracker = tracker or _shared_tracker
+        self.request_timeout = request_timeout
+        self.max_attempts = max_attempts
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.health = health
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'hedges': 0,
+            'hedge_wins': 0,
+            'deadline_hits': 0,
+            'budget_exhausted': 0,
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _timed(self, fetch: Callable[[float], object], key: str, timeout: float):
+        start = time.monotonic()
+        result = fetch(timeout)
+        self.tracker.record(key, time.monotonic() - start)
+        return result
+
+    def _attempt(self, fetch: Callable[[float], object], key: str, timeout: float):
+        """一次尝试：墙钟超时 timeout；启用对冲时超过 p95 再发一个相同请求"""
+        self._count('requests')
+        self.budget.record_request()
+        primary = _executor.submit(self._timed, fetch, key, timeout)
+
+        hedge_delay = self.tracker.hedge_delay(key, self.hedge_after) if self.hedge else timeout
+        try:
+            return primary.result(timeout=min(hedge_delay, timeout))
+        except FutureTimeoutError:
+            pass
+
+        # 原请求的剩余时间；发出对冲请求时等到两者中较晚的超时
+        wait_until = time.monotonic() + timeout - hedge_delay
+        pending = {primary}
+        if self.hedge and hedge_delay < timeout and self.budget.try_spend():
+            self._count('hedges')
+            hedge_timeout = self.deadline.timeout(self.request_timeout)
+            pending.add(_executor.submit(self._timed, fetch, key, hedge_timeout))
+            wait_until = max(wait_until, time.monotonic() + hedge_timeout)
+
+        last_error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, wait_until - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if future is not primary:
+                    self._count('hedge_wins')
+                return result
+        if last_error is not None:
+            raise last_error
+        raise requests.exceptions.Timeout(f"请求超过 {timeout:.1f}s 未返回")
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(DEFAULT_BACKOFF_MAX, DEFAULT_BACKOFF_BASE * DEFAULT_BACKOFF_FACTOR ** (attempt - 1))
+        return delay * (0.5 + random.random() / 2)
+
+    def call(self, fetch: Callable[[float], object], key: str):
+        """执行一页请求，fetch 接收本次可用的超时（秒）"""
+        last_error = None
+        for attempt in range(1, self.max_attempts + 1):
+            timeout = self.deadline.timeout(self.request_timeout)
+            if timeout <= 0:
+                self._count('deadline_hits')
+                raise DeadlineExceeded(f"已到截止时间（{self.deadline.seconds}s）") from last_error
+            if self.health is not None and not self.health.allow_request():
+                raise CircuitOpen(f"{self.health.name} 熔断中，跳过请求") from last_error
+            start = time.monotonic()
+            try:
+                result = self._attempt(fetch, key, timeout)
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                if self.health is not None:
+                    self.health.record_failure(e)
+            else:
+                if self.health is not None:
+                    self.health.record_success(time.monotonic() - start)
+                return result
+
+            if attempt == self.max_attempts:
+                break
+            delay = self._backoff(attempt)
+            if delay >= self.deadline.remaining():
+                self._count('deadline_hits')
+                raise DeadlineExceeded(f"剩余时间不足以重试: {last_error}") from last_error
+            if not self.budget.try_spend():
+                self._count('budget_exhausted')
+                break
+            self._count('retries')
+            print(f"  🔁 {key} 第 {attempt} 次请求失败（{last_error}），{delay:.1f}s 后重试")
+            time.sleep(delay)
+        raise last_error
+
+    def sleep(self, seconds: float):
+        """翻页间隔：不超过剩余时间"""
+        seconds = min(seconds, self.deadline.remaining())
+        if seconds > 0:
+            time.sleep(seconds)
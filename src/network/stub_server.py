@@ -0,0 +1,377 @@
+"""
+本地替身服务器
+在本机端口上模拟采集器和推送器依赖的三个外部接口，离线即可测采集吞吐和延迟：
+- 东方财富 getFastNewsList：JSONP，按 sortEnd/pageSize 往前翻页
+- 财联社 updateTelegraphList：按 lastTime/rn 往前翻页，没有更早的数据时返回 304
+- 钉钉机器人 webhook：校验消息类型和关键词，返回 errcode
+
+可配置固定延迟 + 随机抖动，以及按比例注入的 5xx、接口错误码、断开连接
+"""
+
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import sys
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from storage import json_codec
+
+EASTMONEY_PATH = '/comm/web/getFastNewsList'
+CAILIANSHE_PATH = '/nodeapi/updateTelegraphList'
+DINGTALK_PATH = '/robot/send'
+
+WORDS = ['央行', '降准', '半导体', '芯片', '光伏', '新能源车', '券商', '银行', '黄金', '原油',
+         '人工智能', '算力', '医药', '白酒', '地产', '美联储', '利率', '出口', '订单', '业绩']
+
+
+def make_eastmoney_items(count: int, newest: Optional[float] = None, interval: int = 60,
+                         seed: int = 42) -> List[Dict]:
+    """生成东方财富原始快讯条目（realSort 为微秒时间戳，按时间倒序）"""
+    rng = random.Random(seed)
+    newest = newest if newest is not None else time.time() - interval
+    items = []
+    for i in range(count):
+        ts = newest - i * interval
+        headline = ''.join(rng.choice(WORDS) for _ in range(4))
+        body = ''.join(rng.choice(WORDS) for _ in range(30))
+        items.append({
+            'code': datetime.fromtimestamp(ts).strftime('%Y%m%d') + f"{i:010d}",
+            'image': [],
+            'pinglun_Num': rng.randint(0, 20),
+            'realSort': str(int(ts * 1000000)),
+            'share': rng.randint(0, 5),
+            'showTime': datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S'),
+            'stockList': [],
+            'summary': f"【{headline}{i}】{body}",
+            'title': f"{headline}{i}",
+            'titleColor': 0,
+        })
+    return items
+
+
+def make_cailianshe_items(count: int, newest: Optional[float] = None, interval: int = 30,
+                          seed: int = 42) -> List[Dict]:
+    """生成财联社原始电报条目（ctime 为秒级时间戳，按时间倒序）"""
+    rng = random.Random(seed)
+    newest = int(newest if newest is not None else time.time() - interval)
+    items = []
+    for i in range(count):
+        headline = ''.join(rng.choice(WORDS) for _ in range(4))
+        body = ''.join(rng.choice(WORDS) for _ in range(30))
+        items.append({
+            'id': 2000000 + count - i,
+            'ctime': newest - i * interval,
+            'title': '' if i % 3 else f"{headline}{i}",
+            'brief': f"【{headline}{i}】{body}",
+            'content': f"【{headline}{i}】{body}",
+            'shareurl': f"https://api3.cls.cn/share/article/{2000000 + count - i}",
+            'reading_num': rng.randint(0, 30000),
+            'comment_num': rng.randint(0, 10),
+            'share_num': rng.randint(0, 10),
+            'stock_list': [],
+            'subjects': [{'subject_name': rng.choice(WORDS)}] if i % 4 == 0 else [],
+        })
+    return items
+
+
+class StubConfig:
+    """延迟与错误注入配置（各比例取值 0~1）"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, api_error_rate: float = 0.0, drop_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency = latency                  # 每个响应的固定延迟（秒）
+        self.jitter = jitter                    # 额外的随机延迟上限（秒）
+        self.error_rate = error_rate            # 返回 error_status 的比例
+        self.error_status = error_status
+        self.api_error_rate = api_error_rate    # HTTP 200 但接口返回错误码的比例
+        self.drop_rate = drop_rate              # 不返回任何内容直接断开连接的比例
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self.rng.random() < rate
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.latency + (self.rng.random() * self.jitter if self.jitter else 0.0)
+
+
+class StubStats:
+    """按接口统计请求数和注入的故障（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: Dict[str, Dict[str, int]] = {}
+        self.messages: List[Dict] = []
+
+    def record(self, route: str, outcome: str):
+        with self._lock:
+            counter = self.routes.setdefault(route, {})
+            counter['requests'] = counter.get('requests', 0) + 1
+            counter[outcome] = counter.get(outcome, 0) + 1
+
+    def add_message(self, message: Dict):
+        with self._lock:
+            self.messages.append(message)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {route: dict(counter) for route, counter in self.routes.items()}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """请求处理：按路径分发到三个模拟接口"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FinanceNewsStub/1.0'
+    # 响应头和消息体攒到一次 flush 发出，并关闭 Nagle，避免和客户端的延迟 ACK 叠出 40ms 停顿
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def stub(self) -> 'StubServer':
+        return self.server.stub
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        if parts.path == EASTMONEY_PATH:
+            self._dispatch('eastmoney', lambda: self._eastmoney(query))
+        elif parts.path == CAILIANSHE_PATH:
+            self._dispatch('cailianshe', lambda: self._cailianshe(query))
+        else:
+            self._send(404, b'not found', 'text/plain')
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if parts.path == DINGTALK_PATH:
+            self._dispatch('dingtalk', lambda: self._dingtalk(body))
+        else:
+            self._send(404, b'not found', 'text/plain')
+
+    def _dispatch(self, route: str, handler):
+        config = self.stub.config
+        delay = config.delay()
+        if delay:
+            time.sleep(delay)
+
+        if config.roll(config.drop_rate):
+            self.stub.stats.record(route, 'dropped')
+            self.close_connection = True
+            return
+        if config.roll(config.error_rate):
+            self.stub.stats.record(route, 'http_error')
+            self._send(config.error_status, b'stub injected error', 'text/plain')
+            return
+
+        status, body, content_type, outcome = handler()
+        self.stub.stats.record(route, outcome)
+        self._send(status, body, content_type)
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        if status == 304:
+            # 304 不带消息体
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _eastmoney(self, query: Dict[str, str]):
+        callback = query.get('callback', 'jQuery')
+        if self.stub.config.roll(self.stub.config.api_error_rate):
+            payload = {'code': '-1', 'message': 'stub injected api error', 'data': None}
+            outcome = 'api_error'
+        else:
+            sort_end = int(query.get('sortEnd') or 0) or None
+            page_size = int(query.get('pageSize') or 50)
+            page = self.stub.eastmoney_page(sort_end, page_size)
+            payload = {'code': '1', 'message': 'success', 'data': {'fastNewsList': page}}
+            outcome = 'ok'
+        body = f"{callback}({json_codec.dumps_str(payload)})".encode('utf-8')
+        return 200, body, 'application/javascript; charset=utf-8', outcome
+
+    def _cailianshe(self, query: Dict[str, str]):
+        if self.stub.config.roll(self.stub.config.api_error_rate):
+            payload = {'error': 1, 'message': 'stub injected api error', 'data': {}}
+            return 200, json_codec.dumps(payload), 'application/json; charset=utf-8', 'api_error'
+        last_time = int(query.get('lastTime') or 0) or None
+        page_size = int(query.get('rn') or 20)
+        page = self.stub.cailianshe_page(last_time, page_size)
+        if not page:
+            return 304, b'', 'application/json', 'not_modified'
+        payload = {'error': 0, 'data': {'roll_data': page, 'update_num': len(page)}}
+        return 200, json_codec.dumps(payload), 'application/json; charset=utf-8', 'ok'
+
+    def _dingtalk(self, body: bytes):
+        if self.stub.config.roll(self.stub.config.api_error_rate):
+            payload = {'errcode': 130101, 'errmsg': 'send too fast, exceed 20 times per minute'}
+            return 200, json_codec.dumps(payload), 'application/json', 'api_error'
+        try:
+            message = json_codec.loads(body)
+        except json_codec.JSONDecodeError:
+            payload = {'errcode': 300001, 'errmsg': 'param error'}
+            return 200, json_codec.dumps(payload), 'application/json', 'bad_request'
+
+        msgtype = message.get('msgtype')
+        content = message.get(msgtype, {}) if msgtype else {}
+        text = content.get('text', '') if isinstance(content, dict) else ''
+        keywords = self.stub.dingtalk_keywords
+        if msgtype not in ('text', 'markdown', 'link', 'actionCard'):
+            payload = {'errcode': 40035, 'errmsg': 'msgtype invalid'}
+            outcome = 'bad_request'
+        elif keywords and not any(keyword in text for keyword in keywords):
+            # 钉钉自定义关键词校验不通过
+            payload = {'errcode': 310000, 'errmsg': 'keywords not in content'}
+            outcome = 'rejected'
+        else:
+            self.stub.stats.add_message(message)
+            payload = {'errcode': 0, 'errmsg': 'ok'}
+            outcome = 'ok'
+        return 200, json_codec.dumps(payload), 'application/json', outcome
+
+
+class StubServer:
+    """
+    本地替身服务器（后台线程运行）
+    用法:
+        with StubServer(config=StubConfig(latency=0.05)) as stub:
+            collector = EastMoneyCollector(base_url=stub.eastmoney_url)
+    """
+
+    def __init__(self, eastmoney_items: Optional[List[Dict]] = None,
+                 cailianshe_items: Optional[List[Dict]] = None,
+                 config: Optional[StubConfig] = None,
+                 dingtalk_keywords: Optional[List[str]] = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        if eastmoney_items is None:
+            eastmoney_items = make_eastmoney_items(1000)
+        if cailianshe_items is None:
+            cailianshe_items = make_cailianshe_items(1000)
+        # 两个数据源都按时间倒序保存，翻页时顺序扫描
+        self.eastmoney_items = sorted(eastmoney_items, key=lambda x: int(x.get('realSort', 0)), reverse=True)
+        self.cailianshe_items = sorted(cailianshe_items, key=lambda x: x.get('ctime', 0), reverse=True)
+        self.config = config or StubConfig()
+        self.dingtalk_keywords = ["财经快讯"] if dingtalk_keywords is None else dingtalk_keywords
+        self.stats = StubStats()
+
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def eastmoney_url(self) -> str:
+        return self.base_url + EASTMONEY_PATH
+
+    @property
+    def cailianshe_url(self) -> str:
+        return self.base_url + CAILIANSHE_PATH
+
+    @property
+    def dingtalk_url(self) -> str:
+        return self.base_url + DINGTALK_PATH + '?access_token=stub'
+
+    def eastmoney_page(self, sort_end: Optional[int], page_size: int) -> List[Dict]:
+        """sortEnd 之前（realSort 严格更小）的 page_size 条"""
+        page = []
+        for item in self.eastmoney_items:
+            if sort_end is None or int(item['realSort']) < sort_end:
+                page.append(item)
+                if len(page) >= page_size:
+                    break
+        return page
+
+    def cailianshe_page(self, last_time: Optional[int], page_size: int) -> List[Dict]:
+        """lastTime 之前（ctime 严格更小）的 page_size 条；不带 lastTime 时返回最新一页"""
+        page = []
+        for item in self.cailianshe_items:
+            if last_time is None or item['ctime'] < last_time:
+                page.append(item)
+                if len(page) >= page_size:
+                    break
+        return page
+
+    def publish(self, eastmoney_items: Optional[List[Dict]] = None,
+                cailianshe_items: Optional[List[Dict]] = None):
+        """追加新条目（模拟两次运行之间上游发布了新快讯）"""
+        if eastmoney_items:
+            self.eastmoney_items = sorted(self.eastmoney_items + list(eastmoney_items),
+                                          key=lambda x: int(x.get('realSort', 0)), reverse=True)
+        if cailianshe_items:
+            self.cailianshe_items = sorted(self.cailianshe_items + list(cailianshe_items),
+                                           key=lambda x: x.get('ctime', 0), reverse=True)
+
+    def start(self) -> 'StubServer':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='本地替身服务器（东方财富/财联社/钉钉）')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--count', type=int, default=1000, help='每个数据源的条目数')
+    parser.add_argument('--latency', type=float, default=0.0, help='固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='随机抖动上限（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='5xx 比例')
+    parser.add_argument('--api-error-rate', type=float, default=0.0, help='接口错误码比例')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='断开连接比例')
+    args = parser.parse_args()
+
+    config = StubConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        api_error_rate=args.api_error_rate, drop_rate=args.drop_rate)
+    server = StubServer(make_eastmoney_items(args.count), make_cailianshe_items(args.count),
+                        config=config, port=args.port)
+    print(f"🚀 替身服务器已启动: {server.base_url}")
+    print(f"  东方财富: {server.eastmoney_url}")
+    print(f"  财联社:   {server.cailianshe_url}")
+    print(f"  钉钉:     {server.dingtalk_url}")
+    try:
+        server.start()._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+        print("\n✅ 已停止")
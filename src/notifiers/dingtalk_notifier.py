@@ -8,10 +8,19 @@ import time
 import hashlib
 import base64
 import hmac
-import requests
 from urllib.parse import quote_plus
 import re
 
+import sys
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from network.http_transport import get_transport
+
 
 class DingTalkNotifier:
     """钉钉群机器人消息推送器 - 优化版"""
@@ -21,6 +30,7 @@ class DingTalkNotifier:
         self.secret = secret
         self.importance_threshold = importance_threshold
         self.keywords = keywords or ["财经快讯"]
+        self.transport = get_transport()
 
     def _generate_signature(self, timestamp):
         """生成钉钉要求的签名"""
@@ -148,6 +158,16 @@ class DingTalkNotifier:
 
         return content
 
+    def send_news_stream(self, news_iter):
+        """流式推送：上游每产出一条就判断并推送，返回成功推送条数"""
+        sent = 0
+        for news_item in news_iter:
+            if not self.should_send(news_item.get('importance', 5)):
+                continue
+            if self.send_news_direct(news_item):
+                sent += 1
+        return sent
+
     def send_news_alert(self, news_item, importance_score, sentiment, sentiment_emoji=None):
         """发送新闻提醒（兼容旧版）"""
         # 使用新的直接发送方法
@@ -169,7 +189,7 @@ class DingTalkNotifier:
 
             # 发送请求
             headers = {'Content-Type': 'application/json'}
-            response = requests.post(url, data=json.dumps(message), headers=headers, timeout=10)
+            response = self.transport.post(url, data=json.dumps(message), headers=headers, timeout=10)
 
             result = response.json()
 
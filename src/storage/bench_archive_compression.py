@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+归档压缩基准测试：用仓库里真实的归档对比缩进 JSON、紧凑 JSON、gzip、xz 的体积和读取速度，
+以及标签归一化（storage.tag_table，月归档现在的格式）之后的紧凑 JSON 和 xz
+读取 = 解压 + 解析（归一化格式再加上展开标签），和 tag_table.load_news 的路径一致
+运行方式：python bench_archive_compression.py [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径
+current_file = Path(__file__).resolve()
+src_dir = current_file.parent.parent
+project_root = src_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from storage import json_codec
+from storage.compression import compress, decompress, month_archives
+from storage.tag_table import expand_news, load_news, normalize_news
+
+
+def find_sample_files():
+    """选取最大的日归档和所有月归档"""
+    archive_dir = project_root / "data" / "archive"
+    files = []
+    daily = sorted(archive_dir.glob("20??-??-??.json"), key=lambda p: p.stat().st_size, reverse=True)
+    if daily:
+        files.append(daily[0])
+    files.extend(month_archives(archive_dir / "merged"))
+    return files
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_file(path, repeat, totals):
+    data = load_news(path)
+    normalized = normalize_news(data)
+    variants = {
+        '缩进JSON': json_codec.dumps(data, pretty=True),
+        '紧凑JSON': json_codec.dumps(data),
+    }
+    variants['gzip-9'] = compress(variants['紧凑JSON'], 'gz')
+    variants['xz-6'] = compress(variants['紧凑JSON'], 'xz')
+    variants['归一化JSON'] = json_codec.dumps(normalized)
+    variants['归一化xz-6'] = compress(variants['归一化JSON'], 'xz')
+    baseline = len(variants['缩进JSON'])
+
+    print(f"\n📄 {path.relative_to(project_root)} ({len(data)} 条)")
+    print(f"  {'格式':10} {'大小':>10} {'压缩比':>8} {'读取':>10} {'读取MB/s':>10} {'写入':>10}")
+    for name, raw in variants.items():
+        t_read = best_of(lambda: expand_news(json_codec.loads(decompress(raw))), repeat)
+        if name == '归一化JSON':
+            t_write = best_of(lambda: json_codec.dumps(normalize_news(data)), repeat)
+        elif name == '归一化xz-6':
+            t_write = best_of(lambda: compress(json_codec.dumps(normalize_news(data)), 'xz'), repeat)
+        elif name in ('gzip-9', 'xz-6'):
+            codec = 'gz' if name.startswith('gzip') else 'xz'
+            t_write = best_of(lambda: compress(json_codec.dumps(data), codec), repeat)
+        else:
+            t_write = best_of(lambda: json_codec.dumps(data, pretty=(name == '缩进JSON')), repeat)
+        # 吞吐按解压后的 JSON 大小计算
+        throughput = len(variants['紧凑JSON']) / 1024 / 1024 / t_read
+        print(f"  {name:10} {len(raw) / 1024 / 1024:8.2f}MB {baseline / len(raw):7.1f}x "
+              f"{t_read * 1000:8.1f}ms {throughput:10.1f} {t_write * 1000:8.1f}ms")
+        total = totals.setdefault(name, [0, 0.0])
+        total[0] += len(raw)
+        total[1] += t_read
+
+
+def main():
+    parser = argparse.ArgumentParser(description='归档压缩基准测试')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数，取最好成绩')
+    args = parser.parse_args()
+
+    files = find_sample_files()
+    if not files:
+        print("❌ 没有找到归档文件")
+        return
+    print(f"🔧 JSON 后端: {json_codec.get_backend().name}")
+
+    totals = {}
+    for path in files:
+        bench_file(path, args.repeat, totals)
+
+    baseline = totals['缩进JSON'][0]
+    print("\n📊 合计:")
+    for name, (size, t_read) in totals.items():
+        print(f"  {name:10} {size / 1024 / 1024:8.2f}MB {baseline / size:7.1f}x  读取 {t_read * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
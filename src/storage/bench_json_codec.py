@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+JSON 后端基准测试：用仓库里真实的归档文件对比各后端的解析/序列化速度
+运行方式：python bench_json_codec.py [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径
+current_file = Path(__file__).resolve()
+src_dir = current_file.parent.parent
+project_root = src_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from storage import json_codec
+from storage.compression import decompress, month_archives
+
+
+def find_sample_files():
+    """选取最大的日归档、月归档和 latest.json"""
+    archive_dir = project_root / "data" / "archive"
+    files = []
+    daily = sorted(archive_dir.glob("20??-??-??.json"), key=lambda p: p.stat().st_size, reverse=True)
+    if daily:
+        files.append(daily[0])
+    files.extend(month_archives(archive_dir / "merged"))
+    latest = project_root / "data" / "latest.json"
+    if latest.exists():
+        files.append(latest)
+    return files
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_file(path, backends, repeat):
+    raw = decompress(path.read_bytes())
+    if raw.startswith(b'\xef\xbb\xbf'):
+        raw = raw[3:]
+    size_mb = len(raw) / 1024 / 1024
+    data = json_codec.StdlibBackend().loads(raw)
+
+    print(f"\n📄 {path.relative_to(project_root)} ({size_mb:.2f} MB, {len(data)} 条)")
+    print(f"  {'后端':8} {'解析':>10} {'紧凑写':>10} {'缩进写':>10} {'紧凑大小':>10} {'解析MB/s':>10}")
+
+    for name, backend in backends.items():
+        t_load = best_of(lambda: backend.loads(raw), repeat)
+        t_compact = best_of(lambda: backend.dumps(data), repeat)
+        t_pretty = best_of(lambda: backend.dumps(data, pretty=True), repeat)
+        compact_size = len(backend.dumps(data)) / 1024 / 1024
+        print(f"  {name:8} {t_load * 1000:8.1f}ms {t_compact * 1000:8.1f}ms {t_pretty * 1000:8.1f}ms "
+              f"{compact_size:8.2f}MB {size_mb / t_load:10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 后端基准测试')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🚀 JSON 编解码基准测试")
+    print("=" * 60)
+
+    backends = json_codec.available_backends()
+    print(f"可用后端: {', '.join(backends)}（当前默认: {json_codec.get_backend().name}）")
+
+    files = find_sample_files()
+    if not files:
+        print("❌ 没有找到归档文件")
+        return
+
+    for path in files:
+        bench_file(path, backends, args.repeat)
+
+    print("\n" + "=" * 60)
+    print("✅ 测试完成！")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
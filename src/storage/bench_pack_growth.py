@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+仓库增长基准测试：模拟一个月的定时采集，每次运行后像工作流一样把 data/ 提交到 git，
+对比两种日归档布局下仓库的增长：
+- segments：当前布局，每次运行新增一个不可变的段文件，收盘时合并成日归档（storage.daily_log）
+- rewrite：每次运行把整天的 JSON 重写一遍（以前的做法）
+
+新闻来自已有的归档（按时间回放），每次运行取上次运行之后到本次运行时刻之间的新闻。
+输出：新闻本身的字节数、未打包对象的字节数（两次 gc 之间仓库实际增长的量，与每天运行次数成正比）、
+完整 repack 后的包大小（git 的 delta 压缩能把整天重写的各个版本压得很小，但 repack 本身要在
+几百个整天版本之间找 delta，很慢也很吃内存），以及包大小 / 新闻字节数。
+
+默认每次运行还会写 latest.json、热窗口、manifest/分片和全文检索索引（与正式运行一致），
+这些滚动输出每次都要提交，仓库增长主要在它们身上；--archive-only 时只写归档，单独看两种布局的差别（快得多）。
+
+运行方式：python bench_pack_growth.py [--days 30] [--runs-per-day 24] [--layout segments rewrite] [--archive-only]
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+# 添加 src 目录到 Python 路径
+current_file = Path(__file__).resolve()
+src_dir = current_file.parent.parent
+project_root = src_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from storage import json_codec
+from storage.compression import month_archives
+from storage.daily_log import DailyLog, archive_days, compact_closed_days
+from storage.month_archive import compact_expired_days
+from storage.site_publisher import load_day
+from storage.tag_table import load_news
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _sort_key(item: Dict) -> str:
+    return item.get('showTime', item.get('time', '')) or ''
+
+
+def load_source(archive_dir: Path) -> List[Dict]:
+    """已有归档里的全部新闻（日归档 + 月归档），按时间正序"""
+    news = []
+    for day in archive_days(archive_dir):
+        news.extend(load_day(archive_dir, day))
+    merged_dir = archive_dir / "merged"
+    if merged_dir.exists():
+        for path in month_archives(merged_dir):
+            news.extend(load_news(path))
+    news = [item for item in news if _sort_key(item)]
+    news.sort(key=_sort_key)
+    return news
+
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+
+def count_objects(repo: Path) -> Dict[str, int]:
+    """git count-objects -v 的结果（单位 KiB 的项换算成字节）"""
+    result = {}
+    for line in git(repo, 'count-objects', '-v').splitlines():
+        key, value = line.split(':', 1)
+        result[key.strip()] = int(value) * (1024 if key.strip() in ('size', 'size-pack') else 1)
+    return result
+
+
+def write_rewrite(archive_dir: Path, day: str, batch: List[Dict]):
+    """以前的做法：把当天的 JSON 整个读出来、合并、重写"""
+    path = archive_dir / f"{day}.json"
+    news_map = {item['title']: item for item in (json_codec.load_file(path) if path.exists() else [])}
+    for item in batch:
+        title = item.get('title', '')
+        if title and (title not in news_map or _sort_key(item) > _sort_key(news_map[title])):
+            news_map[title] = item
+    json_codec.dump_file(path, sorted(news_map.values(), key=_sort_key, reverse=True))
+
+
+def write_derived(data_dir: Path, batch: List[Dict], now: datetime, latest: List[Dict]):
+    """每次运行的其它输出（--archive-only 时不写）"""
+    from storage.hot_window import update_hot_windows
+    from storage.search_index import update_search_index
+    from storage.site_publisher import publish_site
+
+    json_codec.dump_file(data_dir / "latest.json", latest[:50])
+    update_hot_windows(data_dir, batch, now)
+    publish_site(data_dir, now.strftime("%Y-%m-%d"))
+    update_search_index(data_dir)
+
+
+def simulate(layout: str, source: List[Dict], start: datetime, days: int, runs_per_day: int,
+             full: bool) -> Dict:
+    repo = Path(tempfile.mkdtemp(prefix=f'pack-{layout}-'))
+    try:
+        data_dir = repo / "data"
+        archive_dir = data_dir / "archive"
+        archive_dir.mkdir(parents=True)
+        git(repo, 'init', '-q')
+        git(repo, 'config', 'user.name', 'bench')
+        git(repo, 'config', 'user.email', 'bench@example.com')
+        git(repo, 'config', 'gc.auto', '0')
+
+        step = timedelta(days=1) / runs_per_day
+        now = start + step
+        end = start + timedelta(days=days)
+        position = 0
+        news_bytes = 0
+        runs = 0
+        latest: List[Dict] = []
+        started = time.perf_counter()
+        while now <= end:
+            cutoff = now.strftime(TIME_FORMAT)
+            batch = []
+            while position < len(source) and _sort_key(source[position]) < cutoff:
+                batch.append(source[position])
+                position += 1
+            today = now.strftime("%Y-%m-%d")
+            news_bytes += sum(len(json_codec.dumps(item)) for item in batch)
+
+            if layout == 'segments':
+                _quiet(compact_closed_days, archive_dir, today)
+                DailyLog(archive_dir, today).append(batch)
+            else:
+                write_rewrite(archive_dir, today, batch)
+            _quiet(compact_expired_days, archive_dir, archive_dir / "merged", (now - timedelta(days=30)).date())
+            if full:
+                latest = sorted(batch + latest, key=_sort_key, reverse=True)[:50]
+                _quiet(write_derived, data_dir, batch, now, latest)
+
+            git(repo, 'add', '-A', 'data')
+            git(repo, 'commit', '-q', '--allow-empty', '-m', f'run {cutoff}')
+            runs += 1
+            now += step
+
+        loose = count_objects(repo)['size']
+        # 限制 delta 窗口内存：rewrite 布局下同一路径有上千个整天版本，不限制时 repack 会被 OOM 杀掉
+        git(repo, 'repack', '-a', '-d', '-f', '-q', '--window=250', '--depth=50', '--window-memory=256m')
+        packed = count_objects(repo)['size-pack']
+        return {
+            'layout': layout,
+            'runs': runs,
+            'news_bytes': news_bytes,
+            'loose_bytes': loose,
+            'pack_bytes': packed,
+            'elapsed': time.perf_counter() - started,
+        }
+    finally:
+        shutil.rmtree(repo, ignore_errors=True)
+
+
+def _quiet(func, *args):
+    """模拟时不打印各模块的进度信息"""
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='仓库增长基准测试')
+    parser.add_argument('--source-dir', default=str(project_root / "data" / "archive"),
+                        help='回放新闻的归档目录（默认 data/archive）')
+    parser.add_argument('--days', type=int, default=30, help='模拟的天数')
+    parser.add_argument('--runs-per-day', type=int, default=24, help='每天运行次数（正式工作流是 96）')
+    parser.add_argument('--layout', nargs='+', default=['segments', 'rewrite'], choices=['segments', 'rewrite'])
+    parser.add_argument('--archive-only', action='store_true',
+                        help='只写归档，不写 latest.json、热窗口、manifest 和检索索引')
+    args = parser.parse_args()
+    full = not args.archive_only
+
+    source = load_source(Path(args.source_dir))
+    if not source:
+        print(f"❌ {args.source_dir} 里没有可回放的新闻")
+        sys.exit(1)
+    # 回放最近 days 天（归档最密的一段）
+    start = datetime.strptime(_sort_key(source[-1])[:10], "%Y-%m-%d") - timedelta(days=args.days - 1)
+    print(f"📦 回放 {len(source)} 条新闻，从 {start:%Y-%m-%d} 起 {args.days} 天，每天 {args.runs_per_day} 次"
+          f"{'（完整输出）' if full else '（只写归档）'}")
+
+    print(f"\n{'布局':<10}{'运行':>6}{'新闻':>10}{'未打包对象':>12}{'repack 后':>12}{'每次增长':>10}{'包/新闻':>8}{'耗时':>8}")
+    for layout in args.layout:
+        result = simulate(layout, source, start, args.days, args.runs_per_day, full)
+        mb = 1024 * 1024
+        print(f"{layout:<10}{result['runs']:>6}{result['news_bytes'] / mb:>9.1f}M{result['loose_bytes'] / mb:>11.1f}M"
+              f"{result['pack_bytes'] / mb:>11.1f}M{result['pack_bytes'] / result['runs'] / 1024:>8.1f}KB"
+              f"{result['pack_bytes'] / max(1, result['news_bytes']):>8.2f}{result['elapsed']:>7.0f}s")
+
+
+if __name__ == "__main__":
+    main()
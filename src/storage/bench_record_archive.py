@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+随机访问副本基准测试：按 id 查找 / 取一个时间段，对比整文件读取月归档
+运行方式：python bench_record_archive.py [--merged-dir data/archive/merged] [--lookups 200]
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径
+current_file = Path(__file__).resolve()
+src_dir = current_file.parent.parent
+project_root = src_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from storage.compression import month_archives
+from storage.record_archive import RecordArchive, ensure_record_archive, record_paths
+from storage.tag_table import load_news
+
+
+def measure(func):
+    """返回 (结果, 耗时秒, 峰值内存字节)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_month(month_file: Path, lookups: int):
+    news, t_full, peak_full = measure(lambda: load_news(month_file))
+    base = ensure_record_archive(month_file)
+    rec_path, idx_path = record_paths(base)
+    print(f"\n📄 {month_file.name} ({len(news)} 条, {month_file.stat().st_size / 1024 / 1024:.2f} MB) → "
+          f"{rec_path.name} {rec_path.stat().st_size / 1024 / 1024:.2f} MB + 索引 {idx_path.stat().st_size / 1024:.0f} KB")
+    print(f"  整文件读取:     {t_full * 1000:8.1f}ms  峰值内存 {peak_full / 1024 / 1024:6.1f} MB")
+
+    sample = random.Random(0).sample(news, min(lookups, len(news)))
+    with RecordArchive(base) as archive:
+        found, t_get, peak_get = measure(lambda: sum(1 for item in sample if archive.get(item['id'])))
+        print(f"  按 id 查找:     {t_get / len(sample) * 1e6:8.1f}µs/次 峰值内存 {peak_get / 1024:6.0f} KB "
+              f"({found}/{len(sample)} 命中)")
+
+        # 取月中某一天 9:30-11:30 的新闻
+        day = sorted(item.get('showTime', item.get('time', '')) for item in news)[len(news) // 2][:10]
+        start, end = f"{day} 09:30", f"{day} 11:30"
+        count, t_scan, peak_scan = measure(lambda: sum(1 for _ in archive.scan(start, end)))
+        print(f"  时间段 {start}~{end[-5:]}: {t_scan * 1000:8.1f}ms  峰值内存 {peak_scan / 1024:6.0f} KB ({count} 条)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='随机访问副本基准测试')
+    parser.add_argument('--merged-dir', default=str(project_root / "data" / "archive" / "merged"))
+    parser.add_argument('--lookups', type=int, default=200, help='按 id 查找的次数')
+    args = parser.parse_args()
+
+    month_files = month_archives(args.merged_dir)
+    if not month_files:
+        print("❌ 没有找到月归档")
+        return
+    for month_file in month_files:
+        bench_month(month_file, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
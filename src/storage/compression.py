@@ -0,0 +1,126 @@
+"""
+归档压缩
+- 月归档（merged/YYYY-MM.json.xz）只给 Python 读，用 lzma 压缩，体积最小
+- 已收盘的日归档保留 YYYY-MM-DD.json，另写一个预压缩的 YYYY-MM-DD.json.gz 给静态网页
+  （月归档同样有一份 merged/YYYY-MM.json.gz 给网页的全库搜索用）
+  （浏览器用 DecompressionStream 解压，传输量小很多）；gzip 头里的时间戳固定为 0，内容不变时文件逐字节不变，不会产生多余的提交
+- 读取统一走 json_codec.load_file：按文件头的魔数识别 gzip / xz，调用方不用关心是否压缩
+
+读取某个归档时用 find_archive(目录, 名字) 找到实际存在的那个文件（.json / .json.xz / .json.gz）
+"""
+
+import gzip
+import lzma
+import os
+from pathlib import Path
+from typing import List, Optional, Union
+
+GZIP_MAGIC = b'\x1f\x8b'
+XZ_MAGIC = b'\xfd7zXZ\x00'
+
+# gzip 压缩级别（预压缩只做一次，用最高级别）
+GZIP_LEVEL = 9
+# lzma 预设：6 是默认值，9 对归档文件体积只再小 1-2%，压缩时间和内存翻几倍
+XZ_PRESET = 6
+
+# 归档文件可能的后缀，按读取优先级排列（未压缩的优先，方便手工修改后生效）
+ARCHIVE_SUFFIXES = ('.json', '.json.xz', '.json.gz')
+
+
+def decompress(data: bytes) -> bytes:
+    """按魔数解压 gzip / xz，不是压缩数据时原样返回"""
+    if data.startswith(GZIP_MAGIC):
+        return gzip.decompress(data)
+    if data.startswith(XZ_MAGIC):
+        return lzma.decompress(data)
+    return data
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """codec: 'gz' / 'xz'"""
+    if codec == 'gz':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if codec == 'xz':
+        return lzma.compress(data, preset=XZ_PRESET)
+    raise ValueError(f"不支持的压缩格式: {codec}")
+
+
+def codec_for(path: Union[str, Path]) -> Optional[str]:
+    """按后缀判断压缩格式：'gz' / 'xz'，未压缩返回 None"""
+    name = Path(path).name
+    if name.endswith('.gz'):
+        return 'gz'
+    if name.endswith('.xz'):
+        return 'xz'
+    return None
+
+
+def open_writer(path: Union[str, Path], codec: Optional[str] = None):
+    """打开一个二进制写入流，codec 为 'gz' / 'xz' 时边写边压缩（写临时文件时由调用方按目标文件名传入）"""
+    if codec == 'gz':
+        return gzip.GzipFile(str(path), 'wb', compresslevel=GZIP_LEVEL, mtime=0)
+    if codec == 'xz':
+        return lzma.open(str(path), 'wb', preset=XZ_PRESET)
+    return open(path, 'wb')
+
+
+def open_reader(path: Union[str, Path]):
+    """按后缀打开一个二进制读取流，压缩文件边读边解压（只看文件开头时不用整个解压）"""
+    codec = codec_for(path)
+    if codec == 'gz':
+        return gzip.open(str(path), 'rb')
+    if codec == 'xz':
+        return lzma.open(str(path), 'rb')
+    return open(path, 'rb')
+
+
+def find_archive(directory: Union[str, Path], name: str) -> Optional[Path]:
+    """目录下名为 name 的归档（name.json / name.json.xz / name.json.gz），都不存在时返回 None"""
+    directory = Path(directory)
+    for suffix in ARCHIVE_SUFFIXES:
+        path = directory / f"{name}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def month_archives(merged_dir: Union[str, Path]) -> List[Path]:
+    """merged/ 下每个月一个归档文件（同一个月有多种格式时按 find_archive 的优先级取一个），按月份排序"""
+    names = sorted({archive_name(path) for path in Path(merged_dir).glob("????-??.json*")})
+    return [find_archive(merged_dir, name) for name in names]
+
+
+def archive_name(path: Union[str, Path]) -> str:
+    """去掉归档后缀：2026-08.json.xz -> 2026-08"""
+    return Path(path).name.split('.', 1)[0]
+
+
+def gzip_sibling_path(json_path: Union[str, Path]) -> Path:
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.name + '.gz')
+
+
+def write_bytes_atomic(path: Union[str, Path], data: bytes):
+    """写临时文件后原子替换"""
+    path = Path(path)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def write_gzip_sibling(json_path: Union[str, Path]) -> int:
+    """给 JSON 文件写一个预压缩的 .json.gz（原子替换），返回压缩后字节数"""
+    json_path = Path(json_path)
+    with open(json_path, 'rb') as f:
+        compressed = compress(f.read(), 'gz')
+    write_bytes_atomic(gzip_sibling_path(json_path), compressed)
+    return len(compressed)
+
+
+def remove_with_sibling(json_path: Union[str, Path]):
+    """删除 JSON 文件和它的 .json.gz"""
+    json_path = Path(json_path)
+    for path in (json_path, gzip_sibling_path(json_path)):
+        if path.exists():
+            path.unlink()
@@ -0,0 +1,298 @@
+"""
+分段写入的日归档
+当天（未收盘）的归档是一个目录 data/archive/YYYY-MM-DD/，每次运行把真正的新条目写成一个新的段文件：
+
+    data/archive/2026-10-16/0001-3f2a9c81d0e4.jsonl
+    data/archive/2026-10-16/0002-a07be5c2913f.jsonl
+    ...
+
+段文件名是 序号-内容哈希，写一次之后不再修改（不可变、按内容寻址）。data/ 每 15 分钟提交一次，
+以前追加日志和去重索引每次都整个变成新版本，仓库每次增长的是整天的数据；
+现在每次只新增一个只含本次新闻的小文件，仓库增长与新闻量成正比。
+去重索引（标题 → 最新时间）不再落盘，打开时从当天的段重建（当天最多几 MB，毫秒级）。
+
+日期结束（下一天的第一次运行）时 compact() 把当天的段合并成原来的格式：
+按标题去重（保留时间更新的那条）、按时间倒序的 JSON 数组 YYYY-MM-DD.json（外加预压缩的 .json.gz），
+然后删除段目录；过期的日归档再按月合并进月归档（见 storage.month_archive）。
+
+崩溃安全：段文件先写临时文件、fsync 后原子替换，不会出现写了一半的段；
+append() 传入 GroupCommit 时新段只是暂存，与同一次运行的其它文件一起提交。
+上一版的追加日志（YYYY-MM-DD.jsonl + .idx.json）打开时转成第一个段。
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from storage import json_codec
+from storage.compression import remove_with_sibling, write_gzip_sibling
+
+SEGMENT_SUFFIX = '.jsonl'
+# 段文件名里内容哈希的长度
+SEGMENT_HASH_LENGTH = 12
+
+
+def _sort_key(item: Dict) -> str:
+    """与 run_github_action.news_sort_key 一致：优先 showTime，没有则用 time"""
+    return item.get('showTime', item.get('time', ''))
+
+
+def read_segment(path: Path) -> List[Dict]:
+    """读取一个段文件（JSON Lines），跳过无法解析的行"""
+    items = []
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json_codec.loads(line))
+            except json_codec.JSONDecodeError:
+                continue
+    return items
+
+
+class DailyLog:
+    """单日的段目录 + 内存里的去重索引"""
+
+    def __init__(self, archive_dir: Path, day: str):
+        self.archive_dir = Path(archive_dir)
+        self.day = day
+        self.segment_dir = self.archive_dir / day
+        self.json_path = self.archive_dir / f"{day}.json"
+        # 上一版的追加日志和去重索引
+        self.legacy_log_path = self.archive_dir / f"{day}.jsonl"
+        self.legacy_index_path = self.archive_dir / f"{day}.idx.json"
+        self._index: Optional[Dict[str, str]] = None
+
+    # ---------- 读取 ----------
+
+    def segments(self) -> List[Path]:
+        """当天的段文件，按序号排列"""
+        if not self.segment_dir.is_dir():
+            return []
+        return sorted(self.segment_dir.glob(f"*{SEGMENT_SUFFIX}"))
+
+    @property
+    def is_open(self) -> bool:
+        """当天是否还有未收盘的段（或上一版的追加日志）"""
+        return bool(self.segments()) or self.legacy_log_path.exists()
+
+    def _iter_log(self) -> Iterator[Dict]:
+        self._migrate_legacy_log()
+        for path in self.segments():
+            yield from read_segment(path)
+
+    def _load_index(self) -> Dict[str, str]:
+        if self._index is not None:
+            return self._index
+
+        self._migrate_legacy_json()
+        index = {}
+        for item in self._iter_log():
+            title = item.get('title', '')
+            if title and _sort_key(item) >= index.get(title, ''):
+                index[title] = _sort_key(item)
+        self._index = index
+        return index
+
+    def _migrate_legacy_log(self):
+        """上一版的追加日志（升级当天）转成第一个段"""
+        if not self.legacy_log_path.exists() or self.segments():
+            return
+        legacy = read_segment(self.legacy_log_path)
+        self._write_segment(self._encode_lines(legacy)[0])
+        for path in (self.legacy_log_path, self.legacy_index_path):
+            if path.exists():
+                path.unlink()
+        print(f"  🔄 追加日志 {self.legacy_log_path.name} 已转为段: {len(legacy)} 条")
+
+    def _migrate_legacy_json(self):
+        """当天已有 JSON 数组（更早的格式，或回补任务写过）时转成第一个段，之后统一按段写入"""
+        self._migrate_legacy_log()
+        if not self.json_path.exists() or self.segments():
+            return
+        try:
+            legacy = json_codec.load_file(self.json_path)
+        except Exception as e:
+            print(f"  ⚠️ 旧归档 {self.json_path.name} 读取失败，保留原文件: {e}")
+            return
+        # 旧文件按时间倒序，段按写入先后（时间正序）
+        self._write_segment(self._encode_lines(reversed(legacy))[0])
+        # 预压缩的 .json.gz 也要删掉，否则网页会一直读到旧内容
+        remove_with_sibling(self.json_path)
+        print(f"  🔄 旧归档 {self.json_path.name} 已转为段: {len(legacy)} 条")
+
+    @staticmethod
+    def _encode_lines(items: Iterable[Dict]) -> Tuple[bytes, int]:
+        """多条新闻编码成 JSON Lines，返回 (内容, 条数)"""
+        lines = [json_codec.dumps(item) for item in items]
+        return (b'\n'.join(lines) + b'\n' if lines else b''), len(lines)
+
+    def _segment_path(self, sequence: int, data: bytes) -> Path:
+        """段文件名：序号-内容哈希.jsonl"""
+        digest = hashlib.sha1(data).hexdigest()[:SEGMENT_HASH_LENGTH]
+        return self.segment_dir / f"{sequence:04d}-{digest}{SEGMENT_SUFFIX}"
+
+    def _next_segment_path(self, data: bytes) -> Path:
+        segments = self.segments()
+        sequence = int(segments[-1].name.split('-', 1)[0]) + 1 if segments else 1
+        return self._segment_path(sequence, data)
+
+    def _write_file(self, path: Path, data: bytes):
+        """临时文件 + fsync + 原子替换"""
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def _write_segment(self, data: bytes, commit=None) -> Optional[Path]:
+        """写一个新段（有 commit 时只暂存），没有内容时不写"""
+        if not data:
+            return None
+        path = self._next_segment_path(data)
+        if commit is not None:
+            commit.write_bytes(path, data)
+        else:
+            self._write_file(path, data)
+        return path
+
+    def replace_segment(self, path: Path, items: List[Dict]) -> Path:
+        """
+        用新内容替换一个已有的段（标签库更新后重打标签时用）：写一个同序号、新哈希的段，再删除旧段
+        段仍然不可变，只是换成另一个按内容寻址的文件
+        """
+        path = Path(path)
+        data = self._encode_lines(items)[0]
+        new_path = self._segment_path(int(path.name.split('-', 1)[0]), data)
+        if new_path != path:
+            self._write_file(new_path, data)
+            path.unlink()
+            self._index = None
+        return new_path
+
+    @property
+    def count(self) -> int:
+        """当天已归档的去重后条数"""
+        return len(self._load_index())
+
+    def time_range(self):
+        """(最早, 最新) 时间，没有数据时返回 None"""
+        index = self._load_index()
+        if not index:
+            return None
+        times = [t for t in index.values() if t]
+        return (min(times), max(times)) if times else None
+
+    # ---------- 写入 ----------
+
+    def append(self, items: Iterable[Dict], commit=None) -> int:
+        """
+        把新条目写成一个新段：标题没见过，或者同一标题但时间更新（与 merge_news_by_title 的取舍一致）
+        返回实际写入的条数；commit（GroupCommit）不为空时只暂存，由调用方提交
+        """
+        index = self._load_index()
+        fresh = {}
+        for item in items:
+            title = item.get('title', '')
+            if not title:
+                continue
+            sort_key = _sort_key(item)
+            if title in index and sort_key <= index[title]:
+                continue
+            if title in fresh and sort_key <= _sort_key(fresh[title]):
+                continue
+            fresh[title] = item
+
+        if not fresh:
+            return 0
+        # 段内按时间正序，整个目录读起来是时间线
+        data, written = self._encode_lines(sorted(fresh.values(), key=_sort_key))
+        self._write_segment(data, commit)
+        for title, item in fresh.items():
+            index[title] = _sort_key(item)
+        return written
+
+    def read_all(self) -> List[Dict]:
+        """读取当天全部新闻：按标题去重（保留时间更新的），按时间倒序"""
+        news_map: Dict[str, Dict] = {}
+        for item in self._iter_log():
+            title = item.get('title', '')
+            if not title:
+                continue
+            if title not in news_map or _sort_key(item) > _sort_key(news_map[title]):
+                news_map[title] = item
+        result = list(news_map.values())
+        result.sort(key=_sort_key, reverse=True)
+        return result
+
+    def remove(self):
+        """删除当天的段目录（和上一版的追加日志）"""
+        for path in self.segments():
+            path.unlink()
+        if self.segment_dir.is_dir() and not any(self.segment_dir.iterdir()):
+            self.segment_dir.rmdir()
+        for path in (self.legacy_log_path, self.legacy_index_path):
+            if path.exists():
+                path.unlink()
+        self._index = None
+
+    # ---------- 收盘整理 ----------
+
+    def compact(self) -> int:
+        """把当天的段合并成 YYYY-MM-DD.json（与已有的同日 JSON 合并），删除段目录，返回条数"""
+        self._migrate_legacy_log()
+        if not self.segments():
+            return 0
+        news = self.read_all()
+        if self.json_path.exists():
+            # 回补任务等写过同一天的 JSON：合并，同标题保留时间更新的
+            try:
+                existing = json_codec.load_file(self.json_path)
+            except Exception as e:
+                print(f"  ⚠️ {self.json_path.name} 读取失败，只保留段的内容: {e}")
+                existing = []
+            news_map = {item.get('title', ''): item for item in existing if item.get('title')}
+            for item in news:
+                title = item['title']
+                if title not in news_map or _sort_key(item) > _sort_key(news_map[title]):
+                    news_map[title] = item
+            news = sorted(news_map.values(), key=_sort_key, reverse=True)
+
+        if news:
+            temp_path = self.json_path.with_suffix('.tmp')
+            json_codec.dump_file(temp_path, news)
+            os.replace(temp_path, self.json_path)
+            # 收盘后内容不再变化，给静态网页预压缩一份
+            write_gzip_sibling(self.json_path)
+        self.remove()
+        return len(news)
+
+
+def open_days(archive_dir: Path) -> List[str]:
+    """还有未收盘的段目录（或上一版追加日志）的日期"""
+    archive_dir = Path(archive_dir)
+    days = {path.name for path in archive_dir.glob("20??-??-??") if path.is_dir()}
+    days.update(path.stem for path in archive_dir.glob("20??-??-??.jsonl"))
+    return sorted(days)
+
+
+def archive_days(archive_dir: Path) -> List[str]:
+    """archive 目录下所有有日归档（段目录 / .json / .json.gz）的日期"""
+    return sorted({path.name[:10] for path in Path(archive_dir).glob("20??-??-??*")})
+
+
+def compact_closed_days(archive_dir: Path, today: str) -> Dict[str, int]:
+    """整理 today 之前所有还是段格式的日归档，返回 {日期: 条数}"""
+    compacted = {}
+    for day in open_days(archive_dir):
+        if day >= today:
+            continue
+        count = DailyLog(archive_dir, day).compact()
+        compacted[day] = count
+        print(f"  📦 {day} 已收盘，段合并为 {day}.json: {count} 条")
+    return compacted
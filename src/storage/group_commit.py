@@ -0,0 +1,193 @@
+"""
+一次运行的输出文件成组提交（崩溃一致）
+一次运行会写 latest.json、当天归档的新段、游标 cursors.json、last_update.txt、月归档……
+以前是一步一步各自写，中途进程被杀时可能游标已经前进、归档却没写进去，这批新闻就永远丢了。
+
+GroupCommit 先把所有要写的内容暂存到目标文件旁边的 <文件名>.stage，commit() 时：
+1. 所有暂存文件统一 fsync（一组 fsync，而不是每个文件写完各自校验）
+2. 写日志 data/commit_journal.json（列出全部操作）并 fsync —— 这一步完成即视为提交
+3. 逐个应用操作：替换（os.replace）、追加（截到记录的偏移后追加暂存内容）、删除，再 fsync 目录
+4. 删除日志
+
+下次运行开始时 recover()：
+- 有日志：说明已经提交，重放全部操作（每个操作都可重复执行）—— 前滚
+- 没有日志但有 .stage 文件：说明提交前崩溃，删除暂存文件 —— 回滚
+
+不需要成组的场景（命令行工具、回补任务）仍然各自原子写入。
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from storage import json_codec
+
+JOURNAL_NAME = "commit_journal.json"
+STAGE_SUFFIX = '.stage'
+
+
+def _fsync_file(path: Path):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(directory: Path):
+    """fsync 目录，让 rename/unlink 落盘（不支持目录 fsync 的平台上跳过）"""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def stage_path(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + STAGE_SUFFIX)
+
+
+class GroupCommit:
+    """暂存一批文件操作，commit() 时一起落盘（data_dir 下的文件都可以加入）"""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.journal_path = self.data_dir / JOURNAL_NAME
+        self.ops: List[Dict] = []
+        self.stats = {'commits': 0, 'files': 0}
+
+    def _relative(self, path: Path) -> str:
+        return Path(path).resolve().relative_to(self.data_dir.resolve()).as_posix()
+
+    def _absolute(self, relative: str) -> Path:
+        return self.data_dir / relative
+
+    # ---------- 暂存 ----------
+
+    def stage(self, path: Union[str, Path]) -> Path:
+        """登记一个整文件替换，返回暂存文件路径，由调用方写入内容（流式写大文件时用）"""
+        path = Path(path)
+        staged = stage_path(path)
+        relative = self._relative(path)
+        # 同一个文件在一次提交里只保留最后一次写入
+        self.ops = [op for op in self.ops if not (op['op'] == 'replace' and op['path'] == relative)]
+        self.ops.append({'op': 'replace', 'path': relative})
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return staged
+
+    def write_bytes(self, path: Union[str, Path], data: bytes):
+        with open(self.stage(path), 'wb') as f:
+            f.write(data)
+
+    def write_json(self, path: Union[str, Path], obj, pretty: bool = False):
+        self.write_bytes(path, json_codec.dumps(obj, pretty=pretty))
+
+    def append_bytes(self, path: Union[str, Path], data: bytes, offset: int):
+        """登记一次追加：提交时先截到 offset（追加前的长度）再写入，重放时不会重复追加"""
+        path = Path(path)
+        relative = self._relative(path)
+        if any(op['path'] == relative for op in self.ops):
+            raise ValueError(f"{path.name} 在同一次提交里只能追加一次")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(stage_path(path), 'wb') as f:
+            f.write(data)
+        self.ops.append({'op': 'append', 'path': relative, 'offset': offset})
+
+    def delete(self, path: Union[str, Path]):
+        self.ops.append({'op': 'delete', 'path': self._relative(path)})
+
+    def __len__(self):
+        return len(self.ops)
+
+    # ---------- 提交 ----------
+
+    def commit(self) -> int:
+        """提交暂存的全部操作，返回操作数"""
+        if not self.ops:
+            return 0
+        for op in self.ops:
+            if op['op'] != 'delete':
+                _fsync_file(stage_path(self._absolute(op['path'])))
+
+        temp_path = self.journal_path.with_suffix('.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(json_codec.dumps({'ops': self.ops}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+        _fsync_dir(self.data_dir)
+
+        count = len(self.ops)
+        _apply(self.data_dir, self.ops)
+        self.journal_path.unlink()
+        _fsync_dir(self.data_dir)
+        self.stats['commits'] += 1
+        self.stats['files'] += count
+        self.ops = []
+        return count
+
+    def abort(self):
+        """放弃暂存的操作"""
+        for op in self.ops:
+            staged = stage_path(self._absolute(op['path']))
+            if op['op'] != 'delete' and staged.exists():
+                staged.unlink()
+        self.ops = []
+
+
+def _apply(data_dir: Path, ops: List[Dict]):
+    """应用日志里的操作；每个操作都可重复执行（暂存文件在操作完成后才删除）"""
+    directories = set()
+    for op in ops:
+        path = data_dir / op['path']
+        staged = stage_path(path)
+        if op['op'] == 'replace':
+            if staged.exists():
+                os.replace(staged, path)
+        elif op['op'] == 'append':
+            if staged.exists():
+                with open(staged, 'rb') as f:
+                    data = f.read()
+                with open(path, 'ab') as f:
+                    f.truncate(op['offset'])
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                staged.unlink()
+        elif op['op'] == 'delete':
+            if path.exists():
+                path.unlink()
+        directories.add(path.parent)
+    for directory in directories:
+        _fsync_dir(directory)
+
+
+def recover(data_dir: Path) -> Optional[str]:
+    """
+    上次运行中断后的恢复，返回 'forward'（重放了已提交的操作）/ 'back'（丢弃了未提交的暂存文件）/ None
+    """
+    data_dir = Path(data_dir)
+    journal_path = data_dir / JOURNAL_NAME
+    result = None
+    if journal_path.exists():
+        try:
+            ops = json_codec.load_file(journal_path)['ops']
+        except Exception as e:
+            # 日志是原子替换写入的，读不出来只可能是被手工改坏了，不重放
+            print(f"⚠️ 提交日志读取失败，丢弃: {e}")
+            ops = None
+        if ops is not None:
+            _apply(data_dir, ops)
+            result = 'forward'
+        journal_path.unlink()
+        _fsync_dir(data_dir)
+
+    stray = list(data_dir.rglob(f"*{STAGE_SUFFIX}")) if data_dir.exists() else []
+    for path in stray:
+        path.unlink()
+    if stray and result is None:
+        result = 'back'
+    return result
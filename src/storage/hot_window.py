@@ -0,0 +1,156 @@
+"""
+热窗口：最近 24 小时的新闻（data/feeds/hot-24h.json）
+网页默认显示最近 12 小时，latest.json 只有最近 50 条，以前首屏要拉清单再拉十几个小时分片；
+现在首屏只拉一个 hot-24h.json，12 小时 / 24 小时都由网页按时间过滤（filterByTimeRange），不再各写一个文件。
+
+每次运行增量维护，不扫描归档：
+- 窗口文件就是状态，读进来后按时间正序保存在内存
+- 早于窗口起点的条目从头部一次切掉，新条目按时间二分插入，同一标题保留时间更新的那条
+- 写出按时间倒序的 JSON 数组，每条只留网页渲染用到的字段（FEED_FIELDS，不带 raw_data 等原始字段）
+
+窗口文件不存在或读不出来时（第一次运行）从今天和昨天的日归档初始化一次。
+窗口起点按北京时间算（与 showTime 一致），不受运行机器时区影响。
+"""
+
+import bisect
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from storage import json_codec
+from storage.compression import write_bytes_atomic
+from storage.news_time import beijing_now
+
+# 窗口小时数
+HOT_HOURS = 24
+# 以前单独写的短窗口文件，运行时删掉
+LEGACY_FEEDS = ('1h', '12h')
+# 网页渲染用到的字段（js/news-core.js mergeNews / js/utils.js）
+FEED_FIELDS = ('id', 'code', 'title', 'showTime', 'time', 'full_content', 'tags')
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _sort_key(item: Dict) -> str:
+    """与 run_github_action.news_sort_key 一致：优先 showTime，没有则用 time"""
+    return item.get('showTime', item.get('time', '')) or ''
+
+
+def feed_path(data_dir: Path, name: str = f"{HOT_HOURS}h") -> Path:
+    return Path(data_dir) / "feeds" / f"hot-{name}.json"
+
+
+def feed_item(item: Dict) -> Dict:
+    """只留网页用到的字段；没有 full_content 时用 content（网页同样这样回退）"""
+    projected = {key: item[key] for key in FEED_FIELDS if key in item}
+    if not projected.get('full_content') and item.get('content'):
+        projected['full_content'] = item['content']
+    return projected
+
+
+class HotWindow:
+    """按时间正序维护窗口内的新闻，写出窗口文件"""
+
+    def __init__(self, data_dir: Path, hours: int = HOT_HOURS):
+        self.data_dir = Path(data_dir)
+        self.hours = hours
+        self.path = feed_path(self.data_dir, f"{hours}h")
+        self.items: List[Dict] = []
+        self.titles: Dict[str, str] = {}
+        self.stats = {'kept': 0, 'inserted': 0, 'evicted': 0, 'seeded': 0}
+
+    def load(self) -> bool:
+        """读入窗口文件，文件不存在或读取失败时返回 False"""
+        path = self.path
+        if not path.exists():
+            return False
+        try:
+            items = json_codec.load_file(path)
+        except Exception as e:
+            print(f"  ⚠️ {path.name} 读取失败，从归档重建: {e}")
+            return False
+        self.items = sorted(items, key=_sort_key)
+        self.titles = {item['title']: _sort_key(item) for item in self.items if item.get('title')}
+        self.stats['kept'] = len(self.items)
+        return True
+
+    def seed(self, now: datetime):
+        """从今天和昨天的日归档初始化（只在窗口文件不存在时做一次）"""
+        from storage.site_publisher import load_day
+
+        archive_dir = self.data_dir / "archive"
+        for days_ago in (1, 0):
+            day = (now - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+            self.stats['seeded'] += self.insert(load_day(archive_dir, day))
+        self.stats['inserted'] = 0
+
+    def insert(self, news: Iterable[Dict]) -> int:
+        """二分插入新条目（同一标题保留时间更新的），返回插入条数"""
+        inserted = 0
+        for item in news:
+            title = item.get('title', '')
+            sort_time = _sort_key(item)
+            if not title:
+                continue
+            if title in self.titles:
+                if sort_time <= self.titles[title]:
+                    continue
+                self._remove(title)
+            bisect.insort(self.items, feed_item(item), key=_sort_key)
+            self.titles[title] = sort_time
+            inserted += 1
+        self.stats['inserted'] += inserted
+        return inserted
+
+    def _remove(self, title: str):
+        sort_time = self.titles.pop(title)
+        i = bisect.bisect_left(self.items, sort_time, key=_sort_key)
+        while i < len(self.items) and _sort_key(self.items[i]) == sort_time:
+            if self.items[i].get('title') == title:
+                del self.items[i]
+                return
+            i += 1
+
+    def evict(self, now: datetime) -> int:
+        """切掉早于窗口起点的条目，返回切掉的条数"""
+        cutoff = (now - timedelta(hours=self.hours)).strftime(TIME_FORMAT)
+        count = bisect.bisect_left(self.items, cutoff, key=_sort_key)
+        for item in self.items[:count]:
+            self.titles.pop(item.get('title', ''), None)
+        del self.items[:count]
+        self.stats['evicted'] += count
+        return count
+
+    def write(self, commit=None) -> int:
+        """写出窗口文件（按时间倒序，有 commit 时暂存），删掉以前的短窗口文件，返回条数"""
+        news = self.items[::-1]
+        if commit is not None:
+            commit.write_json(self.path, news)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_bytes_atomic(self.path, json_codec.dumps(news))
+        for name in LEGACY_FEEDS:
+            legacy_path = feed_path(self.data_dir, name)
+            if legacy_path.exists():
+                if commit is not None:
+                    commit.delete(legacy_path)
+                else:
+                    legacy_path.unlink()
+        return len(news)
+
+
+def update_hot_windows(data_dir: Path, news: List[Dict], now: Optional[datetime] = None,
+                       commit=None) -> Dict[str, int]:
+    """
+    本次运行的新条目并入热窗口并写出窗口文件（有 commit 时暂存，随本次运行一起提交）
+    now 默认是当前北京时间；返回统计：窗口条数（window）、插入/淘汰条数、初始化条数
+    """
+    now = now or beijing_now()
+    hot = HotWindow(data_dir)
+    if not hot.load():
+        hot.seed(now)
+    # 先插入再淘汰：本次采集到的过期条目（接口晚返回的旧新闻）也不会写进窗口
+    hot.insert(news)
+    hot.evict(now)
+    total = hot.write(commit)
+    return {**hot.stats, 'window': total}
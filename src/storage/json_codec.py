@@ -0,0 +1,168 @@
+"""
+可插拔 JSON 编解码层
+安装了加速库（orjson / ujson）时自动使用，否则回退到标准库 json
+机器读取的数据文件（latest.json、日归档、月归档、游标等）默认紧凑输出，
+需要人工查看/编辑的文件（如 tags.json）传 pretty=True 保留缩进
+
+可通过环境变量 NEWS_JSON_BACKEND=orjson|ujson|json 强制指定后端
+load_file 自动识别 gzip / xz 压缩的文件（见 storage.compression）
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Union
+
+from storage.compression import decompress
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def _default(obj: Any) -> Any:
+    """序列化非内置类型：带 to_dict() 的记录对象（如 NewsRecord）按字典输出"""
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    raise TypeError(f"无法序列化类型: {type(obj).__name__}")
+
+
+class StdlibBackend:
+    """标准库 json"""
+
+    name = 'json'
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            text = json.dumps(obj, ensure_ascii=False, indent=2, default=_default)
+        else:
+            text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default)
+        return text.encode('utf-8')
+
+
+class OrjsonBackend:
+    """orjson：Rust 实现，直接输出 UTF-8 字节"""
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._fallback = StdlibBackend()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        option = self._orjson.OPT_INDENT_2 if pretty else 0
+        try:
+            return self._orjson.dumps(obj, default=_default, option=option)
+        except TypeError:
+            # 超过 64 位的整数、非字符串键等 orjson 不支持的情况
+            return self._fallback.dumps(obj, pretty=pretty)
+
+
+class UjsonBackend:
+    """ujson：C 实现"""
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+        self._fallback = StdlibBackend()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return self._ujson.loads(data)
+        except ValueError as e:
+            # 统一抛出标准库的异常类型，调用方只需捕获 JSONDecodeError
+            raise JSONDecodeError(str(e), data if isinstance(data, str) else '', 0) from e
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        try:
+            text = self._ujson.dumps(obj, ensure_ascii=False, indent=2 if pretty else 0,
+                                     escape_forward_slashes=False, default=_default)
+        except (OverflowError, TypeError):
+            return self._fallback.dumps(obj, pretty=pretty)
+        return text.encode('utf-8')
+
+
+BACKENDS = {
+    'orjson': OrjsonBackend,
+    'ujson': UjsonBackend,
+    'json': StdlibBackend,
+}
+
+# 自动选择时的优先顺序
+PREFERENCE = ('orjson', 'ujson', 'json')
+
+
+def available_backends() -> Dict[str, object]:
+    """返回当前环境可用的全部后端实例"""
+    result = {}
+    for name in PREFERENCE:
+        try:
+            result[name] = BACKENDS[name]()
+        except ImportError:
+            continue
+    return result
+
+
+def _select_backend():
+    requested = os.environ.get('NEWS_JSON_BACKEND', '').strip().lower()
+    if requested:
+        if requested not in BACKENDS:
+            raise ValueError(f"未知的 JSON 后端: {requested}")
+        return BACKENDS[requested]()
+    for name in PREFERENCE:
+        try:
+            return BACKENDS[name]()
+        except ImportError:
+            continue
+    return StdlibBackend()
+
+
+_backend = _select_backend()
+
+
+def get_backend():
+    """当前使用的后端"""
+    return _backend
+
+
+def set_backend(name: str):
+    """切换后端（基准测试用）"""
+    global _backend
+    _backend = BACKENDS[name]()
+    return _backend
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    return _backend.loads(data)
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """序列化为 UTF-8 字节，不转义中文"""
+    return _backend.dumps(obj, pretty=pretty)
+
+
+def dumps_str(obj: Any, pretty: bool = False) -> str:
+    return dumps(obj, pretty=pretty).decode('utf-8')
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """整文件读取并解析（兼容带 BOM 的文件、gzip / xz 压缩的文件）"""
+    with open(path, 'rb') as f:
+        data = decompress(f.read())
+    if data.startswith(b'\xef\xbb\xbf'):
+        data = data[3:]
+    return _backend.loads(data)
+
+
+def dump_file(path: Union[str, Path], obj: Any, pretty: bool = False):
+    """整文件写入（不做原子替换，需要时由调用方先写临时文件）"""
+    with open(path, 'wb') as f:
+        f.write(_backend.dumps(obj, pretty=pretty))
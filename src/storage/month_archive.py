@@ -0,0 +1,233 @@
+"""
+月归档整理
+把过期的日归档（data/archive/YYYY-MM-DD.json）按月分组，每个月只做一次 k 路归并：
+月文件和各个日文件本身都已按时间倒序，heapq.merge 逐条流式合并，按标题去重后直接写出，
+每个月文件只读一次、原子写一次，不再每合并一天就重读、重排、重写整个月文件。
+月文件只给 Python 读，用 lzma 压缩写成 merged/YYYY-MM.json.xz，标签按归一化格式存（见 storage.tag_table）；
+已有的未压缩、或还是数组格式的月文件会被转换。
+每次写月文件时同时生成按记录随机访问的副本 YYYY-MM.rec + .rec.idx（见 storage.record_archive）
+和给网页全库搜索用的 YYYY-MM.json.gz（浏览器不能解 xz）。
+
+传入 GroupCommit 时，每个月的月文件、网页副本和被并入文件的删除成组提交（一个月一次），
+中途崩溃不会出现月文件还是旧的、日文件却已删除的情况；.rec 副本在提交后生成（过期时会自动重建）。
+
+去重规则与 merge_news_by_title 一致：同一标题保留时间更新的那条，时间相同时保留先合并进来的
+（月文件优先，其次日期更早的日文件）。
+"""
+
+import heapq
+import os
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from storage import json_codec
+from storage.compression import (archive_name, codec_for, compress, find_archive, gzip_sibling_path, open_reader,
+                                 open_writer, remove_with_sibling, write_bytes_atomic)
+from storage.record_archive import ensure_record_archive
+from storage.tag_table import load_news, write_normalized
+
+# 月归档的文件后缀（xz 压缩）
+MONTH_ARCHIVE_SUFFIX = '.json.xz'
+
+
+def _sort_key(item: Dict) -> str:
+    """与 run_github_action.news_sort_key 一致：优先 showTime，没有则用 time"""
+    return item.get('showTime', item.get('time', ''))
+
+
+def _load_sorted(path: Path, stats: Dict[str, int]) -> List[Dict]:
+    """读入一个归档文件，统计读取字节数；不是按时间倒序时（老文件）先排序"""
+    stats['bytes_read'] += path.stat().st_size
+    news = load_news(path)
+    if any(_sort_key(news[i]) < _sort_key(news[i + 1]) for i in range(len(news) - 1)):
+        news.sort(key=_sort_key, reverse=True)
+    return news
+
+
+def _merge_unique(sources: List[List[Dict]]) -> Iterator[Dict]:
+    """k 路归并（时间倒序），同一标题只保留第一次出现的，也就是时间最新的那条"""
+    seen = set()
+    for item in heapq.merge(*sources, key=_sort_key, reverse=True):
+        title = item.get('title', '')
+        if not title or title in seen:
+            continue
+        seen.add(title)
+        yield item
+
+
+def _write_stream(path: Path, items: Iterator[Dict], commit=None) -> Tuple[int, int]:
+    """
+    逐条写出归一化格式的月文件（按后缀压缩）到临时文件后原子替换，返回 (条数, 写入磁盘的字节数)
+    commit（GroupCommit）不为空时写到暂存文件，由调用方提交
+    """
+    temp_path = commit.stage(path) if commit is not None else path.with_name(path.name + '.tmp')
+    with open_writer(temp_path, codec_for(path)) as f:
+        count, _ = write_normalized(f, items)
+    size = temp_path.stat().st_size
+    if commit is None:
+        os.replace(temp_path, path)
+    return count, size
+
+
+def _write_site_copy(month_file: Path, news: List[Dict], commit=None):
+    """给网页的 .json.gz；失败不影响月文件本身（manifest 发布时会补写缺失的副本）"""
+    try:
+        data = compress(json_codec.dumps(news), 'gz')
+        if commit is not None:
+            commit.write_bytes(site_copy_path(month_file), data)
+        else:
+            write_bytes_atomic(site_copy_path(month_file), data)
+    except Exception as e:
+        print(f"    ⚠️ {month_file.name} 的网页副本生成失败: {e}")
+
+
+def _write_record_copy(month_file: Path, news: List[Dict]):
+    """随机访问副本（.rec/.rec.idx）；失败时在下次查询时由 ensure_record_archive 重建"""
+    try:
+        ensure_record_archive(month_file, news)
+    except Exception as e:
+        print(f"    ⚠️ {month_file.name} 的随机访问副本生成失败: {e}")
+
+
+def rewrite_month(month_file: Path, news: List[Dict]) -> int:
+    """用新内容重写一个月文件（顺序不变，如重打标签后）并更新网页副本和随机访问副本，返回写入字节数"""
+    _, size = _write_stream(month_file, iter(news))
+    _write_site_copy(month_file, news)
+    _write_record_copy(month_file, news)
+    return size
+
+
+def is_normalized(month_file: Path) -> bool:
+    """月文件是否已是归一化格式（只解压开头一个字节：数组是 '['，归一化格式是 '{'）"""
+    with open_reader(month_file) as f:
+        return f.read(1) == b'{'
+
+
+def site_copy_path(month_file: Path) -> Path:
+    """merged/2026-08.json.xz -> merged/2026-08.json.gz"""
+    return month_file.with_name(archive_name(month_file) + '.json.gz')
+
+
+def expired_days_by_month(archive_dir: Path, cutoff_date: date) -> Dict[str, List[Path]]:
+    """cutoff_date 之前的日归档，按月份分组（组内按日期升序）"""
+    months: Dict[str, List[Path]] = defaultdict(list)
+    for daily_file in sorted(Path(archive_dir).glob("20??-??-??.json")):
+        try:
+            file_date = datetime.strptime(daily_file.stem, "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        if file_date < cutoff_date:
+            months[daily_file.stem[:7]].append(daily_file)
+    return dict(months)
+
+
+def compact_month(merged_dir: Path, month: str, daily_files: List[Path], stats: Dict[str, int],
+                  commit=None) -> int:
+    """
+    把若干日文件并入一个月文件（一次读、一次写），成功后删除日文件，返回月文件条数
+    commit（GroupCommit）不为空时月文件、网页副本和删除在这里成组提交
+    """
+    sources = []
+    existing = find_archive(merged_dir, month)
+    if existing is not None:
+        try:
+            sources.append(_load_sorted(existing, stats))
+        except Exception as e:
+            # 月文件坏了不能覆盖，否则会丢掉整月数据
+            print(f"    ⚠️ 月文件 {existing.name} 读取失败，本月跳过: {e}")
+            return -1
+
+    merged_days = []
+    for daily_file in daily_files:
+        try:
+            sources.append(_load_sorted(daily_file, stats))
+            merged_days.append(daily_file)
+        except Exception as e:
+            print(f"    ⚠️ {daily_file.name} 读取失败，跳过: {e}")
+
+    if not merged_days:
+        return -1
+
+    month_file = merged_dir / f"{month}{MONTH_ARCHIVE_SUFFIX}"
+    merged = list(_merge_unique(sources))
+    count, size = _write_stream(month_file, iter(merged), commit)
+    stats['bytes_written'] += size
+    _write_site_copy(month_file, merged, commit)
+    if commit is not None:
+        if existing is not None and existing != month_file:
+            commit.delete(existing)
+        for daily_file in merged_days:
+            commit.delete(daily_file)
+            commit.delete(gzip_sibling_path(daily_file))
+        commit.commit()
+    else:
+        if existing is not None and existing != month_file:
+            # 旧的未压缩月文件已经并入新文件
+            existing.unlink()
+        for daily_file in merged_days:
+            remove_with_sibling(daily_file)
+    _write_record_copy(month_file, merged)
+    stats['days'] += len(merged_days)
+    stats['months'] += 1
+    return count
+
+
+def compact_expired_days(archive_dir: Path, merged_dir: Path, cutoff_date: date, commit=None) -> Dict[str, int]:
+    """
+    整理 cutoff_date 之前的全部日归档到 merged/YYYY-MM.json.xz
+    返回统计：合并的天数、月数、读取/写入字节数；commit 见 compact_month
+    """
+    stats = {'days': 0, 'months': 0, 'bytes_read': 0, 'bytes_written': 0}
+    merged_dir = Path(merged_dir)
+    for month, daily_files in sorted(expired_days_by_month(archive_dir, cutoff_date).items()):
+        merged_dir.mkdir(parents=True, exist_ok=True)
+        count = compact_month(merged_dir, month, daily_files, stats, commit)
+        if count >= 0:
+            names = ', '.join(f.stem[-2:] for f in daily_files)
+            print(f"  📦 {month}: 合并 {len(daily_files)} 天（{names}日），月文件共 {count} 条")
+    compress_month_files(merged_dir, stats, commit)
+    return stats
+
+
+def compress_month_files(merged_dir: Path, stats: Dict[str, int], commit=None):
+    """把还没压缩（merged/YYYY-MM.json）或还是数组格式的月文件转成归一化的 .json.xz；commit 见 compact_month"""
+    for month_file in sorted(Path(merged_dir).glob("????-??.json")):
+        compressed = month_file.with_name(month_file.name[:-len('.json')] + MONTH_ARCHIVE_SUFFIX)
+        if compressed.exists():
+            # 两种格式都在：写完 .json.xz、删除 .json 之前中断，.json.xz 已包含全部内容
+            month_file.unlink()
+            continue
+        try:
+            news = _load_sorted(month_file, stats)
+        except Exception as e:
+            print(f"  ⚠️ 月文件 {month_file.name} 读取失败，保持未压缩: {e}")
+            continue
+        count, size = _write_stream(compressed, iter(news), commit)
+        stats['bytes_written'] += size
+        _write_site_copy(compressed, news, commit)
+        if commit is not None:
+            commit.delete(month_file)
+            commit.commit()
+        else:
+            month_file.unlink()
+        _write_record_copy(compressed, news)
+        print(f"  🗜️ {month_file.name} → {compressed.name}: {count} 条，{size / 1024 / 1024:.1f} MB")
+
+    for month_file in sorted(Path(merged_dir).glob(f"????-??{MONTH_ARCHIVE_SUFFIX}")):
+        try:
+            if is_normalized(month_file):
+                continue
+            before = month_file.stat().st_size
+            news = _load_sorted(month_file, stats)
+        except Exception as e:
+            print(f"  ⚠️ 月文件 {month_file.name} 读取失败，保持原格式: {e}")
+            continue
+        count, size = _write_stream(month_file, iter(news), commit)
+        stats['bytes_written'] += size
+        if commit is not None:
+            commit.commit()
+        # 内容没变，网页副本不用重写；.rec 副本按月文件的校验和重建
+        _write_record_copy(month_file, news)
+        print(f"  🏷️ {month_file.name} 标签归一化: {count} 条，{before / 1024 / 1024:.2f} → {size / 1024 / 1024:.2f} MB")
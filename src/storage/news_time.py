@@ -0,0 +1,38 @@
+"""
+新闻时间（北京时间）
+东方财富的 showTime、财联社 ctime 换算出的时间、日归档的日期都是北京时间；
+Actions 运行器的本地时区是 UTC，直接用 datetime.now() / datetime.fromtimestamp() 会差 8 小时：
+凌晨 0~8 点的新闻归到前一天，热窗口的起点算早 8 小时。
+
+这里的 datetime 都是不带时区的北京时间（与 showTime 字符串直接比较、格式化）。
+中国没有夏令时，用固定的 UTC+8，不依赖系统的时区数据库。
+"""
+
+from datetime import datetime, timedelta, timezone
+
+BEIJING = timezone(timedelta(hours=8), 'Asia/Shanghai')
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def beijing_now() -> datetime:
+    """当前北京时间"""
+    return datetime.now(BEIJING).replace(tzinfo=None)
+
+
+def beijing_today() -> str:
+    """今天的北京日期 YYYY-MM-DD（日归档的文件名）"""
+    return beijing_now().strftime(DAY_FORMAT)
+
+
+def from_timestamp(seconds: float) -> datetime:
+    """Unix 时间戳 -> 北京时间"""
+    return datetime.fromtimestamp(seconds, BEIJING).replace(tzinfo=None)
+
+
+def to_timestamp(dt: datetime) -> float:
+    """北京时间 -> Unix 时间戳（dt 带时区时按它自己的时区）"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=BEIJING)
+    return dt.timestamp()
@@ -0,0 +1,283 @@
+"""
+按记录随机访问的归档（月归档的索引副本）
+按 id 找一条新闻、或取月内某个时间段时，不再解析整个 merged/YYYY-MM.json.xz：
+
+- YYYY-MM.rec：按小时分块，每块是该小时内按时间正序的 JSON Lines，用 zlib 单独压缩
+- YYYY-MM.rec.idx：二进制索引（小端）
+    头部   magic | 版本 | 块数 | 记录数 | 源文件 CRC32
+    块表   每块 (小时 YYYYMMDDHH, 块偏移, 压缩长度, 解压长度)，按小时升序
+    id 表  每条 (id 哈希, 块序号, 块内偏移, 记录长度)，按哈希升序
+
+读取时 .rec 和 .idx 都用 mmap 打开，id 查找在 id 表上二分，时间段扫描在块表上二分，
+只解压命中的块；逐块产出结果，内存占用与月文件大小无关。
+
+.rec/.idx 由月归档派生（month_archive 写月文件时同时生成），索引里记录源文件的 CRC32，
+源文件变了（或副本缺失）时 ensure_record_archive 会重新生成。
+"""
+
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import sys
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from storage import json_codec
+from storage.tag_table import load_news
+
+INDEX_MAGIC = b'NEWSREC\x00'
+INDEX_VERSION = 1
+# magic(8) 版本(H) 块数(I) 记录数(I) 源文件CRC32(I)
+HEADER = struct.Struct('<8sHIII')
+# 小时(I) 块偏移(Q) 压缩长度(I) 解压长度(I)
+BLOCK_ENTRY = struct.Struct('<IQII')
+# id 哈希(Q) 块序号(I) 块内偏移(I) 记录长度(I)
+ID_ENTRY = struct.Struct('<QIII')
+
+# 块压缩级别：每块几十 KB，6 级和 9 级体积几乎一样
+BLOCK_COMPRESS_LEVEL = 6
+
+RECORD_SUFFIX = '.rec'
+INDEX_SUFFIX = '.rec.idx'
+
+
+def _sort_key(item: Dict) -> str:
+    """与 run_github_action.news_sort_key 一致：优先 showTime，没有则用 time"""
+    return item.get('showTime', item.get('time', '')) or ''
+
+
+def _bucket(sort_time: str) -> int:
+    """'2026-08-19 14:05:00' -> 2026081914；没有时间的记到 0 号桶"""
+    digits = sort_time[:13].replace('-', '').replace(' ', '')
+    return int(digits) if len(digits) == 10 and digits.isdigit() else 0
+
+
+def _bucket_floor(prefix: str) -> int:
+    """时间前缀所在的最小小时桶：'2026-08' -> 2026080000，'2026-08-19 09:30' -> 2026081909"""
+    digits = ''.join(c for c in prefix[:13] if c.isdigit())
+    return int(digits.ljust(10, '0')) if digits else 0
+
+
+def id_hash(news_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(str(news_id).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def file_crc32(path: Union[str, Path]) -> int:
+    crc = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def record_paths(base: Union[str, Path]):
+    """merged/2026-08 -> (merged/2026-08.rec, merged/2026-08.rec.idx)"""
+    base = Path(base)
+    return base.with_name(base.name + RECORD_SUFFIX), base.with_name(base.name + INDEX_SUFFIX)
+
+
+def write_record_archive(base: Union[str, Path], items: List[Dict], source_crc: int = 0) -> int:
+    """
+    把一批新闻写成 .rec + .rec.idx（都先写临时文件再原子替换，索引最后替换），返回记录数
+    source_crc：派生自的月文件的 CRC32，用于判断副本是否过期
+    """
+    rec_path, idx_path = record_paths(base)
+    buckets: Dict[int, List[Dict]] = {}
+    for item in items:
+        buckets.setdefault(_bucket(_sort_key(item)), []).append(item)
+
+    blocks = []
+    ids = []
+    offset = 0
+    rec_temp = rec_path.with_name(rec_path.name + '.tmp')
+    with open(rec_temp, 'wb') as f:
+        for block_no, bucket in enumerate(sorted(buckets)):
+            lines = []
+            raw_offset = 0
+            for item in sorted(buckets[bucket], key=_sort_key):
+                line = json_codec.dumps(item) + b'\n'
+                ids.append((id_hash(item.get('id', '')), block_no, raw_offset, len(line) - 1))
+                lines.append(line)
+                raw_offset += len(line)
+            raw = b''.join(lines)
+            compressed = zlib.compress(raw, BLOCK_COMPRESS_LEVEL)
+            f.write(compressed)
+            blocks.append((bucket, offset, len(compressed), len(raw)))
+            offset += len(compressed)
+
+    ids.sort()
+    idx_temp = idx_path.with_name(idx_path.name + '.tmp')
+    with open(idx_temp, 'wb') as f:
+        f.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(blocks), len(ids), source_crc))
+        for entry in blocks:
+            f.write(BLOCK_ENTRY.pack(*entry))
+        for entry in ids:
+            f.write(ID_ENTRY.pack(*entry))
+
+    os.replace(rec_temp, rec_path)
+    os.replace(idx_temp, idx_path)
+    return len(ids)
+
+
+class _StructView:
+    """把 mmap 里一段定长结构数组包装成可二分的序列（只解出被访问到的那一项的第一个字段）"""
+
+    def __init__(self, buffer, start: int, count: int, entry: struct.Struct):
+        self.buffer = buffer
+        self.start = start
+        self.count = count
+        self.entry = entry
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i: int) -> int:
+        return self.entry.unpack_from(self.buffer, self.start + i * self.entry.size)[0]
+
+    def entry_at(self, i: int) -> tuple:
+        return self.entry.unpack_from(self.buffer, self.start + i * self.entry.size)
+
+
+class RecordArchive:
+    """只读打开一个 .rec + .rec.idx，支持 id 查找和时间段扫描（可用作上下文管理器）"""
+
+    def __init__(self, base: Union[str, Path]):
+        self.rec_path, self.idx_path = record_paths(base)
+        self._idx_file = open(self.idx_path, 'rb')
+        self._rec_file = open(self.rec_path, 'rb')
+        self._idx = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        # 空归档的 .rec 是 0 字节，不能 mmap
+        rec_size = os.fstat(self._rec_file.fileno()).st_size
+        self._rec = mmap.mmap(self._rec_file.fileno(), 0, access=mmap.ACCESS_READ) if rec_size else b''
+
+        magic, version, block_count, record_count, self.source_crc = HEADER.unpack_from(self._idx, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"不是有效的记录索引: {self.idx_path}")
+        self.record_count = record_count
+        self._blocks = _StructView(self._idx, HEADER.size, block_count, BLOCK_ENTRY)
+        self._ids = _StructView(self._idx, HEADER.size + block_count * BLOCK_ENTRY.size, record_count, ID_ENTRY)
+
+    def __len__(self):
+        return self.record_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if isinstance(self._rec, mmap.mmap):
+            self._rec.close()
+        self._idx.close()
+        self._rec_file.close()
+        self._idx_file.close()
+
+    def _block(self, block_no: int) -> bytes:
+        _, offset, length, _ = self._blocks.entry_at(block_no)
+        return zlib.decompress(self._rec[offset:offset + length])
+
+    def get(self, news_id: str) -> Optional[Dict]:
+        """按 id 查找一条新闻（只读索引的二分路径和一个块）"""
+        target = id_hash(news_id)
+        i = bisect.bisect_left(self._ids, target)
+        # 哈希冲突时相邻几条哈希相同，逐条核对 id
+        while i < len(self._ids):
+            hashed, block_no, offset, length = self._ids.entry_at(i)
+            if hashed != target:
+                break
+            item = json_codec.loads(self._block(block_no)[offset:offset + length])
+            if str(item.get('id', '')) == str(news_id):
+                return item
+            i += 1
+        return None
+
+    def scan(self, start: str = '', end: Optional[str] = None) -> Iterator[Dict]:
+        """按时间正序逐条产出 start <= 时间 < end 的新闻（时间格式 'YYYY-MM-DD HH:MM:SS'，可只写前缀）"""
+        first = bisect.bisect_left(self._blocks, _bucket_floor(start))
+        last_bucket = _bucket_floor(end) if end is not None else None
+        for block_no in range(first, len(self._blocks)):
+            if last_bucket is not None and self._blocks[block_no] > last_bucket:
+                break
+            for line in self._block(block_no).splitlines():
+                item = json_codec.loads(line)
+                sort_time = _sort_key(item)
+                if sort_time >= start and (end is None or sort_time < end):
+                    yield item
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.scan()
+
+
+def ensure_record_archive(month_file: Union[str, Path], items: Optional[List[Dict]] = None) -> Path:
+    """
+    保证月文件（merged/YYYY-MM.json.xz 等）旁边有最新的 .rec/.rec.idx，返回副本的基础路径
+    items 已在内存里（刚写完月文件）时直接用，否则从月文件读取
+    """
+    month_file = Path(month_file)
+    base = month_file.with_name(month_file.name.split('.', 1)[0])
+    source_crc = file_crc32(month_file)
+    _, idx_path = record_paths(base)
+    if idx_path.exists() and items is None:
+        try:
+            with RecordArchive(base) as archive:
+                if archive.source_crc == source_crc:
+                    return base
+        except (OSError, ValueError, struct.error):
+            pass
+    if items is None:
+        items = load_news(month_file)
+    write_record_archive(base, items, source_crc)
+    return base
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from storage.compression import find_archive, month_archives
+
+    parser = argparse.ArgumentParser(description='月归档的随机访问副本')
+    parser.add_argument('--merged-dir', help='月归档目录（默认 data/archive/merged）')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='为 merged/ 下所有月文件生成/更新 .rec 副本')
+    get = sub.add_parser('get', help='按 id 查找')
+    get.add_argument('month', help='YYYY-MM')
+    get.add_argument('id')
+    scan = sub.add_parser('scan', help='按时间段扫描')
+    scan.add_argument('month', help='YYYY-MM')
+    scan.add_argument('start', help="起始时间（含），如 '2026-08-19 09'")
+    scan.add_argument('end', help="结束时间（不含），如 '2026-08-19 12'")
+    args = parser.parse_args()
+
+    merged_dir = (Path(args.merged_dir) if args.merged_dir
+                  else Path(__file__).resolve().parent.parent.parent / "data" / "archive" / "merged")
+    if args.command == 'build':
+        for path in month_archives(merged_dir):
+            base = ensure_record_archive(path)
+            rec_path, _ = record_paths(base)
+            print(f"✅ {path.name} → {rec_path.name} ({rec_path.stat().st_size / 1024 / 1024:.1f} MB)")
+    else:
+        if find_archive(merged_dir, args.month) is None:
+            print(f"❌ 没有月归档 {args.month}")
+            sys.exit(1)
+        base = ensure_record_archive(find_archive(merged_dir, args.month))
+        with RecordArchive(base) as archive:
+            if args.command == 'get':
+                item = archive.get(args.id)
+                print(json_codec.dumps_str(item, pretty=True) if item else f"❌ 没有找到 {args.id}")
+            else:
+                count = 0
+                for item in archive.scan(args.start, args.end):
+                    count += 1
+                    print(f"  {_sort_key(item)} {item.get('title', '')[:40]}")
+                print(f"✅ 共 {count} 条")
@@ -0,0 +1,572 @@
+"""
+全文检索索引（中文字符二元组倒排索引）
+网页只能搜已经加载的几天；这里在归档时增量建索引，Python 里按关键词 + 时间范围查询，毫秒级返回，不加载归档：
+
+- 分词：NFKC 规范化、小写；连续汉字切成二元组（"人工智能" -> 人工/工智/智能），连续字母数字整体作为一个词
+- 标题和 full_content 都建索引，标题里的词权重 ×2；排序用 BM25，同分按时间倒序
+  summary 不在正文里时（少数来源的摘要和正文不是同一稿）也建索引，索引覆盖打标签用的全部文本
+  （标签库更新后的增量重打标签靠它找候选新闻，见 tags.retag）
+- 一个分区（当天的每个段 / 日归档 / 月归档，与 manifest.json 的分区一致）一个段文件 data/search/<分区>.seg，
+  data/search/segments.json 记录每个段对应的源文件哈希；每次只建源文件新增或变了的分区
+  （通常只有本次运行新写的那个段），收盘、并入月归档后被替换的分区删除
+- 段文件是二进制（小端），查询时 mmap：
+    头部   magic | 版本 | 文档数 | 词数 | 最早/最晚时间 | 总词数 | 各区偏移
+    文档表 每篇 (时间 YYYYMMDDHHMMSS, 词数, 存储偏移, 存储长度)，按时间升序
+    词表   每个词 (词哈希, 倒排偏移, 文档频率, 词偏移, 词长度)，按哈希升序
+    倒排   每个词：升序文档号数组（分区不超过 65536 篇时 uint16，否则 uint32）+ 等长的权重 uint8 数组
+    词串   词的 UTF-8（导出静态分片时用）
+    存储   每篇 [id, 标题, 时间, 来源] 的紧凑 JSON
+
+查询里有单个汉字（切不出二元组）时退化为在时间范围内扫描标题
+
+命令行：
+  python search_index.py build                 # 增量更新索引
+  python search_index.py query 人形机器人 --start 2026-08-01 --end 2026-09-01
+  python search_index.py export data/search_static --buckets 64
+"""
+
+import bisect
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import unicodedata
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from storage import json_codec
+from storage.compression import archive_name, month_archives, write_bytes_atomic
+from storage.daily_log import DailyLog, archive_days, read_segment
+from storage.tag_table import load_news
+
+SEGMENT_MAGIC = b'NEWSIDX\x00'
+SEGMENT_VERSION = 2
+# magic 版本 文档数 词数 最早时间 最晚时间 总词数 文档表/词表/倒排/词串/存储 的偏移
+HEADER = struct.Struct('<8sHIIqqQQQQQQ')
+# 时间 词数 存储偏移 存储长度
+DOC_ENTRY = struct.Struct('<qHII')
+# 词哈希 倒排偏移 文档频率 词偏移 词长度
+TERM_ENTRY = struct.Struct('<QIIIB')
+
+# 标题里的词重复计入的次数
+TITLE_WEIGHT = 2
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 超过这个长度的字母数字串（链接、编码串）不建索引
+MAX_WORD_LENGTH = 32
+
+_RUN_PATTERN = re.compile(r'[一-鿿]+|[a-z0-9]+')
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def default_index_dir() -> Path:
+    """默认目录：项目根目录/data/search"""
+    project_root = Path(__file__).resolve().parent.parent.parent
+    return project_root / "data" / "search"
+
+
+def _sort_key(item: Dict) -> str:
+    """与 run_github_action.news_sort_key 一致：优先 showTime，没有则用 time"""
+    return item.get('showTime', item.get('time', '')) or ''
+
+
+def time_value(text: str) -> int:
+    """'2026-08-19 09:30:00' -> 20260819093000；只写前缀时补 0（'2026-08' -> 20260800000000）"""
+    digits = ''.join(c for c in (text or '')[:19] if c.isdigit())
+    return int(digits.ljust(14, '0')) if digits else 0
+
+
+def text_runs(text: str) -> List[str]:
+    """NFKC 规范化、小写后的连续汉字串和连续字母数字串"""
+    return _RUN_PATTERN.findall(unicodedata.normalize('NFKC', text or '').lower())
+
+
+def tokenize(text: str) -> List[str]:
+    """汉字切二元组，字母数字整词；单个汉字切不出二元组，不产生词"""
+    terms = []
+    for run in text_runs(text):
+        if run[0].isascii():
+            if len(run) <= MAX_WORD_LENGTH:
+                terms.append(run)
+        else:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def static_bucket(term: str, buckets: int) -> int:
+    """静态分片的桶号（网页端用同样的算法：按码点的 31 进制多项式哈希，取 32 位）"""
+    value = 0
+    for char in term:
+        value = (value * 31 + ord(char)) & 0xFFFFFFFF
+    return value % buckets
+
+
+def _pack(values: List[int], typecode: str) -> bytes:
+    data = array(typecode, values)
+    if not _LITTLE_ENDIAN:
+        data.byteswap()
+    return data.tobytes()
+
+
+def _doc_typecode(doc_count: int) -> str:
+    """文档号的宽度：一个分区不超过 65536 篇时用 uint16，否则 uint32"""
+    return 'H' if doc_count <= 0x10000 else 'I'
+
+
+# ---------- 写段 ----------
+
+def write_segment(path: Path, news: List[Dict]) -> Dict:
+    """把一个分区的新闻写成段文件（原子替换），返回 {'docs', 'first', 'last'}"""
+    news = sorted((item for item in news if item.get('title')), key=_sort_key)
+    postings: Dict[str, Tuple[List[int], List[int]]] = {}
+    doc_entries = []
+    store = []
+    store_offset = 0
+    total_length = 0
+
+    for doc_no, item in enumerate(news):
+        counts = Counter(tokenize(item.get('title', '')) * TITLE_WEIGHT)
+        body = item.get('full_content') or item.get('content') or ''
+        counts.update(tokenize(body))
+        summary = item.get('summary') or ''
+        if summary and summary not in body and summary not in item['title']:
+            counts.update(tokenize(summary))
+        length = sum(counts.values())
+        total_length += length
+        for term, weight in counts.items():
+            entry = postings.get(term)
+            if entry is None:
+                postings[term] = entry = ([], [])
+            entry[0].append(doc_no)
+            entry[1].append(weight if weight < 255 else 255)
+
+        sort_time = _sort_key(item)
+        stored = json_codec.dumps([item.get('id', ''), item['title'], sort_time, item.get('source', '')])
+        doc_entries.append(DOC_ENTRY.pack(time_value(sort_time), min(length, 0xFFFF), store_offset, len(stored)))
+        store.append(stored)
+        store_offset += len(stored)
+
+    typecode = _doc_typecode(len(news))
+    term_entries = []
+    blobs = []
+    strings = []
+    blob_offset = 0
+    string_offset = 0
+    for term, (docs, weights) in postings.items():
+        encoded = term.encode('utf-8')
+        term_entries.append((term_hash(term), blob_offset, len(docs), string_offset, len(encoded)))
+        blobs.append(_pack(docs, typecode))
+        blobs.append(bytes(weights))
+        strings.append(encoded)
+        blob_offset += len(docs) * (array(typecode).itemsize + 1)
+        string_offset += len(encoded)
+    term_entries.sort()
+
+    docs_start = HEADER.size
+    terms_start = docs_start + len(doc_entries) * DOC_ENTRY.size
+    postings_start = terms_start + len(term_entries) * TERM_ENTRY.size
+    strings_start = postings_start + blob_offset
+    store_start = strings_start + string_offset
+    times = [time_value(_sort_key(item)) for item in news]
+    header = HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, len(news), len(term_entries),
+                         min(times) if times else 0, max(times) if times else 0, total_length,
+                         docs_start, terms_start, postings_start, strings_start, store_start)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_bytes_atomic(path, b''.join([header, *doc_entries, *(TERM_ENTRY.pack(*entry) for entry in term_entries),
+                                       *blobs, *strings, *store]))
+    return {
+        'docs': len(news),
+        'first': _sort_key(news[0]) if news else '',
+        'last': _sort_key(news[-1]) if news else '',
+    }
+
+
+# ---------- 读段 ----------
+
+class _TermHashes:
+    """词表的哈希列（供 bisect 二分）"""
+
+    def __init__(self, segment: 'Segment'):
+        self.segment = segment
+
+    def __len__(self):
+        return self.segment.term_count
+
+    def __getitem__(self, i: int) -> int:
+        return self.segment._term_entry(i)[0]
+
+
+class Segment:
+    """mmap 打开的一个段文件"""
+
+    def __init__(self, path: Path, name: str):
+        self.path = Path(path)
+        self.name = name
+        self._file = open(self.path, 'rb')
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.doc_count, self.term_count, self.min_time, self.max_time, self.total_length,
+         self._docs_start, self._terms_start, self._postings_start, self._strings_start,
+         self._store_start) = HEADER.unpack_from(self._buffer, 0)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+            self.close()
+            raise ValueError(f"不是有效的索引段: {self.path}")
+        self._typecode = _doc_typecode(self.doc_count)
+        self._hashes = _TermHashes(self)
+
+    def close(self):
+        self._buffer.close()
+        self._file.close()
+
+    def overlaps(self, start: int, end: Optional[int]) -> bool:
+        return self.max_time >= start and (end is None or self.min_time < end)
+
+    def _term_entry(self, i: int) -> tuple:
+        return TERM_ENTRY.unpack_from(self._buffer, self._terms_start + i * TERM_ENTRY.size)
+
+    def _decode(self, offset: int, df: int) -> Tuple[array, bytes]:
+        start = self._postings_start + offset
+        docs = array(self._typecode)
+        end = start + df * docs.itemsize
+        docs.frombytes(self._buffer[start:end])
+        if not _LITTLE_ENDIAN:
+            docs.byteswap()
+        return docs, self._buffer[end:end + df]
+
+    def lookup(self, term: str) -> Optional[Tuple[array, bytes]]:
+        """词的倒排：(升序文档号, 对应权重)；没有这个词返回 None"""
+        target = term_hash(term)
+        i = bisect.bisect_left(self._hashes, target)
+        if i >= self.term_count:
+            return None
+        hashed, offset, df, _, _ = self._term_entry(i)
+        if hashed != target:
+            return None
+        return self._decode(offset, df)
+
+    def term_string(self, i: int) -> str:
+        """词表里第 i 个词的词串"""
+        _, _, _, string_offset, string_length = self._term_entry(i)
+        start = self._strings_start + string_offset
+        return self._buffer[start:start + string_length].decode('utf-8')
+
+    def term_postings(self, i: int) -> Tuple[array, bytes]:
+        """词表里第 i 个词的倒排"""
+        _, offset, df, _, _ = self._term_entry(i)
+        return self._decode(offset, df)
+
+    def iter_terms(self) -> Iterable[Tuple[str, array, bytes]]:
+        """遍历全部 (词, 文档号, 权重)（导出用）"""
+        for i in range(self.term_count):
+            docs, weights = self.term_postings(i)
+            yield self.term_string(i), docs, weights
+
+    def doc_entry(self, doc_no: int) -> tuple:
+        """(时间, 词数, 存储偏移, 存储长度)"""
+        return DOC_ENTRY.unpack_from(self._buffer, self._docs_start + doc_no * DOC_ENTRY.size)
+
+    def document(self, doc_no: int) -> Dict:
+        _, _, offset, length = self.doc_entry(doc_no)
+        start = self._store_start + offset
+        news_id, title, sort_time, source = json_codec.loads(self._buffer[start:start + length])
+        return {'id': news_id, 'title': title, 'time': sort_time, 'source': source, 'partition': self.name}
+
+    def doc_range(self, start: int, end: Optional[int]) -> range:
+        """时间在 [start, end) 内的文档号范围（文档表按时间升序）"""
+        times = _DocTimes(self)
+        first = bisect.bisect_left(times, start)
+        last = bisect.bisect_left(times, end) if end is not None else self.doc_count
+        return range(first, last)
+
+
+class _DocTimes:
+    def __init__(self, segment: Segment):
+        self.segment = segment
+
+    def __len__(self):
+        return self.segment.doc_count
+
+    def __getitem__(self, i: int) -> int:
+        return self.segment.doc_entry(i)[0]
+
+
+# ---------- 索引 ----------
+
+class SearchIndex:
+    """所有段的集合：增量更新 + 查询"""
+
+    def __init__(self, index_dir: Optional[Path] = None):
+        self.index_dir = Path(index_dir) if index_dir else default_index_dir()
+        self.meta_path = self.index_dir / "segments.json"
+        self.meta = self._load_meta()
+        self._segments: Dict[str, Segment] = {}
+
+    def _load_meta(self) -> Dict[str, Dict]:
+        if not self.meta_path.exists():
+            return {}
+        try:
+            return json_codec.load_file(self.meta_path)
+        except Exception as e:
+            print(f"⚠️ 索引清单读取失败，将全部重建: {e}")
+            return {}
+
+    def _segment_path(self, name: str) -> Path:
+        return self.index_dir / f"{name}.seg"
+
+    def close(self):
+        for segment in self._segments.values():
+            segment.close()
+        self._segments = {}
+
+    # ---------- 增量更新 ----------
+
+    @staticmethod
+    def partitions(archive_dir: Path) -> List[Tuple[str, Path, object]]:
+        """(分区名, 源文件, 读取函数)：未收盘的段（分区名 YYYY-MM-DD/段名）、已收盘的日归档、月归档"""
+        archive_dir = Path(archive_dir)
+        result = []
+        for day in archive_days(archive_dir):
+            daily_log = DailyLog(archive_dir, day)
+            segments = daily_log.segments()
+            if segments:
+                for segment in segments:
+                    result.append((f"{day}/{segment.stem}", segment, lambda path=segment: read_segment(path)))
+            elif daily_log.json_path.exists():
+                result.append((day, daily_log.json_path,
+                               lambda path=daily_log.json_path: json_codec.load_file(path)))
+        merged_dir = archive_dir / "merged"
+        if merged_dir.exists():
+            for month_file in month_archives(merged_dir):
+                result.append((archive_name(month_file), month_file, lambda path=month_file: load_news(path)))
+        return result
+
+    def update(self, archive_dir: Path) -> Dict[str, int]:
+        """重建源文件有变化的分区，删除已不存在的分区，返回统计"""
+        from storage.site_publisher import file_hash
+
+        self.close()
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        stats = {'segments': 0, 'rebuilt': 0, 'removed': 0, 'docs': 0}
+        current = {}
+        for name, source, load in self.partitions(archive_dir):
+            digest = file_hash(source)
+            previous = self.meta.get(name)
+            if (previous and previous.get('hash') == digest and previous.get('version') == SEGMENT_VERSION
+                    and self._segment_path(name).exists()):
+                current[name] = previous
+            else:
+                info = write_segment(self._segment_path(name), load())
+                current[name] = {'source': source.name, 'hash': digest, 'version': SEGMENT_VERSION, **info}
+                stats['rebuilt'] += 1
+            stats['docs'] += current[name]['docs']
+
+        for name in set(self.meta) - set(current):
+            path = self._segment_path(name)
+            if path.exists():
+                path.unlink()
+            if path.parent != self.index_dir and path.parent.exists() and not any(path.parent.iterdir()):
+                path.parent.rmdir()
+            stats['removed'] += 1
+
+        self.meta = current
+        stats['segments'] = len(current)
+        temp_path = self.meta_path.with_suffix('.tmp')
+        json_codec.dump_file(temp_path, current)
+        os.replace(temp_path, self.meta_path)
+        return stats
+
+    # ---------- 查询 ----------
+
+    def segment(self, name: str) -> Optional[Segment]:
+        """按分区名打开段，没有这个分区返回 None"""
+        if name not in self._segments:
+            if name not in self.meta or not self._segment_path(name).exists():
+                return None
+            self._segments[name] = Segment(self._segment_path(name), name)
+        return self._segments[name]
+
+    def _open_segments(self) -> List[Segment]:
+        for name in self.meta:
+            self.segment(name)
+        return list(self._segments.values())
+
+    def search(self, query: str, start: Optional[str] = None, end: Optional[str] = None,
+               limit: int = 20) -> List[Dict]:
+        """
+        查询：所有词都要出现（AND），按 BM25 排序，同分按时间倒序
+        start / end 是 'YYYY-MM-DD HH:MM:SS' 或其前缀，时间范围为 [start, end)
+        """
+        start_value = time_value(start) if start else 0
+        end_value = time_value(end) if end else None
+        segments = [s for s in self._open_segments() if s.doc_count and s.overlaps(start_value, end_value)]
+        if any(len(run) == 1 and not run.isascii() for run in text_runs(query)):
+            return self._scan_titles(query, segments, start_value, end_value, limit)
+
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not segments:
+            return []
+
+        doc_total = sum(s.doc_count for s in segments)
+        average_length = sum(s.total_length for s in segments) / max(1, doc_total)
+        # 文档频率按每个词在所有分区里单独统计，与分区是否含有全部查询词、查询词的先后顺序无关
+        document_frequency: Counter = Counter()
+        matched = []
+        for segment in segments:
+            postings = {}
+            for term in terms:
+                found = segment.lookup(term)
+                if found is not None:
+                    postings[term] = found
+                    document_frequency[term] += len(found[0])
+            if len(postings) == len(terms):
+                matched.append((segment, postings))
+
+        idf = {term: math.log(1 + (doc_total - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+        best = []
+        for segment, postings in matched:
+            in_range = segment.doc_range(start_value, end_value)
+            ordered = sorted(terms, key=lambda t: len(postings[t][0]))
+            docs, weights = postings[ordered[0]]
+            for position, doc_no in enumerate(docs):
+                if doc_no not in in_range:
+                    continue
+                score = self._term_score(idf[ordered[0]], weights[position], segment, doc_no, average_length)
+                for term in ordered[1:]:
+                    other_docs, other_weights = postings[term]
+                    i = bisect.bisect_left(other_docs, doc_no)
+                    if i == len(other_docs) or other_docs[i] != doc_no:
+                        break
+                    score += self._term_score(idf[term], other_weights[i], segment, doc_no, average_length)
+                else:
+                    doc_time = segment.doc_entry(doc_no)[0]
+                    entry = (score, doc_time, segment.name, doc_no)
+                    if len(best) < limit:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+
+        results = []
+        for score, _, name, doc_no in sorted(best, reverse=True):
+            document = self._segments[name].document(doc_no)
+            document['score'] = round(score, 3)
+            results.append(document)
+        return results
+
+    @staticmethod
+    def _term_score(idf: float, weight: int, segment: Segment, doc_no: int, average_length: float) -> float:
+        length = segment.doc_entry(doc_no)[1]
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+        return idf * weight * (BM25_K1 + 1) / (weight + norm)
+
+    def _scan_titles(self, query: str, segments: List[Segment], start: int, end: Optional[int],
+                     limit: int) -> List[Dict]:
+        """单字查询：在时间范围内按时间倒序扫描标题"""
+        needles = text_runs(query)
+        results = []
+        for segment in sorted(segments, key=lambda s: s.max_time, reverse=True):
+            for doc_no in reversed(segment.doc_range(start, end)):
+                document = segment.document(doc_no)
+                title = unicodedata.normalize('NFKC', document['title']).lower()
+                if all(needle in title for needle in needles):
+                    document['score'] = 0.0
+                    results.append(document)
+        results.sort(key=lambda d: d['time'], reverse=True)
+        return results[:limit]
+
+    # ---------- 导出静态分片 ----------
+
+    def export_static(self, out_dir: Path, buckets: int = 64) -> Dict[str, int]:
+        """
+        导出给静态网页用的分片：
+        docs.json   全部文档 [id, 标题, 时间, 来源]（全局文档号 = 下标）
+        terms-XX.json  {词: [[文档号...], [权重...]]}，桶号见 static_bucket
+        meta.json   桶数、文档数、平均词数
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        segments = sorted(self._open_segments(), key=lambda s: s.min_time)
+        documents = []
+        shards: List[Dict[str, List[List[int]]]] = [{} for _ in range(buckets)]
+        for segment in segments:
+            base = len(documents)
+            for doc_no in range(segment.doc_count):
+                document = segment.document(doc_no)
+                documents.append([document['id'], document['title'], document['time'], document['source']])
+            for term, docs, weights in segment.iter_terms():
+                entry = shards[static_bucket(term, buckets)].setdefault(term, [[], []])
+                entry[0].extend(base + doc_no for doc_no in docs)
+                entry[1].extend(weights)
+
+        json_codec.dump_file(out_dir / "docs.json", documents)
+        for bucket, shard in enumerate(shards):
+            json_codec.dump_file(out_dir / f"terms-{bucket:02x}.json", shard)
+        total_length = sum(s.total_length for s in segments)
+        json_codec.dump_file(out_dir / "meta.json", {
+            'buckets': buckets,
+            'docs': len(documents),
+            'average_length': total_length / max(1, len(documents)),
+            'title_weight': TITLE_WEIGHT,
+        })
+        return {'docs': len(documents), 'terms': sum(len(shard) for shard in shards), 'buckets': buckets}
+
+
+def update_search_index(data_dir: Path) -> Dict[str, int]:
+    """归档写完后调用：增量更新 data/search"""
+    index = SearchIndex(Path(data_dir) / "search")
+    try:
+        return index.update(Path(data_dir) / "archive")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='全文检索索引')
+    parser.add_argument('--data-dir', help='数据目录（默认 data）')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='增量更新索引')
+    query_parser = sub.add_parser('query', help='查询')
+    query_parser.add_argument('query')
+    query_parser.add_argument('--start', help='起始时间（含）')
+    query_parser.add_argument('--end', help='结束时间（不含）')
+    query_parser.add_argument('--limit', type=int, default=20)
+    export_parser = sub.add_parser('export', help='导出静态分片')
+    export_parser.add_argument('out_dir')
+    export_parser.add_argument('--buckets', type=int, default=64)
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir) if args.data_dir else Path(__file__).resolve().parent.parent.parent / "data"
+    index = SearchIndex(data_dir / "search")
+    started = time.perf_counter()
+    if args.command == 'build':
+        stats = index.update(data_dir / "archive")
+        print(f"✅ 索引 {stats['segments']} 个分区 / {stats['docs']} 篇，重建 {stats['rebuilt']}，"
+              f"删除 {stats['removed']}，耗时 {time.perf_counter() - started:.2f}s")
+    elif args.command == 'query':
+        results = index.search(args.query, args.start, args.end, args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        for result in results:
+            print(f"  {result['score']:6.2f} {result['time']} {result['title'][:50]}")
+        print(f"✅ {len(results)} 条，耗时 {elapsed:.1f}ms")
+    else:
+        stats = index.export_static(Path(args.out_dir), args.buckets)
+        print(f"✅ 导出 {stats['docs']} 篇 / {stats['terms']} 个词 → {args.out_dir}")
+    index.close()
@@ -0,0 +1,221 @@
+"""
+静态网页的数据清单和小时分片
+网页不再逐天试探 90 个 URL，而是先读 data/manifest.json：
+- partitions：所有日归档、月归档（条数、时间范围、字节数、内容哈希、网页该读的文件和格式）；
+  未收盘的当天每个段是一个分区（段不可变，网页可以一直缓存）
+- shards：最近几天按小时切好的分片 data/shards/YYYY-MM-DD/HH.<哈希>.json，
+  网页按当前时间范围算出需要的小时，并行拉取；文件名带内容哈希，内容不变 URL 不变，可以长期缓存
+
+每次采集结束调用 publish_site()：分片只在内容变化时写新文件，不再被清单引用的旧分片删除
+"""
+
+import hashlib
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from storage import json_codec
+from storage.compression import archive_name, compress, gzip_sibling_path, month_archives, write_bytes_atomic
+from storage.daily_log import DailyLog, archive_days, read_segment
+from storage.news_time import beijing_now, beijing_today
+from storage.tag_table import load_news
+
+MANIFEST_VERSION = 1
+# 生成小时分片的天数（今天之外再往前几天，覆盖网页最长的 3 天时间范围）
+SHARD_DAYS = 3
+# 内容哈希截取的长度
+HASH_LENGTH = 12
+
+
+def _sort_key(item: Dict) -> str:
+    """与 run_github_action.news_sort_key 一致：优先 showTime，没有则用 time"""
+    return item.get('showTime', item.get('time', '')) or ''
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()[:HASH_LENGTH]
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def load_day(archive_dir: Path, day: str) -> List[Dict]:
+    """读取某天的归档：未收盘的段优先，其次整理好的 JSON，都没有时返回空列表"""
+    daily_log = DailyLog(archive_dir, day)
+    if daily_log.is_open:
+        return daily_log.read_all()
+    if daily_log.json_path.exists():
+        return json_codec.load_file(daily_log.json_path)
+    return []
+
+
+class SitePublisher:
+    """生成 data/manifest.json 和 data/shards/"""
+
+    def __init__(self, data_dir: Path, shard_days: int = SHARD_DAYS):
+        self.data_dir = Path(data_dir)
+        self.archive_dir = self.data_dir / "archive"
+        self.merged_dir = self.archive_dir / "merged"
+        self.shard_dir = self.data_dir / "shards"
+        self.manifest_path = self.data_dir / "manifest.json"
+        self.shard_days = shard_days
+        self.stats = {'shards': 0, 'shards_written': 0, 'shards_removed': 0, 'partitions': 0}
+        self._previous = self._load_previous()
+
+    def _load_previous(self) -> Dict[str, Dict]:
+        """上一次的清单：内容哈希没变的分区直接沿用条数和时间范围，不用重新解析"""
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            manifest = json_codec.load_file(self.manifest_path)
+        except Exception:
+            return {}
+        return {entry['hash']: entry for entry in manifest.get('partitions', []) if entry.get('hash')}
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self.data_dir).as_posix()
+
+    # ---------- 分区 ----------
+
+    def _partition(self, name: str, kind: str, site_path: Path, site_format: str, load) -> Dict:
+        """
+        一个分区的清单条目；hash/bytes 是网页实际读取的文件的，条数和时间范围由 load() 读出的内容计算，
+        load 只在内容哈希变化时才调用
+        """
+        digest = file_hash(site_path)
+        entry = {
+            'name': name,
+            'kind': kind,
+            'path': self._relative(site_path),
+            'format': site_format,
+            'bytes': site_path.stat().st_size,
+            'hash': digest,
+        }
+        previous = self._previous.get(digest)
+        if previous and previous.get('path') == entry['path']:
+            entry.update({key: previous[key] for key in ('count', 'first', 'last') if key in previous})
+            return entry
+
+        news = load()
+        times = [t for t in (_sort_key(item) for item in news) if t]
+        entry['count'] = len(news)
+        entry['first'] = min(times) if times else ''
+        entry['last'] = max(times) if times else ''
+        return entry
+
+    def day_partitions(self) -> List[Dict]:
+        entries = []
+        for day in reversed(archive_days(self.archive_dir)):
+            daily_log = DailyLog(self.archive_dir, day)
+            segments = daily_log.segments()
+            if segments:
+                # 未收盘：网页直接读各个段
+                for segment in reversed(segments):
+                    entries.append(self._partition(day, 'day', segment, 'jsonl',
+                                                   lambda path=segment: read_segment(path)))
+            elif daily_log.json_path.exists():
+                gz_path = gzip_sibling_path(daily_log.json_path)
+                site_path, site_format = (gz_path, 'gzip') if gz_path.exists() else (daily_log.json_path, 'json')
+                entries.append(self._partition(day, 'day', site_path, site_format,
+                                               lambda path=daily_log.json_path: json_codec.load_file(path)))
+        return entries
+
+    def month_partitions(self) -> List[Dict]:
+        entries = []
+        if not self.merged_dir.exists():
+            return entries
+        for month_file in reversed(month_archives(self.merged_dir)):
+            month = archive_name(month_file)
+            site_path = self.merged_dir / f"{month}.json.gz"
+            if not site_path.exists():
+                # 早于网页副本的月归档：补一份浏览器能解压的 gzip
+                write_bytes_atomic(site_path, compress(json_codec.dumps(load_news(month_file)), 'gz'))
+            entries.append(self._partition(month, 'month', site_path, 'gzip',
+                                           lambda path=site_path: json_codec.load_file(path)))
+        return entries
+
+    # ---------- 小时分片 ----------
+
+    def publish_shards(self, today: str) -> List[Dict]:
+        """最近 shard_days 天 + 今天按小时切片，内容变化时写新文件，返回清单条目（按小时倒序）"""
+        first_day = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=self.shard_days)).strftime("%Y-%m-%d")
+        by_hour: Dict[str, List[Dict]] = {}
+        day = first_day
+        while day <= today:
+            for item in load_day(self.archive_dir, day):
+                hour = _sort_key(item)[:13]
+                # 只按归档里实际的时间切片，跨天归档的条目落到它自己的小时
+                if len(hour) == 13 and hour[:10] >= first_day:
+                    by_hour.setdefault(hour, []).append(item)
+            day = (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        entries = []
+        keep = set()
+        for hour in sorted(by_hour, reverse=True):
+            # 同一小时可能来自两天的归档：按标题去重，保留时间更新的
+            news_map: Dict[str, Dict] = {}
+            for item in by_hour[hour]:
+                title = item.get('title', '')
+                if title and (title not in news_map or _sort_key(item) > _sort_key(news_map[title])):
+                    news_map[title] = item
+            news = sorted(news_map.values(), key=_sort_key, reverse=True)
+            data = json_codec.dumps(news)
+            digest = content_hash(data)
+            path = self.shard_dir / hour[:10] / f"{hour[11:13]}.{digest}.json"
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                write_bytes_atomic(path, data)
+                self.stats['shards_written'] += 1
+            keep.add(path)
+            entries.append({
+                'hour': hour,
+                'path': self._relative(path),
+                'count': len(news),
+                'bytes': len(data),
+                'hash': digest,
+            })
+
+        # 删除不再被引用的分片（内容已更新的小时、滑出窗口的日期）
+        if self.shard_dir.exists():
+            for path in self.shard_dir.glob("*/*.json"):
+                if path not in keep:
+                    path.unlink()
+                    self.stats['shards_removed'] += 1
+            for day_dir in self.shard_dir.iterdir():
+                if day_dir.is_dir() and not any(day_dir.iterdir()):
+                    day_dir.rmdir()
+        self.stats['shards'] = len(entries)
+        return entries
+
+    # ---------- 清单 ----------
+
+    def publish(self, today: Optional[str] = None) -> Dict:
+        """生成分片和清单（原子替换 manifest.json），返回清单"""
+        today = today or beijing_today()
+        shards = self.publish_shards(today)
+        partitions = self.day_partitions() + self.month_partitions()
+        self.stats['partitions'] = len(partitions)
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'generated_at': beijing_now().strftime("%Y-%m-%d %H:%M:%S"),
+            'shard_days': self.shard_days,
+            'partitions': partitions,
+            'shards': shards,
+        }
+        temp_path = self.manifest_path.with_suffix('.tmp')
+        json_codec.dump_file(temp_path, manifest)
+        os.replace(temp_path, self.manifest_path)
+        return manifest
+
+
+def publish_site(data_dir: Path, today: Optional[str] = None) -> Dict[str, int]:
+    """生成网页用的清单和小时分片，返回统计"""
+    publisher = SitePublisher(data_dir)
+    publisher.publish(today)
+    return publisher.stats
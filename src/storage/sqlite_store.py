@@ -0,0 +1,414 @@
+"""
+SQLite 新闻库
+把新闻存进嵌入式 SQLite（data/news.db），去重和按时间/来源/标签的范围查询都走索引，不用整天整天地加载 JSON：
+- news_articles：一行一条新闻，payload 是原样的紧凑 JSON（导出时直接拼接，不重新序列化）
+  索引：排序时间、来源+时间、id、规范化标题哈希
+- news_tags：新闻 ↔ 行业/概念标签 ID，索引在 tag_id 上
+
+- archive_sources：每个归档分区（日归档 / 未收盘的段目录 / 月归档）上次同步时的内容哈希
+
+去重规则与 JSON 归档一致：同一归档日内按标题去重，保留时间更新的那条
+写入按批在一个事务里完成；WAL 模式，关闭时做 checkpoint，让 .db 文件本身完整（便于复制/缓存）
+
+JSON 归档是持久化的数据（提交进仓库），news.db 只是它的索引副本：
+回补（collectors.backfill）、重打标签（tags.retag）、月合并直接改写归档文件，
+sync_archive_dir() 按分区的内容哈希找出变了的分区重新导入、删掉已不存在的分区，库不会和归档走散。
+news.db 不提交进仓库，Actions 里用缓存保留，缓存丢了就从归档整个重建
+
+命令行：
+  python sqlite_store.py import            # 把 data/archive 下的日归档、月归档导入数据库
+  python sqlite_store.py sync              # 只导入内容变了的分区，删除已不存在的分区
+  python sqlite_store.py export 2026-08-22 # 导出某天的归档 JSON
+  python sqlite_store.py stats
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import sys
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from storage import json_codec
+from storage.compression import archive_name, compress, gzip_sibling_path, month_archives, write_gzip_sibling
+from storage.tag_table import load_news
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news_articles (
+    pk          INTEGER PRIMARY KEY,
+    id          TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    title_hash  INTEGER NOT NULL,
+    sort_time   TEXT NOT NULL,
+    archive_day TEXT NOT NULL,
+    source      TEXT NOT NULL DEFAULT '',
+    payload     BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_news_sort_time ON news_articles (sort_time);
+CREATE INDEX IF NOT EXISTS idx_news_source_time ON news_articles (source, sort_time);
+CREATE INDEX IF NOT EXISTS idx_news_id ON news_articles (id);
+CREATE INDEX IF NOT EXISTS idx_news_title_hash ON news_articles (title_hash, archive_day);
+CREATE INDEX IF NOT EXISTS idx_news_day_time ON news_articles (archive_day, sort_time);
+
+CREATE TABLE IF NOT EXISTS news_tags (
+    news_pk  INTEGER NOT NULL REFERENCES news_articles (pk) ON DELETE CASCADE,
+    kind     TEXT NOT NULL,
+    tag_id   TEXT NOT NULL,
+    PRIMARY KEY (news_pk, kind, tag_id)
+);
+CREATE INDEX IF NOT EXISTS idx_news_tags_tag ON news_tags (tag_id, news_pk);
+
+CREATE TABLE IF NOT EXISTS archive_sources (
+    name  TEXT PRIMARY KEY,
+    hash  TEXT NOT NULL
+);
+"""
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def default_db_path() -> Path:
+    """默认路径：项目根目录/data/news.db"""
+    project_root = Path(__file__).resolve().parent.parent.parent
+    return project_root / "data" / "news.db"
+
+
+def normalize_title(title: str) -> str:
+    """规范化标题：去掉首尾空白，连续空白合并成一个空格"""
+    return _WHITESPACE.sub(' ', (title or '').strip())
+
+
+def title_hash(title: str) -> int:
+    """规范化标题的 64 位哈希（有符号，放得进 SQLite INTEGER）"""
+    digest = hashlib.md5(normalize_title(title).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big', signed=True)
+
+
+def _sort_key(item: Dict) -> str:
+    """与 run_github_action.news_sort_key 一致：优先 showTime，没有则用 time"""
+    return item.get('showTime', item.get('time', '')) or ''
+
+
+def _tag_rows(item: Dict) -> List[tuple]:
+    tags = item.get('tags') or {}
+    rows = []
+    for kind, key in (('industry', 'industry_ids'), ('concept', 'concept_ids')):
+        for tag_id in tags.get(key) or []:
+            rows.append((kind, str(tag_id)))
+    return rows
+
+
+class SqliteNewsStore:
+    """SQLite 新闻库（同一进程内多线程共用一个连接，写入加锁）"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    # ---------- 写入 ----------
+
+    def upsert_many(self, items: Iterable[Dict], archive_day: str, refresh: bool = False) -> int:
+        """
+        批量写入某个归档日的新闻（一个事务）
+        同一归档日内标题相同时只保留时间更新的那条，返回实际新增/替换的条数
+        refresh=True 时同一时间的条目内容不同也替换（归档文件被重打标签后同步进库）
+        """
+        with self._lock, self.conn:
+            return self._upsert(self.conn.cursor(), items, archive_day, refresh)
+
+    def replace_day(self, items: Iterable[Dict], archive_day: str) -> int:
+        """用 items 整个替换某个归档日（一个事务），返回写入的条数"""
+        with self._lock, self.conn:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM news_articles WHERE archive_day = ?", (archive_day,))
+            return self._upsert(cursor, items, archive_day, False)
+
+    @staticmethod
+    def _upsert(cursor: sqlite3.Cursor, items: Iterable[Dict], archive_day: str, refresh: bool) -> int:
+        written = 0
+        for item in items:
+            title = normalize_title(item.get('title', ''))
+            if not title:
+                continue
+            sort_time = _sort_key(item)
+            hashed = title_hash(title)
+            payload = json_codec.dumps(item)
+
+            existing = cursor.execute(
+                "SELECT pk, sort_time, payload FROM news_articles "
+                "WHERE title_hash = ? AND archive_day = ? AND title = ?",
+                (hashed, archive_day, title)).fetchone()
+            if existing is not None:
+                if sort_time < existing[1] or (sort_time == existing[1] and
+                                               (not refresh or bytes(existing[2]) == payload)):
+                    continue
+                cursor.execute("DELETE FROM news_articles WHERE pk = ?", (existing[0],))
+
+            cursor.execute(
+                "INSERT INTO news_articles (id, title, title_hash, sort_time, archive_day, source, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(item.get('id', '')), title, hashed, sort_time, archive_day,
+                 item.get('source', '') or '', payload))
+            news_pk = cursor.lastrowid
+            tag_rows = _tag_rows(item)
+            if tag_rows:
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO news_tags (news_pk, kind, tag_id) VALUES (?, ?, ?)",
+                    [(news_pk, kind, tag_id) for kind, tag_id in tag_rows])
+            written += 1
+        return written
+
+    # ---------- 查询 ----------
+
+    def _payloads(self, sql: str, params: tuple = ()) -> List[bytes]:
+        with self._lock:
+            return [row[0] for row in self.conn.execute(sql, params)]
+
+    @staticmethod
+    def _decode(payloads: List[bytes]) -> List[Dict]:
+        return [json_codec.loads(payload) for payload in payloads]
+
+    def latest(self, limit: int = 50) -> List[Dict]:
+        """全库最新的 limit 条（走 sort_time 索引）"""
+        return self._decode(self._payloads(
+            "SELECT payload FROM news_articles ORDER BY sort_time DESC LIMIT ?", (limit,)))
+
+    def day(self, archive_day: str) -> List[Dict]:
+        """某个归档日的全部新闻，按时间倒序"""
+        return self._decode(self._payloads(
+            "SELECT payload FROM news_articles WHERE archive_day = ? ORDER BY sort_time DESC", (archive_day,)))
+
+    def time_range(self, start: str, end: str, source: Optional[str] = None, limit: int = 1000) -> List[Dict]:
+        """sort_time 在 [start, end) 内的新闻，可按来源过滤"""
+        if source:
+            return self._decode(self._payloads(
+                "SELECT payload FROM news_articles WHERE source = ? AND sort_time >= ? AND sort_time < ? "
+                "ORDER BY sort_time DESC LIMIT ?", (source, start, end, limit)))
+        return self._decode(self._payloads(
+            "SELECT payload FROM news_articles WHERE sort_time >= ? AND sort_time < ? "
+            "ORDER BY sort_time DESC LIMIT ?", (start, end, limit)))
+
+    def by_tag(self, tag_id: str, limit: int = 100) -> List[Dict]:
+        """带某个行业/概念标签 ID 的新闻，按时间倒序"""
+        return self._decode(self._payloads(
+            "SELECT a.payload FROM news_tags t JOIN news_articles a ON a.pk = t.news_pk "
+            "WHERE t.tag_id = ? ORDER BY a.sort_time DESC LIMIT ?", (str(tag_id), limit)))
+
+    def find_id(self, news_id: str) -> Optional[Dict]:
+        payloads = self._payloads("SELECT payload FROM news_articles WHERE id = ? LIMIT 1", (news_id,))
+        return json_codec.loads(payloads[0]) if payloads else None
+
+    def has_title(self, title: str, archive_day: Optional[str] = None) -> bool:
+        """标题是否已入库（走标题哈希索引）"""
+        title = normalize_title(title)
+        with self._lock:
+            if archive_day:
+                row = self.conn.execute(
+                    "SELECT 1 FROM news_articles WHERE title_hash = ? AND archive_day = ? AND title = ? LIMIT 1",
+                    (title_hash(title), archive_day, title)).fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT 1 FROM news_articles WHERE title_hash = ? AND title = ? LIMIT 1",
+                    (title_hash(title), title)).fetchone()
+        return row is not None
+
+    def count(self, archive_day: Optional[str] = None) -> int:
+        with self._lock:
+            if archive_day:
+                return self.conn.execute(
+                    "SELECT COUNT(*) FROM news_articles WHERE archive_day = ?", (archive_day,)).fetchone()[0]
+            return self.conn.execute("SELECT COUNT(*) FROM news_articles").fetchone()[0]
+
+    def day_time_range(self, archive_day: str):
+        """某个归档日的 (最早, 最新) 时间"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MIN(sort_time), MAX(sort_time) FROM news_articles WHERE archive_day = ?",
+                (archive_day,)).fetchone()
+        return row if row and row[0] else None
+
+    # ---------- 导入/导出 ----------
+
+    def export_day(self, archive_day: str, path: Path, commit=None) -> int:
+        """
+        把某个归档日导出成 JSON 数组（直接拼接已存的 payload，原子替换）和预压缩的 .json.gz，返回条数
+        commit（GroupCommit）不为空时两个文件都只暂存，由调用方提交
+        """
+        from storage.site_publisher import content_hash
+
+        payloads = self._payloads(
+            "SELECT payload FROM news_articles WHERE archive_day = ? ORDER BY sort_time DESC", (archive_day,))
+        if not payloads:
+            return 0
+        data = b'[' + b','.join(payloads) + b']'
+        if commit is not None:
+            commit.write_bytes(path, data)
+            commit.write_bytes(gzip_sibling_path(path), compress(data, 'gz'))
+        else:
+            write_payloads(path, payloads)
+            write_gzip_sibling(path)
+        # 导出的文件与库一致，下次同步时不用再导入
+        self._set_source_hash(archive_day, content_hash(data))
+        return len(payloads)
+
+    def source_hashes(self) -> Dict[str, str]:
+        """上次同步时各归档分区的内容哈希"""
+        with self._lock:
+            return dict(self.conn.execute("SELECT name, hash FROM archive_sources"))
+
+    def _set_source_hash(self, name: str, digest: str):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO archive_sources (name, hash) VALUES (?, ?)", (name, digest))
+
+    def sync_archive_dir(self, archive_dir: Path) -> Dict[str, int]:
+        """
+        按内容哈希增量同步 archive 目录，返回统计
+        - 日归档 / 月归档变了：整个归档日替换成文件的内容（重打标签、回补合并、月合并后的新月文件）
+        - 未收盘的段目录变了：合并进库（sqlite 后端当天的库里可能有段里没有的条目），同一条内容变了的也替换
+        - 库里记过、磁盘上已没有的分区（并入月归档的日归档）：删除这个归档日的全部条目
+        """
+        stats = {'partitions': 0, 'imported': 0, 'removed': 0, 'rows': 0}
+        known = self.source_hashes()
+        current = set()
+        for name, digest, load, replace in archive_partitions(archive_dir):
+            current.add(name)
+            stats['partitions'] += 1
+            if known.get(name) == digest:
+                continue
+            items = load()
+            if replace:
+                stats['rows'] += self.replace_day(items, name)
+            else:
+                stats['rows'] += self.upsert_many(items, name, refresh=True)
+            self._set_source_hash(name, digest)
+            stats['imported'] += 1
+
+        for name in set(known) - current:
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM news_articles WHERE archive_day = ?", (name,))
+                self.conn.execute("DELETE FROM archive_sources WHERE name = ?", (name,))
+            stats['removed'] += 1
+        return stats
+
+    def import_archive_dir(self, archive_dir: Path) -> Dict[str, int]:
+        """
+        导入 archive 目录：日归档（.json / 未收盘的段目录）按文件名的日期入库，
+        月归档（merged/YYYY-MM.json / .json.xz）的归档日记为 YYYY-MM
+        """
+        from storage.daily_log import DailyLog, open_days
+
+        archive_dir = Path(archive_dir)
+        imported = {}
+        for path in month_archives(archive_dir / "merged"):
+            imported[archive_name(path)] = self.upsert_many(load_news(path), archive_name(path))
+        for path in sorted(archive_dir.glob("20??-??-??.json")):
+            imported[path.stem] = self.upsert_many(json_codec.load_file(path), path.stem)
+        for day in open_days(archive_dir):
+            imported[day] = self.upsert_many(DailyLog(archive_dir, day).read_all(), day)
+        return imported
+
+    def close(self):
+        """合并 WAL 回主文件后关闭"""
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.close()
+
+
+def archive_partitions(archive_dir: Path) -> List[Tuple[str, str, Callable[[], List[Dict]], bool]]:
+    """
+    (归档日, 内容哈希, 读取函数, 是否整个替换)：月归档、已收盘的日归档、未收盘的段目录
+    段文件名里带内容哈希，段目录的哈希由段文件名算出，不用读段
+    """
+    from storage.daily_log import DailyLog, archive_days
+    from storage.site_publisher import content_hash, file_hash
+
+    archive_dir = Path(archive_dir)
+    result = []
+    for path in month_archives(archive_dir / "merged"):
+        result.append((archive_name(path), file_hash(path), lambda path=path: load_news(path), True))
+    for day in archive_days(archive_dir):
+        daily_log = DailyLog(archive_dir, day)
+        if daily_log.is_open:
+            names = [path.name for path in daily_log.segments()]
+            for path in (daily_log.legacy_log_path, daily_log.json_path):
+                if path.exists():
+                    names.append(file_hash(path))
+            result.append((day, content_hash('\n'.join(names).encode('utf-8')),
+                           lambda daily_log=daily_log: _load_open_day(daily_log), False))
+        elif daily_log.json_path.exists():
+            result.append((day, file_hash(daily_log.json_path),
+                           lambda path=daily_log.json_path: json_codec.load_file(path), True))
+    return result
+
+
+def _load_open_day(daily_log) -> List[Dict]:
+    """未收盘的一天：段里的新闻加上同日已有的 JSON（回补写过的），入库时按标题去重"""
+    items = json_codec.load_file(daily_log.json_path) if daily_log.json_path.exists() else []
+    return items + daily_log.read_all()
+
+
+def write_payloads(path: Path, payloads: List[bytes]):
+    """把若干条已序列化的 JSON 对象写成一个 JSON 数组（原子替换）"""
+    path = Path(path)
+    temp_path = path.with_suffix('.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(b'[' + b','.join(payloads) + b']')
+    os.replace(temp_path, path)
+
+
+def _iter_days(store: SqliteNewsStore) -> Iterator[str]:
+    with store._lock:
+        rows = store.conn.execute("SELECT DISTINCT archive_day FROM news_articles ORDER BY archive_day").fetchall()
+    for (day,) in rows:
+        yield day
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='SQLite 新闻库')
+    parser.add_argument('command', choices=['import', 'sync', 'export', 'stats'])
+    parser.add_argument('day', nargs='?', help='export 时指定归档日 YYYY-MM-DD')
+    parser.add_argument('--db', help='数据库路径（默认 data/news.db）')
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parent.parent.parent
+    archive_dir = project_root / "data" / "archive"
+    store = SqliteNewsStore(Path(args.db) if args.db else None)
+
+    if args.command == 'import':
+        start = time.perf_counter()
+        result = store.import_archive_dir(archive_dir)
+        print(f"✅ 导入 {len(result)} 个归档文件，写入 {sum(result.values())} 条，"
+              f"耗时 {time.perf_counter() - start:.1f}s")
+    elif args.command == 'sync':
+        start = time.perf_counter()
+        result = store.sync_archive_dir(archive_dir)
+        print(f"✅ 同步 {result['partitions']} 个分区：导入 {result['imported']} 个（{result['rows']} 条），"
+              f"删除 {result['removed']} 个，耗时 {time.perf_counter() - start:.1f}s")
+    elif args.command == 'export':
+        if not args.day:
+            parser.error('export 需要指定归档日')
+        count = store.export_day(args.day, archive_dir / f"{args.day}.json")
+        print(f"✅ 导出 {args.day}.json: {count} 条")
+    else:
+        print(f"📊 数据库: {store.path} ({store.path.stat().st_size / 1024 / 1024:.1f} MB)")
+        print(f"  总条数: {store.count()}")
+        for day in _iter_days(store):
+            print(f"  {day}: {store.count(day)} 条")
+    store.close()
@@ -0,0 +1,135 @@
+"""
+归一化的标签存储
+TagManager.add_to_news 给每条新闻的 tags 是完整展开的：每个匹配都带 id、name、level1、level2、matched_keyword，
+industry_ids / concept_ids 又把 ID 重复一遍。一个月文件里同样的行业名、概念名重复上万次，占了相当一部分字节。
+
+归一化格式：
+- 每条新闻只带 ID 列表和匹配关键词在文本（标题 + " " + 摘要）里的位置：
+    "tags": {"industry_ids": ["I010101"], "concept_ids": ["C012"], "offsets": [[3, 2], [15, 4]], "version": "..."}
+  offsets 与 industry_ids + concept_ids 一一对应，每项 [起点, 长度]；在文本里找不到时直接存关键词
+- 标签的元数据每个文件只存一份（标签字典）：{"I010101": {"name": ..., "level1": ..., "level2": ...}, "C012": {"name": ...}}
+- 整个文件是 {"format": "news-normalized-1", "news": [...], "tags": {...}}
+
+expand_news / load_news 读的时候还原成展开格式（与 TagManager.add_to_news 的输出相同），旧的数组格式原样返回。
+月归档（只给 Python 读的 .json.xz）按归一化格式写；网页读的文件（latest.json、日归档、分片、
+月归档的 .json.gz 网页副本）仍是展开的 JSON。
+同一个 ID 在一个文件里出现了不同的元数据（不同版本的标签库打的）时，后出现的那条新闻保持展开格式。
+"""
+
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+from storage import json_codec
+
+NORMALIZED_FORMAT = 'news-normalized-1'
+
+_EXPANDED_KEYS = {'industries', 'concepts', 'industry_ids', 'concept_ids', 'version'}
+
+
+def tag_text(item: Dict) -> str:
+    """打标签时匹配的文本，与 TagManager.match_news 一致"""
+    return item.get('title', '') + " " + (item.get('summary') or "")
+
+
+def compact_tags(tags: Dict, text: str, dictionary: Dict[str, Dict]) -> Optional[Dict]:
+    """展开的 tags -> 归一化的 tags，元数据并入 dictionary；不是标准的展开格式或与字典冲突时返回 None"""
+    industries = tags.get('industries')
+    concepts = tags.get('concepts')
+    if not isinstance(industries, list) or not isinstance(concepts, list) or set(tags) - _EXPANDED_KEYS:
+        return None
+    industry_ids = [entry.get('id') for entry in industries]
+    concept_ids = [entry.get('id') for entry in concepts]
+    if tags.get('industry_ids') != industry_ids or tags.get('concept_ids') != concept_ids:
+        return None
+
+    pending: Dict[str, Dict] = {}
+    offsets: List[Union[List[int], str]] = []
+    for entry in industries + concepts:
+        tag_id = entry.get('id')
+        keyword = entry.get('matched_keyword')
+        if tag_id is None or not isinstance(keyword, str):
+            return None
+        meta = {key: value for key, value in entry.items() if key not in ('id', 'matched_keyword')}
+        known = pending.get(tag_id, dictionary.get(tag_id))
+        if known is not None and known != meta:
+            return None
+        pending[tag_id] = meta
+        start = text.find(keyword)
+        offsets.append([start, len(keyword)] if start >= 0 else keyword)
+
+    dictionary.update(pending)
+    compact = {'industry_ids': industry_ids, 'concept_ids': concept_ids, 'offsets': offsets}
+    if 'version' in tags:
+        compact['version'] = tags['version']
+    return compact
+
+
+def expand_tags(tags: Dict, text: str, dictionary: Dict[str, Dict]) -> Dict:
+    """归一化的 tags -> 展开格式；本来就是展开格式的原样返回"""
+    if 'offsets' not in tags:
+        return tags
+    industry_ids = tags.get('industry_ids', [])
+    concept_ids = tags.get('concept_ids', [])
+    entries = []
+    for tag_id, offset in zip(industry_ids + concept_ids, tags['offsets']):
+        keyword = offset if isinstance(offset, str) else text[offset[0]:offset[0] + offset[1]]
+        entries.append({'id': tag_id, **dictionary.get(tag_id, {}), 'matched_keyword': keyword})
+    expanded = {
+        'industries': entries[:len(industry_ids)],
+        'concepts': entries[len(industry_ids):],
+        'industry_ids': industry_ids,
+        'concept_ids': concept_ids
+    }
+    if 'version' in tags:
+        expanded['version'] = tags['version']
+    return expanded
+
+
+def compact_item(item: Dict, dictionary: Dict[str, Dict]) -> Dict:
+    """一条新闻的归一化副本（不修改原对象）；tags 无法归一化时原样返回"""
+    tags = item.get('tags')
+    if not isinstance(tags, dict):
+        return item
+    compact = compact_tags(tags, tag_text(item), dictionary)
+    return item if compact is None else {**item, 'tags': compact}
+
+
+def normalize_news(news: Iterable[Dict]) -> Dict:
+    """新闻列表 -> 归一化的文件内容"""
+    dictionary: Dict[str, Dict] = {}
+    items = [compact_item(item, dictionary) for item in news]
+    return {'format': NORMALIZED_FORMAT, 'news': items, 'tags': dictionary}
+
+
+def expand_news(data) -> List[Dict]:
+    """文件内容 -> 展开格式的新闻列表（旧的数组格式原样返回）"""
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict) or data.get('format') != NORMALIZED_FORMAT:
+        raise ValueError(f"未知的归档格式: {data.get('format') if isinstance(data, dict) else type(data).__name__}")
+    dictionary = data.get('tags', {})
+    news = data.get('news', [])
+    for item in news:
+        tags = item.get('tags')
+        if isinstance(tags, dict):
+            item['tags'] = expand_tags(tags, tag_text(item), dictionary)
+    return news
+
+
+def load_news(path: Union[str, Path]) -> List[Dict]:
+    """读取归档文件（数组或归一化格式，可以是压缩的），返回展开格式的新闻列表"""
+    return expand_news(json_codec.load_file(path))
+
+
+def write_normalized(f: BinaryIO, items: Iterable[Dict]) -> Tuple[int, Dict[str, Dict]]:
+    """流式写出归一化格式（标签字典在新闻之后写），返回 (条数, 标签字典)"""
+    dictionary: Dict[str, Dict] = {}
+    count = 0
+    f.write(b'{"format":' + json_codec.dumps(NORMALIZED_FORMAT) + b',"news":[')
+    for item in items:
+        if count:
+            f.write(b',')
+        f.write(json_codec.dumps(compact_item(item, dictionary)))
+        count += 1
+    f.write(b'],"tags":' + json_codec.dumps(dictionary) + b'}')
+    return count, dictionary
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+并行批量打标签基准测试：合成语料（默认 100 万条）分别用 TagManager.iter_tagged（单进程）和
+BulkTagger（2、4…个工作进程）打标签，给出吞吐和相对单进程的加速比，并核对前若干条的结果与单进程完全一致。
+父进程要切块、收发和拆包，"父进程CPU" 是它每条花的 CPU 时间（含进程池的收发线程）：
+单进程每条耗时 / 父进程每条 CPU 就是加核的上限，核数远低于它时加速接近线性。
+
+语料 = 日归档里的真实新闻（标题 + 摘要）有放回地随机抽取，边生成边打标签，不整个放进内存；
+标签库默认是 data/tags.json，--keywords 指定时按 bench_keyword_match 的方法补合成概念。
+运行方式：python bench_bulk_tagging.py [--items 1000000] [--workers 2 4 8] [--keywords 30000] [--chunk-size 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+# 添加 src 目录到 Python 路径
+current_file = Path(__file__).resolve()
+src_dir = current_file.parent.parent
+project_root = src_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from storage import json_codec
+from tags.bench_keyword_match import synthetic_tags
+from tags.bulk_tagger import DEFAULT_CHUNK_SIZE, BulkTagger
+from tags.tag_manager import TagManager
+
+# 核对结果的条数（核对时要把两边的结果都留在内存里）
+VERIFY_ITEMS = 20000
+
+
+def load_samples() -> List[Dict]:
+    """所有日归档里的新闻（只留标题和摘要）"""
+    samples = []
+    for path in sorted((project_root / "data" / "archive").glob("20??-??-??.json")):
+        for item in json_codec.load_file(path):
+            samples.append({'title': item.get('title', ''), 'summary': item.get('summary', '')})
+    return samples
+
+
+def corpus(samples: List[Dict], count: int, seed: int = 42) -> Iterator[Dict]:
+    """有放回地抽取 count 条（每条是新的 dict，打标签时原地修改）"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        sample = rng.choice(samples)
+        yield {'title': sample['title'], 'summary': sample['summary']}
+
+
+def timed_run(items: Iterator[Dict], tag_iter) -> Tuple[float, float]:
+    """消费打好标签的新闻（只计数），返回 (耗时, 本进程的 CPU 时间)"""
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    count = 0
+    for _ in tag_iter(items):
+        count += 1
+    return time.perf_counter() - start, time.process_time() - cpu_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并行批量打标签基准测试')
+    parser.add_argument('--items', type=int, default=1000000, help='合成语料条数')
+    parser.add_argument('--workers', type=int, nargs='+', help='工作进程数（默认 2、4… 直到 CPU 核数）')
+    parser.add_argument('--keywords', type=int, help='标签库关键词总数（默认用 data/tags.json 原样）')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='每块新闻条数')
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers_list = args.workers or sorted({1 << i for i in range(1, cpus.bit_length())} | ({cpus} - {1})) or [2]
+    samples = load_samples()
+    if not samples:
+        print("❌ 没有日归档可用作样本")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tags_path = project_root / "data" / "tags.json"
+        if args.keywords:
+            base = json_codec.load_file(tags_path)
+            tags_path = Path(tmp) / "tags.json"
+            json_codec.dump_file(tags_path, synthetic_tags(base, samples, args.keywords))
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager = TagManager(tags_path)
+        keywords = len(manager.industry_keywords) + len(manager.concept_keywords)
+        print(f"📰 样本 {len(samples)} 条，合成语料 {args.items} 条，关键词 {keywords} 个，"
+              f"CPU {cpus} 核，每块 {args.chunk_size} 条")
+
+        # 核对：并行（最多的进程数）与单进程的结果逐条相同
+        verify_count = min(VERIFY_ITEMS, args.items)
+        expected = [item['tags'] for item in manager.iter_tagged(corpus(samples, verify_count))]
+        with BulkTagger(manager, max(workers_list), args.chunk_size) as tagger:
+            actual = [item['tags'] for item in tagger.iter_tagged(corpus(samples, verify_count))]
+        same = '一致' if actual == expected else '❌ 不一致'
+        print(f"🔍 前 {verify_count} 条与单进程结果{same}")
+        del expected, actual
+
+        print(f"\n{'方式':<14}{'耗时':>9}{'吞吐':>14}{'加速':>8}{'效率':>8}{'父进程CPU':>12}")
+        serial, serial_cpu = timed_run(corpus(samples, args.items), manager.iter_tagged)
+        print(f"{'单进程':<11}{serial:>8.1f}s{args.items / serial:>10.0f}条/s{1:>7.2f}x{'':>8}"
+              f"{serial_cpu / args.items * 1e6:>9.1f}µs")
+        for workers in workers_list:
+            with BulkTagger(manager, workers, args.chunk_size) as tagger:
+                elapsed, parent_cpu = timed_run(corpus(samples, args.items), tagger.iter_tagged)
+            speedup = serial / elapsed
+            print(f"{f'{workers} 进程':<12}{elapsed:>8.1f}s{args.items / elapsed:>10.0f}条/s"
+                  f"{speedup:>7.2f}x{speedup / workers:>7.0%}{parent_cpu / args.items * 1e6:>9.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+标签匹配基准测试：标签库关键词数从几百到几万时，逐个 `keyword in text`（以前的做法）
+与 Aho-Corasick 自动机（TagManager 现在的做法）的吞吐对比，并核对两者的匹配结果完全一致；
+同时给出 TagManager 的冷启动（解析 + 构建索引 + 写缓存）和热启动（读 tags.cache）耗时。
+
+标签库 = data/tags.json + 合成的概念（每个 5 个关键词，一半取自另一天新闻标题里的片段、一半随机汉字，
+模拟真实的板块名和股票简称）；新闻取最大的日归档。
+运行方式：python bench_keyword_match.py [--keywords 300 3000 30000] [--news 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 添加 src 目录到 Python 路径
+current_file = Path(__file__).resolve()
+src_dir = current_file.parent.parent
+project_root = src_dir.parent
+sys.path.insert(0, str(src_dir))
+
+from storage import json_codec
+from tags.tag_manager import TagManager
+
+
+def load_news(limit: int) -> Tuple[List[Dict], List[Dict]]:
+    """(样本新闻, 用来截取合成关键词的另一天的新闻)：关键词不从样本本身截取，否则命中率虚高"""
+    archive_dir = project_root / "data" / "archive"
+    daily = sorted(archive_dir.glob("20??-??-??.json"), key=lambda p: p.stat().st_size, reverse=True)
+    if not daily:
+        return [], []
+    other = json_codec.load_file(daily[1]) if len(daily) > 1 else []
+    return json_codec.load_file(daily[0])[:limit], other
+
+
+def synthetic_tags(base: Dict, source: List[Dict], keyword_count: int, seed: int = 42) -> Dict:
+    """在真实标签库上补合成概念，直到关键词总数达到 keyword_count"""
+    rng = random.Random(seed)
+    titles = [item.get('title', '') for item in source if len(item.get('title', '')) >= 6]
+    tags = json_codec.loads(json_codec.dumps(base))
+    existing = sum(len(level3.get('keywords', []))
+                   for level1 in tags.get('industries', {}).get('level1', [])
+                   for level2 in level1.get('level2', [])
+                   for level3 in level2.get('level3', []))
+    existing += sum(len(concept.get('keywords', [])) for concept in tags.get('concepts', []))
+
+    seen = set()
+    concepts = tags.setdefault('concepts', [])
+    remaining = keyword_count - existing
+    while remaining > 0:
+        keywords = []
+        while len(keywords) < min(5, remaining):
+            length = rng.randint(2, 5)
+            if titles and rng.random() < 0.5:
+                title = rng.choice(titles)
+                start = rng.randint(0, len(title) - length)
+                keyword = title[start:start + length]
+            else:
+                keyword = ''.join(chr(rng.randint(0x4e00, 0x9fa5)) for _ in range(length))
+            if keyword not in seen:
+                seen.add(keyword)
+                keywords.append(keyword)
+        concepts.append({'id': f"S{len(concepts):06d}", 'name': keywords[0], 'keywords': keywords})
+        remaining -= len(keywords)
+    return tags
+
+
+def naive_match(manager: TagManager, title: str, summary: str = "") -> Dict:
+    """以前的 match_news：每个关键词一次子串查找"""
+    text = title + " " + (summary or "")
+    matched_industries = []
+    matched_concepts = []
+    for keyword, info in manager.industry_keywords.items():
+        if keyword in text:
+            matched_industries.append({'id': info['id'], 'name': info['name'], 'level1': info['level1'],
+                                       'level2': info['level2'], 'matched_keyword': keyword})
+    for keyword, info in manager.concept_keywords.items():
+        if keyword in text:
+            matched_concepts.append({'id': info['id'], 'name': info['name'], 'matched_keyword': keyword})
+    unique_industries = {item['id']: item for item in matched_industries}.values()
+    unique_concepts = {item['id']: item for item in matched_concepts}.values()
+    return {
+        'industries': list(unique_industries),
+        'concepts': list(unique_concepts),
+        'industry_ids': [item['id'] for item in unique_industries],
+        'concept_ids': [item['id'] for item in unique_concepts]
+    }
+
+
+def timed(func, news: List[Dict]):
+    start = time.perf_counter()
+    results = [func(item.get('title', ''), item.get('summary', '')) for item in news]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='标签匹配基准测试')
+    parser.add_argument('--keywords', type=int, nargs='+', default=[300, 1000, 3000, 10000, 30000],
+                        help='标签库关键词总数')
+    parser.add_argument('--news', type=int, default=2000, help='参与匹配的新闻条数')
+    args = parser.parse_args()
+
+    news, source = load_news(args.news)
+    if not news:
+        print("❌ 没有日归档可用作样本")
+        sys.exit(1)
+    base = json_codec.load_file(project_root / "data" / "tags.json")
+    print(f"📰 样本新闻 {len(news)} 条")
+    print(f"\n{'关键词':>8}{'状态数':>10}{'冷启动':>9}{'热启动':>9}{'逐个查找':>12}{'自动机':>12}{'加速':>8}{'每条命中':>10}  结果")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for keyword_count in args.keywords:
+            tags_path = Path(tmp) / f"tags-{keyword_count}.json"
+            json_codec.dump_file(tags_path, synthetic_tags(base, source, keyword_count))
+            # 冷启动：没有缓存，解析 + 构建 + 写缓存；热启动：读缓存
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                TagManager(tags_path)
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                manager = TagManager(tags_path)
+            warm = time.perf_counter() - start
+
+            naive_time, expected = timed(lambda t, s: naive_match(manager, t, s), news)
+            automaton_time, actual = timed(manager.match_news, news)
+            same = '一致' if actual == expected else '❌ 不一致'
+            hits = sum(len(result['industries']) + len(result['concepts']) for result in actual) / len(news)
+            total = len(manager.industry_keywords) + len(manager.concept_keywords)
+            print(f"{total:>8}{manager.automaton.states:>10}{cold * 1000:>7.0f}ms{warm * 1000:>7.0f}ms"
+                  f"{len(news) / naive_time:>9.0f}条/s{len(news) / automaton_time:>9.0f}条/s"
+                  f"{naive_time / automaton_time:>7.1f}x{hits:>10.1f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+并行批量打标签
+TagManager.add_to_news_list 是单进程逐条匹配，每次采集几十条没问题；全部重打几个月的归档、大段回补时
+几十万条新闻都压在一个核上。BulkTagger 把输入切成块，交给进程池里的工作进程打标签：
+
+- 编译好的索引只建一次：能 fork 的平台上工作进程直接继承父进程的 TagManager（写时复制，不序列化）；
+  不能 fork 时（spawn）工作进程用 tags.json 的路径构造 TagManager，读的是 tags.cache，不用重新构建
+- 进出工作进程的只有标题 + 摘要和匹配结果，新闻里其他字段不经过进程间传输
+- 结果按输入顺序流式返回：同时在途的块数有上限，上游是生成器时不会整个读进内存
+- workers=1 时不建进程池，和 TagManager.iter_tagged 一样在当前进程逐条打
+
+用法：
+    with BulkTagger(manager, workers=4) as tagger:
+        for item in tagger.iter_tagged(news_iter):
+            ...
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tags.tag_manager import TagManager
+
+# 每块的新闻条数：太小时进程间往返的开销占比高，太大时首个结果要等得久
+DEFAULT_CHUNK_SIZE = 2000
+# 每个工作进程同时在途的块数（限制内存，同时保证工作进程不空等）
+IN_FLIGHT_PER_WORKER = 2
+
+# 工作进程里的 TagManager（进程池初始化时设置）
+_worker_manager: Optional[TagManager] = None
+
+
+def _init_worker(manager: Optional[TagManager], tags_path: Optional[str]):
+    """工作进程初始化：fork 时直接用继承来的 manager，否则从 tags.cache 加载"""
+    global _worker_manager
+    _worker_manager = manager if manager is not None else TagManager(tags_path)
+
+
+def _tag_chunk(chunk: List[Tuple[str, str]], normalized: bool) -> List[Dict]:
+    """工作进程：给一块 (标题, 摘要) 打标签，返回对应的 tags"""
+    results = []
+    for title, summary in chunk:
+        item = {'title': title, 'summary': summary}
+        _worker_manager.add_to_news(item, normalized)
+        results.append(item['tags'])
+    return results
+
+
+class BulkTagger:
+    """用进程池给大批新闻打标签，进程池在 with 块内复用"""
+
+    def __init__(self, manager: TagManager, workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, start_method: Optional[str] = None):
+        """workers 默认等于 CPU 核数；start_method 默认能 fork 就 fork，否则 spawn"""
+        self.manager = manager
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        if start_method is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.start_method = start_method
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            context = multiprocessing.get_context(self.start_method)
+            # fork 时 initargs 随进程继承，不经过 pickle；spawn 时只传路径，避免把整个索引序列化给每个进程
+            if self.start_method == 'fork':
+                initargs = (self.manager, None)
+            else:
+                initargs = (None, str(self.manager.tags_path))
+            self._pool = context.Pool(self.workers, initializer=_init_worker, initargs=initargs)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _chunks(self, news_iter: Iterable[Dict]) -> Iterator[List[Dict]]:
+        chunk = []
+        for item in news_iter:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def iter_tagged(self, news_iter: Iterable[Dict], normalized: bool = False) -> Iterator[Dict]:
+        """按输入顺序逐条返回打好标签的新闻（原地修改，与 TagManager.add_to_news 的结果相同）"""
+        if self._pool is None:
+            for item in news_iter:
+                yield self.manager.add_to_news(item, normalized)
+            return
+
+        pending = deque()
+        limit = self.workers * IN_FLIGHT_PER_WORKER
+        for chunk in self._chunks(news_iter):
+            texts = [(item.get('title', ''), item.get('summary', '')) for item in chunk]
+            pending.append((chunk, self._pool.apply_async(_tag_chunk, (texts, normalized))))
+            if len(pending) >= limit:
+                yield from self._collect(*pending.popleft())
+        while pending:
+            yield from self._collect(*pending.popleft())
+
+    @staticmethod
+    def _collect(chunk: List[Dict], result) -> Iterator[Dict]:
+        for item, tags in zip(chunk, result.get()):
+            item['tags'] = tags
+            yield item
+
+    def tag_list(self, news_list: List[Dict], normalized: bool = False) -> List[Dict]:
+        """批量打标签，返回列表（同 TagManager.add_to_news_list）"""
+        return list(self.iter_tagged(news_list, normalized))
@@ -4,15 +4,22 @@
 运行方式：python fetch_from_eastmoney.py
 """
 
-import requests
 from bs4 import BeautifulSoup
-import json
 import time
 import re
-from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple
 
+import sys
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from storage import json_codec
+
 
 class EastMoneyTagFetcher:
     """东方财富标签抓取器"""
@@ -21,8 +28,6 @@ class EastMoneyTagFetcher:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
 
     def fetch_industries(self) -> Dict:
         """
@@ -299,8 +304,8 @@ class EastMoneyTagFetcher:
         # 确保目录存在
         tags_path.parent.mkdir(exist_ok=True)
 
-        with open(tags_path, "w", encoding="utf-8") as f:
-            json.dump(tags, f, ensure_ascii=False, indent=2)
+        # tags.json 需要人工查看，保留缩进
+        json_codec.dump_file(tags_path, tags, pretty=True)
 
         # 统计信息
         industry_count = len(industries.get("level3_index", {}))
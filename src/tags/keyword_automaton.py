@@ -0,0 +1,88 @@
+"""
+多模式关键词匹配（Aho-Corasick 自动机）
+TagManager 以前对每个关键词各做一次 `keyword in text`，耗时与标签库的关键词数成正比；
+标签库要从几百个关键词扩到几万个板块名和股票简称，这样扫下去每条新闻要几毫秒。
+
+自动机在 build_indexes 时构建一次：
+- 所有关键词建成一棵字典树（按字符，区分大小写，与 `in` 的语义一致）
+- 广度优先补上失败链接，每个状态的输出 = 自己结尾的关键词 + 失败链接状态的输出
+匹配时只把文本扫一遍，耗时与文本长度有关、与关键词数量无关。
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class KeywordAutomaton:
+    """一组关键词的 Aho-Corasick 自动机，find() 返回文本里出现过的关键词编号"""
+
+    def __init__(self, keywords: Iterable[str]):
+        # 关键词编号 = 传入顺序
+        self.keywords: List[str] = []
+        # 每个状态的转移表（字符 -> 状态），0 是根
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        # 空关键词：`'' in text` 总是成立
+        self._always: Tuple[int, ...] = ()
+        own: List[List[int]] = [[]]
+        for keyword in keywords:
+            index = len(self.keywords)
+            self.keywords.append(keyword)
+            if not keyword:
+                self._always += (index,)
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    own.append([])
+                state = next_state
+            own[state].append(index)
+        self._build(own)
+
+    def _build(self, own: List[List[int]]):
+        """广度优先计算失败链接，并把失败链接上的输出并进来"""
+        self._output = [tuple(indexes) for indexes in own]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                if self._output[fail]:
+                    self._output[next_state] = self._output[next_state] + self._output[fail]
+
+    def __len__(self):
+        return len(self.keywords)
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def find(self, text: str) -> Set[int]:
+        """文本里出现过的全部关键词编号（每个关键词只算一次）"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found: Set[int] = set(self._always)
+        # 同一个状态的输出只需要收集一次
+        visited: Set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if state and state not in visited:
+                visited.add(state)
+                found.update(output[state])
+        return found
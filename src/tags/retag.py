@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""
+标签库更新后的增量重打标签
+fetch_from_eastmoney.EastMoneyTagFetcher.update_tags_file 发布新的 tags.json 后，归档里已有新闻的 tags 还是旧的，
+全部重打要读写整个归档。这里只找真正受影响的新闻：
+
+1. 对比上次应用到归档的标签库（data/tags.applied.json，tags.json 的逐字节副本）和当前的 tags.json，
+   得到变化的关键词：新增的、删除的、对应的行业/概念变了的（改名、换 ID）。
+   不含变化关键词的新闻，匹配结果只取决于没变的关键词，和原来完全一样，不用动
+2. 用全文检索索引（storage.search_index，一个分区对应一个归档文件）找含变化关键词的候选新闻：
+   - 关键词里有连续汉字：取它各个二元组倒排的交集
+   - 只有字母数字：在分区词表里找包含它的词（词表用自动机扫一遍），取这些词倒排的并集
+   - 只有单个汉字（前后不是汉字时切不出二元组，索引里没有）：整个分区都是候选
+   候选用原文（标题 + 摘要）核对后重新匹配，tags 有变化的才改写，tags.version 记下新的标签库版本
+3. 只重写有新闻改动的归档文件：当天的段换成新的段文件，日归档连同 .json.gz，月归档连同网页副本和 .rec
+4. 全部完成后更新 tags.applied.json；中途中断时下次重跑即可（重打标签可重复执行）
+
+采集运行在归档整理之后检查 tags.json 和快照是否一致，不一致时自动执行。
+第一次运行没有快照时只把当前标签库记为基线（可以用 --old 指定旧版 tags.json 对比）。
+索引不收超过 32 个字符的字母数字串（链接、编码串），只出现在这种串里的纯字母数字关键词找不到；
+需要时用 --full 全部重打；全部重打时可以用 --workers 让多个进程并行打标签（tags.bulk_tagger）。
+latest.json、热窗口、小时分片这些滚动文件不重打（一天内自然换新），SQLite 后端的 news.db 在下次采集打开库时按内容哈希同步改过的归档。
+
+命令行：
+  python retag.py                      # 对比快照，增量重打
+  python retag.py --old old_tags.json  # 指定旧版标签库
+  python retag.py --full               # 全部重打
+  python retag.py --full --workers 4   # 全部重打，4 个进程并行打标签
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from storage import json_codec
+from storage.compression import write_bytes_atomic, write_gzip_sibling
+from storage.daily_log import DailyLog
+from storage.month_archive import rewrite_month
+from storage.search_index import SearchIndex, Segment, text_runs, tokenize
+from tags.bulk_tagger import BulkTagger
+from tags.keyword_automaton import KeywordAutomaton
+from tags.tag_manager import TagManager
+
+# 上次应用到归档的标签库快照
+APPLIED_NAME = "tags.applied.json"
+
+
+def changed_keywords(old: TagManager, new: TagManager) -> List[str]:
+    """新旧标签库之间新增、删除或对应标签变了的关键词"""
+    changed = set()
+    for attr in ('industry_keywords', 'concept_keywords'):
+        old_keywords, new_keywords = getattr(old, attr), getattr(new, attr)
+        for keyword in old_keywords.keys() | new_keywords.keys():
+            if old_keywords.get(keyword) != new_keywords.get(keyword):
+                changed.add(keyword)
+    return sorted(changed)
+
+
+def candidate_docs(segment: Segment, keywords: List[str]) -> Optional[Set[int]]:
+    """分区里可能含有这些关键词的文档号；有关键词无法用索引查找（单个汉字、只有标点）时返回 None，整个分区都是候选"""
+    docs: Set[int] = set()
+    fragments = []
+    for keyword in keywords:
+        bigrams = [term for term in tokenize(keyword) if not term[0].isascii()]
+        if bigrams:
+            postings = [segment.lookup(term) for term in bigrams]
+            if any(entry is None for entry in postings):
+                continue
+            postings.sort(key=lambda entry: len(entry[0]))
+            found = set(postings[0][0])
+            for entry in postings[1:]:
+                found.intersection_update(entry[0])
+            docs.update(found)
+            continue
+        runs = [run for run in text_runs(keyword) if run.isascii()]
+        if not runs:
+            return None
+        fragments.append(max(runs, key=len))
+
+    if fragments:
+        automaton = KeywordAutomaton(fragments)
+        for i in range(segment.term_count):
+            if automaton.find(segment.term_string(i)):
+                docs.update(segment.term_postings(i)[0])
+    return docs
+
+
+def _same_tags(previous: Dict, current: Dict) -> bool:
+    """除 version 以外的字段都相同"""
+    return all(previous.get(key) == value for key, value in current.items() if key != 'version')
+
+
+def retag_items(items: List[Dict], tagger: BulkTagger, titles: Optional[Set[str]],
+                verify: Optional[KeywordAutomaton]) -> int:
+    """
+    重打 items 里标题在 titles 中（titles 为 None 时全部）的新闻，原地修改，返回 tags 变了的条数
+    verify 不为空时先核对原文里确实有变化的关键词
+    """
+    selected = []
+    for item in items:
+        title = item.get('title', '')
+        if titles is not None and title not in titles:
+            continue
+        if verify is not None and not verify.find(title + " " + (item.get('summary') or "")):
+            continue
+        selected.append(item)
+
+    previous = [item.get('tags') or {} for item in selected]
+    retagged = 0
+    for item, old_tags in zip(tagger.iter_tagged(selected), previous):
+        if _same_tags(old_tags, item['tags']):
+            item['tags'] = old_tags
+            continue
+        retagged += 1
+    return retagged
+
+
+def _write_partition(archive_dir: Path, source: Path, items: List[Dict]):
+    """按归档文件的类型写回"""
+    if source.parent.parent == archive_dir and source.parent.name != "merged":
+        # 当天的段
+        DailyLog(archive_dir, source.parent.name).replace_segment(source, items)
+    elif source.parent == archive_dir:
+        write_bytes_atomic(source, json_codec.dumps(items))
+        write_gzip_sibling(source)
+    else:
+        rewrite_month(source, items)
+
+
+def retag_archive(data_dir: Path, old_tags_path: Optional[Path] = None, full: bool = False,
+                  manager: Optional[TagManager] = None, workers: int = 1) -> Dict[str, int]:
+    """
+    按标签库的变化增量重打归档里的新闻（full=True 时全部重打），返回统计：
+    变化的关键词数、扫描的分区数、候选条数、重打条数、重写的文件数；baseline=1 表示只记录了基线
+    workers > 1 时用进程池并行打标签（进程池在整个重打过程中复用）
+    """
+    data_dir = Path(data_dir)
+    tags_path = data_dir / "tags.json"
+    applied_path = data_dir / APPLIED_NAME
+    archive_dir = data_dir / "archive"
+    stats = {'keywords': 0, 'partitions': 0, 'candidates': 0, 'retagged': 0, 'files': 0, 'baseline': 0}
+    if not tags_path.exists():
+        return stats
+    with open(tags_path, 'rb') as f:
+        tags_bytes = f.read()
+
+    old_path = Path(old_tags_path) if old_tags_path else applied_path
+    old = None
+    if not full:
+        if not old_path.exists():
+            write_bytes_atomic(applied_path, tags_bytes)
+            stats['baseline'] = 1
+            return stats
+        with open(old_path, 'rb') as f:
+            if f.read() == tags_bytes:
+                return stats
+        old = TagManager(old_path, use_cache=False)
+
+    manager = manager or TagManager(tags_path)
+    if full:
+        keywords = list(manager.industry_keywords) + list(manager.concept_keywords)
+    else:
+        keywords = changed_keywords(old, manager)
+    stats['keywords'] = len(keywords)
+
+    if keywords:
+        verify = None if full else KeywordAutomaton(keywords)
+        index = SearchIndex(data_dir / "search")
+        try:
+            # 候选要从最新的索引里找
+            index.update(archive_dir)
+            with BulkTagger(manager, workers) as tagger:
+                for name, source, load in index.partitions(archive_dir):
+                    titles = None
+                    if not full:
+                        segment = index.segment(name)
+                        docs = candidate_docs(segment, keywords) if segment is not None else None
+                        if docs is not None:
+                            if not docs:
+                                continue
+                            titles = {segment.document(doc_no)['title'] for doc_no in docs}
+                    stats['partitions'] += 1
+                    stats['candidates'] += len(titles) if titles is not None else 0
+                    items = load()
+                    retagged = retag_items(items, tagger, titles, verify)
+                    if retagged:
+                        _write_partition(archive_dir, source, items)
+                        stats['retagged'] += retagged
+                        stats['files'] += 1
+        finally:
+            index.close()
+
+    write_bytes_atomic(applied_path, tags_bytes)
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='标签库更新后的增量重打标签')
+    parser.add_argument('--data-dir', help='数据目录（默认 data）')
+    parser.add_argument('--old', help='旧版 tags.json（默认 data/tags.applied.json）')
+    parser.add_argument('--full', action='store_true', help='全部重打')
+    parser.add_argument('--workers', type=int, default=1, help='并行打标签的进程数（默认 1，不建进程池）')
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir) if args.data_dir else Path(__file__).resolve().parent.parent.parent / "data"
+    started = time.perf_counter()
+    result = retag_archive(data_dir, args.old, args.full, workers=args.workers)
+    if result['baseline']:
+        print(f"✅ 没有 {APPLIED_NAME}，已把当前标签库记为基线")
+    else:
+        print(f"✅ 变化关键词 {result['keywords']} 个，扫描 {result['partitions']} 个分区、"
+              f"候选 {result['candidates']} 条，重打 {result['retagged']} 条，重写 {result['files']} 个文件，"
+              f"耗时 {time.perf_counter() - started:.2f}s")
@@ -1,14 +1,35 @@
-import json
+import bisect
+import hashlib
 import os
+import pickle
+import sys
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# 添加 src 目录到 Python 路径（单独运行本文件时需要）
+src_dir = str(Path(__file__).resolve().parent.parent)
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from storage import json_codec
+from storage.tag_table import compact_tags, tag_text
+from tags.keyword_automaton import KeywordAutomaton
+
+# 编译好的索引缓存（tags.json 旁边的 tags.cache）：文件头 + tags.json 的 SHA-256 + pickle 数据
+# 索引的结构（字段、自动机）有变化时改 CACHE_MAGIC 的版本号，旧缓存自动作废
+# 缓存只在本机生成和使用，不进仓库（.gitignore 和工作流的 git add 都排除了它）：pickle 不能来自不可信的来源
+CACHE_MAGIC = b'TAGIDX01'
+CACHE_SUFFIX = '.cache'
+# 标签库里的 ID → 元数据表、关键词表和自动机，缓存里按这些属性保存
+CACHE_FIELDS = ('tags', 'industry_keywords', 'concept_keywords', 'industry_by_id', 'concept_by_id',
+                'industry_keyword_list', 'concept_keyword_list', 'automaton')
 
 
 class TagManager:
     """标签管理器：加载标签库，为新闻匹配行业和概念"""
 
-    def __init__(self, tags_path: str = None):
-        """初始化标签管理器"""
+    def __init__(self, tags_path: str = None, use_cache: bool = True):
+        """初始化标签管理器（use_cache=False 时不读写 tags.cache，比如加载旧版本标签库做对比）"""
         if tags_path is None:
             # 默认路径：项目根目录/data/tags.json
             current_file = Path(__file__).resolve()
@@ -16,31 +37,93 @@ class TagManager:
             tags_path = project_root / "data" / "tags.json"
 
         self.tags_path = tags_path
-        self.tags = self.load_tags()
-        self.build_indexes()
+        self.cache_path = Path(tags_path).with_suffix(CACHE_SUFFIX)
+        # 标签库没变（内容哈希相同）时直接读编译好的缓存，否则解析、构建并重写缓存
+        digest = self.source_digest() if use_cache else None
+        if digest is None or not self.load_cache(digest):
+            self.tags = self.load_tags()
+            self.build_indexes()
+            # 解析失败时用的是空标签库，不缓存
+            if digest is not None and self.tags_loaded:
+                self.save_cache(digest)
 
     def load_tags(self) -> Dict:
         """加载标签库JSON文件"""
+        self.tags_loaded = False
         if not os.path.exists(self.tags_path):
             print(f"⚠️ 标签文件不存在: {self.tags_path}")
             return {"industries": {}, "concepts": []}
 
         try:
-            with open(self.tags_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            tags = json_codec.load_file(self.tags_path)
         except Exception as e:
             print(f"❌ 加载标签文件失败: {e}")
             return {"industries": {}, "concepts": []}
+        self.tags_loaded = True
+        return tags
+
+    def source_digest(self) -> Optional[bytes]:
+        """tags.json 内容的 SHA-256（文件不存在时返回 None）"""
+        try:
+            with open(self.tags_path, 'rb') as f:
+                return hashlib.sha256(f.read()).digest()
+        except OSError:
+            return None
+
+    def load_cache(self, digest: bytes) -> bool:
+        """读取编译好的索引缓存（一次读入），缓存不存在、已过期或损坏时返回 False"""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+        header = len(CACHE_MAGIC) + len(digest)
+        if data[:header] != CACHE_MAGIC + digest:
+            return False
+        try:
+            cached = pickle.loads(memoryview(data)[header:])
+            for field in CACHE_FIELDS:
+                setattr(self, field, cached[field])
+        except Exception as e:
+            print(f"⚠️ 标签索引缓存读取失败，重新构建: {e}")
+            return False
+        print(f"✅ 标签索引已从缓存加载（版本 {self.tags.get('version', 'unknown')}）: "
+              f"{len(self.industry_keywords)}个行业关键词, {len(self.concept_keywords)}个概念关键词")
+        return True
+
+    def save_cache(self, digest: bytes):
+        """写索引缓存（临时文件带进程号后原子替换，多个进程同时构建也不会互相写坏）"""
+        payload = pickle.dumps({field: getattr(self, field) for field in CACHE_FIELDS}, protocol=5)
+        temp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(CACHE_MAGIC + digest)
+                f.write(payload)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            # 缓存只是加速，写不了（只读目录等）不影响打标签
+            print(f"⚠️ 标签索引缓存写入失败: {e}")
+            if temp_path.exists():
+                temp_path.unlink()
 
     def build_indexes(self):
         """构建快速查找索引"""
         self.industry_keywords = {}
         self.concept_keywords = {}
+        # ID → 元数据（与匹配结果里除 matched_keyword 以外的字段相同）
+        self.industry_by_id = {}
+        self.concept_by_id = {}
 
         # 构建行业关键词索引
         for level1 in self.tags.get('industries', {}).get('level1', []):
             for level2 in level1.get('level2', []):
                 for level3 in level2.get('level3', []):
+                    self.industry_by_id[level3['id']] = {
+                        'id': level3['id'],
+                        'name': level3['name'],
+                        'level1': level1['name'],
+                        'level2': level2['name']
+                    }
                     for keyword in level3.get('keywords', []):
                         self.industry_keywords[keyword] = {
                             'id': level3['id'],
@@ -51,12 +134,18 @@ class TagManager:
 
         # 构建概念关键词索引
         for concept in self.tags.get('concepts', []):
+            self.concept_by_id[concept['id']] = {'id': concept['id'], 'name': concept['name']}
             for keyword in concept.get('keywords', []):
                 self.concept_keywords[keyword] = {
                     'id': concept['id'],
                     'name': concept['name']
                 }
 
+        # 行业和概念关键词建成一个自动机，匹配时文本只扫一遍（编号：先行业、后概念，与字典顺序一致）
+        self.industry_keyword_list = list(self.industry_keywords)
+        self.concept_keyword_list = list(self.concept_keywords)
+        self.automaton = KeywordAutomaton(self.industry_keyword_list + self.concept_keyword_list)
+
         print(
             f"✅ 标签索引构建完成: {len(self.industry_keywords)}个行业关键词, {len(self.concept_keywords)}个概念关键词")
 
@@ -64,30 +153,36 @@ class TagManager:
         """为新闻匹配行业和概念"""
         # 合并标题和摘要
         text = title + " " + (summary or "")
-        text_lower = text.lower()
 
         matched_industries = []
         matched_concepts = []
 
+        # 自动机一次找出所有出现的关键词，按编号（即字典顺序）排好，结果与逐个 `keyword in text` 相同
+        industry_count = len(self.industry_keyword_list)
+        found = sorted(self.automaton.find(text))
+        split = bisect.bisect_left(found, industry_count)
+
         # 匹配行业（三级）
-        for keyword, info in self.industry_keywords.items():
-            if keyword in text:
-                matched_industries.append({
-                    'id': info['id'],
-                    'name': info['name'],
-                    'level1': info['level1'],
-                    'level2': info['level2'],
-                    'matched_keyword': keyword
-                })
+        for index in found[:split]:
+            keyword = self.industry_keyword_list[index]
+            info = self.industry_keywords[keyword]
+            matched_industries.append({
+                'id': info['id'],
+                'name': info['name'],
+                'level1': info['level1'],
+                'level2': info['level2'],
+                'matched_keyword': keyword
+            })
 
         # 匹配概念
-        for keyword, info in self.concept_keywords.items():
-            if keyword in text:
-                matched_concepts.append({
-                    'id': info['id'],
-                    'name': info['name'],
-                    'matched_keyword': keyword
-                })
+        for index in found[split:]:
+            keyword = self.concept_keyword_list[index - industry_count]
+            info = self.concept_keywords[keyword]
+            matched_concepts.append({
+                'id': info['id'],
+                'name': info['name'],
+                'matched_keyword': keyword
+            })
 
         # 去重（基于ID）
         unique_industries = {item['id']: item for item in matched_industries}.values()
@@ -100,30 +195,54 @@ class TagManager:
             'concept_ids': [item['id'] for item in unique_concepts]
         }
 
-    def add_to_news(self, news_item: Dict) -> Dict:
-        """为单条新闻添加标签"""
+    def add_to_news(self, news_item: Dict, normalized: bool = False) -> Dict:
+        """
+        为单条新闻添加标签
+        normalized=True 时只写 ID 列表和匹配位置（格式见 storage.tag_table），元数据见 tag_dictionary()；
+        无法归一化时（比如行业和概念用了同一个 ID）保持展开格式，与 storage.tag_table.compact_item 一致
+        """
         title = news_item.get('title', '')
         summary = news_item.get('summary', '')
 
         tags = self.match_news(title, summary)
 
-        # 添加标签到新闻对象
+        # 添加标签到新闻对象（version 记录打标签时的标签库版本，标签库更新后重打标签时据此核对）
         news_item['tags'] = {
             'industries': tags['industries'],
             'concepts': tags['concepts'],
             'industry_ids': tags['industry_ids'],
-            'concept_ids': tags['concept_ids']
+            'concept_ids': tags['concept_ids'],
+            'version': self.version
         }
+        if normalized:
+            compact = compact_tags(news_item['tags'], tag_text(news_item), {})
+            if compact is not None:
+                news_item['tags'] = compact
 
         return news_item
 
-    def add_to_news_list(self, news_list: List[Dict]) -> List[Dict]:
+    def add_to_news_list(self, news_list: List[Dict], normalized: bool = False) -> List[Dict]:
         """为新闻列表批量添加标签"""
         tagged_news = []
         for item in news_list:
-            tagged_news.append(self.add_to_news(item))
+            tagged_news.append(self.add_to_news(item, normalized))
         return tagged_news
 
+    def iter_tagged(self, news_iter: Iterable[Dict]) -> Iterator[Dict]:
+        """流式添加标签：上游每产出一条就打标签并立即交给下游"""
+        for item in news_iter:
+            yield self.add_to_news(item)
+
+    def tag_dictionary(self) -> Dict[str, Dict]:
+        """标签字典：ID → 元数据（归一化格式展开时用，见 storage.tag_table.expand_tags）"""
+        return {tag_id: {key: value for key, value in meta.items() if key != 'id'}
+                for tag_id, meta in {**self.industry_by_id, **self.concept_by_id}.items()}
+
+    @property
+    def version(self) -> str:
+        """标签库版本（tags.json 的 version 字段）"""
+        return self.tags.get('version', 'unknown')
+
     def get_stats(self) -> Dict:
         """获取标签库统计信息"""
         return {
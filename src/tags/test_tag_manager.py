@@ -5,7 +5,6 @@
 
 import sys
 import os
-import json
 from pathlib import Path
 
 # 添加项目根目录到Python路径
@@ -14,6 +13,7 @@ src_dir = current_file.parent.parent
 project_root = src_dir.parent
 sys.path.insert(0, str(src_dir))
 
+from storage import json_codec
 from tags.tag_manager import TagManager
 
 
@@ -24,8 +24,7 @@ def load_sample_news():
         print(f"❌ 找不到示例新闻: {sample_path}")
         return None
 
-    with open(sample_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return json_codec.load_file(sample_path)
 
 
 def test_single_news(tag_manager, news_item):
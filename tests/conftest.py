@@ -0,0 +1,10 @@
+"""
+测试公共配置：把 src 加到 Python 路径（与各脚本的做法相同），模块按 storage.x / collectors.x 导入
+"""
+
+import sys
+from pathlib import Path
+
+src_dir = str(Path(__file__).resolve().parent.parent / "src")
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
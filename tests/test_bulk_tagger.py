@@ -0,0 +1,93 @@
+"""
+并行批量打标签（user-025）：多进程、小块时输出顺序和标签与 TagManager.iter_tagged 完全一致；
+workers=1 不建进程池；上游是生成器时按块流式消费
+"""
+
+import copy
+import multiprocessing
+import random
+
+import pytest
+
+from storage import json_codec
+from tags.bulk_tagger import BulkTagger
+from tags.tag_manager import TagManager
+
+WORDS = ['半导体', '芯片', '机器人', '光伏', '储能', '汽车', '银行', '券商', '白酒', '医药', '公司', '发布', '，']
+
+
+@pytest.fixture
+def manager(tmp_path):
+    rng = random.Random(25)
+    concepts = [{'id': f"C{i}", 'name': f"概念{i}", 'keywords': rng.sample(WORDS[:10], 2)} for i in range(8)]
+    industries = {'level1': [{'name': '制造业', 'level2': [{'name': '电子', 'level3': [
+        {'id': 'I1', 'name': '半导体', 'keywords': ['半导体', '芯片']},
+        {'id': 'I2', 'name': '汽车整车', 'keywords': ['汽车']}]}]}]}
+    json_codec.dump_file(tmp_path / "tags.json", {'version': 'test', 'industries': industries, 'concepts': concepts})
+    return TagManager(str(tmp_path / "tags.json"))
+
+
+def make_news(count, seed=0):
+    rng = random.Random(seed)
+    return [{'id': str(i), 'title': ''.join(rng.choice(WORDS) for _ in range(rng.randint(0, 5))),
+             'summary': ''.join(rng.choice(WORDS) for _ in range(rng.randint(0, 3))), 'url': f"u{i}"}
+            for i in range(count)]
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='需要 fork')
+@pytest.mark.parametrize('normalized', [False, True])
+def test_parallel_output_matches_serial(manager, normalized):
+    news = make_news(503)
+    if normalized:
+        expected = [manager.add_to_news(item, normalized=True) for item in copy.deepcopy(news)]
+    else:
+        expected = list(manager.iter_tagged(copy.deepcopy(news)))
+
+    with BulkTagger(manager, workers=2, chunk_size=7, start_method='fork') as tagger:
+        assert tagger._pool is not None
+        result = list(tagger.iter_tagged(copy.deepcopy(news), normalized))
+
+    assert [item['id'] for item in result] == [item['id'] for item in news]
+    assert result == expected
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='需要 fork')
+def test_generator_input_is_consumed_lazily(manager):
+    consumed = []
+
+    def source():
+        for item in make_news(200, seed=1):
+            consumed.append(item['id'])
+            yield item
+
+    with BulkTagger(manager, workers=2, chunk_size=10, start_method='fork') as tagger:
+        results = tagger.iter_tagged(source())
+        first = next(results)
+        # 在途块数有上限（2 个进程 × 每个 2 块），拿到第一条时没有把上游读完
+        assert first['id'] == '0'
+        assert len(consumed) == 10 * 4
+        rest = list(results)
+
+    assert [item['id'] for item in [first] + rest] == [str(i) for i in range(200)]
+
+
+def test_spawn_workers_load_the_cached_index(manager):
+    news = make_news(60, seed=3)
+    expected = list(manager.iter_tagged(copy.deepcopy(news)))
+
+    with BulkTagger(manager, workers=2, chunk_size=16, start_method='spawn') as tagger:
+        assert tagger.tag_list(copy.deepcopy(news)) == expected
+
+
+def test_single_worker_runs_in_process(manager):
+    news = make_news(50, seed=2)
+    expected = list(manager.iter_tagged(copy.deepcopy(news)))
+
+    with BulkTagger(manager, workers=1) as tagger:
+        assert tagger._pool is None
+        assert tagger.tag_list(copy.deepcopy(news)) == expected
+
+
+def test_empty_input(manager):
+    with BulkTagger(manager, workers=2, chunk_size=3) as tagger:
+        assert tagger.tag_list([]) == []
@@ -0,0 +1,200 @@
+"""
+游标增量采集（user-003）：高水位、安静窗口（没有新内容不算失败）、出错时游标不推进、游标随 GroupCommit 提交
+采集器对着本地替身服务器（network.stub_server）跑真实的 HTTP 请求
+"""
+
+import time
+
+import pytest
+
+from collectors.collection_engine import CollectionEngine
+from collectors.cursor_store import CursorStore
+from collectors.eastmoney_collector import EastMoneyCollector
+from network.request_policy import RequestPolicy
+from network.stub_server import StubConfig, StubServer, make_cailianshe_items, make_eastmoney_items
+from storage import json_codec
+from storage.group_commit import GroupCommit
+
+
+@pytest.fixture
+def stub():
+    with StubServer(eastmoney_items=make_eastmoney_items(200), cailianshe_items=make_cailianshe_items(10)) as server:
+        yield server
+
+
+def make_collector(stub, cursor_path, max_attempts=3):
+    collector = EastMoneyCollector(cursor_store=CursorStore(cursor_path), base_url=stub.eastmoney_url,
+                                   policy=RequestPolicy(max_attempts=max_attempts, hedge=False))
+    collector.page_delay = 0
+    return collector
+
+
+def run_engine(stub, cursor_path, max_items=30, max_attempts=3):
+    engine = CollectionEngine(deadline=30)
+    engine.register('东方财富', lambda: make_collector(stub, cursor_path, max_attempts).iter_news(max_items=max_items))
+    results = engine.run()
+    return engine, results['东方财富']
+
+
+def test_first_run_caps_items_and_sets_watermark(stub, tmp_path):
+    cursor_path = tmp_path / "cursors.json"
+    engine, result = run_engine(stub, cursor_path, max_items=30)
+
+    assert result.status == 'ok'
+    assert len(result.news) == 30
+    cursor = CursorStore(cursor_path).load('eastmoney')
+    assert cursor.high_watermark == int(stub.eastmoney_items[0]['realSort'])
+    assert len(cursor.recent_ids) == 30
+
+
+def test_quiet_window_is_empty_not_failed(stub, tmp_path):
+    cursor_path = tmp_path / "cursors.json"
+    run_engine(stub, cursor_path)
+    watermark = CursorStore(cursor_path).load('eastmoney').high_watermark
+
+    engine, result = run_engine(stub, cursor_path)
+
+    assert result.status == 'empty'
+    assert result.news == []
+    assert not engine.all_failed()
+    cursor = CursorStore(cursor_path).load('eastmoney')
+    assert cursor.high_watermark == watermark
+    # 第一页就遇到已采集的条目，只请求一页
+    assert cursor.stats['runs'] == 2
+    assert cursor.stats['requests'] == 2
+
+
+def test_new_items_stop_at_watermark(stub, tmp_path):
+    cursor_path = tmp_path / "cursors.json"
+    run_engine(stub, cursor_path)
+    # 比已采集的最新一条更新、但不晚于现在
+    newest = int(stub.eastmoney_items[0]['realSort']) / 1000000
+    fresh = make_eastmoney_items(5, newest=newest + 50, interval=10, seed=7)
+    stub.publish(eastmoney_items=fresh)
+
+    engine, result = run_engine(stub, cursor_path)
+
+    assert result.status == 'ok'
+    assert [item['title'] for item in result.news] == [item['title'] for item in fresh]
+    assert CursorStore(cursor_path).load('eastmoney').high_watermark == int(fresh[0]['realSort'])
+
+
+def test_same_timestamp_items_are_told_apart_by_id(tmp_path):
+    cursor = CursorStore(tmp_path / "cursors.json").load('eastmoney')
+    cursor.advance('a', 100)
+
+    assert cursor.is_seen('a', 100)
+    assert not cursor.is_seen('b', 100)
+    assert cursor.is_seen('c', 99)
+    assert not cursor.is_seen('d', 101)
+
+
+def test_errors_fail_the_run_and_keep_the_cursor(tmp_path):
+    cursor_path = tmp_path / "cursors.json"
+    with StubServer(eastmoney_items=make_eastmoney_items(50), config=StubConfig(error_rate=1.0)) as stub:
+        engine, result = run_engine(stub, cursor_path, max_attempts=1)
+
+    assert result.status == 'error'
+    assert result.news == []
+    assert engine.all_failed()
+    cursor = CursorStore(cursor_path).load('eastmoney')
+    assert cursor.high_watermark == 0
+    assert cursor.stats['runs'] == 1
+
+
+def test_partial_pages_are_kept_but_cursor_does_not_advance(stub, tmp_path):
+    cursor_path = tmp_path / "cursors.json"
+    collector = make_collector(stub, cursor_path)
+    pages = iter([stub.eastmoney_page(None, 50)])
+
+    def fetch_page(sort_end, timeout=15):
+        try:
+            return next(pages)
+        except StopIteration:
+            raise ValueError("接口返回错误")
+
+    collector._fetch_page = fetch_page
+    collector.policy = RequestPolicy(max_attempts=1, hedge=False)
+    news = collector.fetch_news(max_items=100)
+
+    assert len(news) == 50
+    assert CursorStore(cursor_path).load('eastmoney').high_watermark == 0
+
+
+def test_only_all_failed_sources_fail_the_run():
+    def broken():
+        yield {'id': 'x', 'title': '半途出错'}
+        raise RuntimeError("boom")
+
+    engine = CollectionEngine(deadline=5)
+    engine.register('quiet', lambda: iter([]))
+    engine.register('broken', broken)
+    engine.run()
+
+    assert engine.results['quiet'].status == 'empty'
+    assert engine.results['broken'].status == 'error'
+    assert engine.results['broken'].count == 1
+    assert not engine.all_failed()
+
+
+def test_fetch_raising_before_iteration_still_finishes():
+    def broken():
+        raise RuntimeError("构造失败")
+
+    engine = CollectionEngine(deadline=5)
+    engine.register('broken', broken)
+    start = time.monotonic()
+    engine.run()
+
+    assert engine.results['broken'].status == 'error'
+    assert engine.all_failed()
+    # 没有等到截止时间
+    assert time.monotonic() - start < 2
+
+
+def test_deferred_cursor_is_written_only_on_group_commit(stub, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    cursor_path = data_dir / "cursors.json"
+    store = CursorStore(cursor_path)
+    store.defer()
+
+    news = make_collector(stub, cursor_path).fetch_news(max_items=10)
+    assert len(news) == 10
+    assert not cursor_path.exists()
+
+    commit = GroupCommit(data_dir)
+    assert store.stage(commit)
+    commit.commit()
+
+    saved = json_codec.load_file(cursor_path)
+    assert saved['eastmoney']['high_watermark'] == int(stub.eastmoney_items[0]['realSort'])
+
+
+def _news(i):
+    return {'id': str(i), 'title': f"新闻{i}", 'showTime': f"2026-08-22 {i // 60:02d}:{i % 60:02d}:00"}
+
+
+def test_latest_merges_new_items_into_existing(tmp_path):
+    from collectors.run_github_action import build_latest
+
+    latest_path = tmp_path / "latest.json"
+    json_codec.dump_file(latest_path, [_news(i) for i in range(100, 50, -1)])
+
+    latest = build_latest(latest_path, [_news(200), _news(201)])
+
+    assert len(latest) == 50
+    assert [item['id'] for item in latest[:3]] == ['201', '200', '100']
+    assert latest[-1]['id'] == '53'
+
+
+def test_latest_is_rebuilt_from_the_day_when_missing(tmp_path):
+    from collectors.run_github_action import build_latest
+    from storage.daily_log import DailyLog
+
+    daily_log = DailyLog(tmp_path / "archive", '2026-08-22')
+    daily_log.append([_news(i) for i in range(10)])
+
+    latest = build_latest(tmp_path / "latest.json", [_news(20)], daily_log)
+
+    assert [item['id'] for item in latest] == ['20'] + [str(i) for i in range(9, -1, -1)]
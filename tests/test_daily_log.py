@@ -0,0 +1,154 @@
+"""
+分段写入的日归档（user-011 / user-020）：去重追加、按内容寻址的段、随 GroupCommit 暂存、收盘整理、旧格式迁移
+"""
+
+import gzip
+import hashlib
+
+from storage import json_codec
+from storage.daily_log import DailyLog, archive_days, compact_closed_days, open_days, read_segment
+from storage.group_commit import GroupCommit
+
+DAY = '2026-08-22'
+
+
+def news(title, minute, **extra):
+    return {'id': f"{title}-{minute}", 'title': title, 'showTime': f"{DAY} 10:{minute:02d}:00", **extra}
+
+
+def test_append_writes_only_new_or_newer_titles(tmp_path):
+    daily_log = DailyLog(tmp_path, DAY)
+
+    assert daily_log.append([news('a', 1), news('b', 2), news('a', 3)]) == 2
+    # 同标题时间没有更新的跳过，更新的写入
+    assert daily_log.append([news('a', 3), news('b', 1), news('b', 5), news('c', 4)]) == 2
+    assert daily_log.append([news('a', 3)]) == 0
+
+    assert len(daily_log.segments()) == 2
+    assert [(item['title'], item['showTime'][-5:-3]) for item in daily_log.read_all()] == \
+        [('b', '05'), ('c', '04'), ('a', '03')]
+    # 新打开的实例从段重建去重索引
+    assert DailyLog(tmp_path, DAY).count == 3
+
+
+def test_segments_are_content_addressed_and_time_ordered(tmp_path):
+    daily_log = DailyLog(tmp_path, DAY)
+    daily_log.append([news('late', 9), news('early', 1)])
+    daily_log.append([news('next', 20)])
+
+    first, second = daily_log.segments()
+    assert first.name.startswith('0001-') and second.name.startswith('0002-')
+    for path in (first, second):
+        digest = hashlib.sha1(path.read_bytes()).hexdigest()[:12]
+        assert path.name == f"{path.name[:4]}-{digest}.jsonl"
+    assert [item['title'] for item in read_segment(first)] == ['early', 'late']
+
+
+def test_unfinished_temp_segment_is_ignored(tmp_path):
+    daily_log = DailyLog(tmp_path, DAY)
+    daily_log.append([news('a', 1)])
+    # 崩溃时留下的临时文件不是段
+    (daily_log.segment_dir / "0002-deadbeef0000.jsonl.tmp").write_bytes(b'{"title": "half')
+
+    reopened = DailyLog(tmp_path, DAY)
+    assert len(reopened.segments()) == 1
+    assert reopened.append([news('b', 2)]) == 1
+    assert reopened.segments()[-1].name.startswith('0002-')
+
+
+def test_append_with_group_commit_is_staged_until_commit(tmp_path):
+    archive_dir = tmp_path / "archive"
+    daily_log = DailyLog(archive_dir, DAY)
+    commit = GroupCommit(tmp_path)
+
+    assert daily_log.append([news('a', 1)], commit) == 1
+    assert DailyLog(archive_dir, DAY).segments() == []
+
+    commit.commit()
+    assert [item['title'] for item in DailyLog(archive_dir, DAY).read_all()] == ['a']
+
+
+def test_compact_writes_sorted_json_and_removes_segments(tmp_path):
+    daily_log = DailyLog(tmp_path, DAY)
+    daily_log.append([news('a', 1), news('b', 2)])
+    daily_log.append([news('a', 7)])
+
+    assert daily_log.compact() == 2
+
+    assert not daily_log.segment_dir.exists()
+    assert not daily_log.is_open
+    data = json_codec.load_file(daily_log.json_path)
+    assert [(item['title'], item['showTime'][-5:-3]) for item in data] == [('a', '07'), ('b', '02')]
+    with gzip.open(tmp_path / f"{DAY}.json.gz", 'rb') as f:
+        assert json_codec.loads(f.read()) == data
+
+
+def test_compact_merges_with_existing_day_json(tmp_path):
+    daily_log = DailyLog(tmp_path, DAY)
+    daily_log.append([news('a', 5), news('b', 1)])
+    # 回补任务在段之外写过同一天的 JSON
+    json_codec.dump_file(daily_log.json_path, [news('b', 9), news('a', 2), news('x', 3)])
+
+    assert daily_log.compact() == 3
+
+    data = json_codec.load_file(daily_log.json_path)
+    assert [(item['title'], item['showTime'][-5:-3]) for item in data] == [('b', '09'), ('a', '05'), ('x', '03')]
+
+
+def test_compact_without_segments_is_a_no_op(tmp_path):
+    daily_log = DailyLog(tmp_path, DAY)
+    json_codec.dump_file(daily_log.json_path, [news('a', 1)])
+
+    assert daily_log.compact() == 0
+    assert json_codec.load_file(daily_log.json_path) == [news('a', 1)]
+
+
+def test_compact_closed_days_leaves_today_open(tmp_path):
+    DailyLog(tmp_path, '2026-08-21').append([news('old', 1)])
+    DailyLog(tmp_path, DAY).append([news('today', 1)])
+
+    assert compact_closed_days(tmp_path, DAY) == {'2026-08-21': 1}
+
+    assert open_days(tmp_path) == [DAY]
+    assert (tmp_path / "2026-08-21.json").exists()
+    assert archive_days(tmp_path) == ['2026-08-21', DAY]
+
+
+def test_legacy_append_log_becomes_first_segment(tmp_path):
+    daily_log = DailyLog(tmp_path, DAY)
+    daily_log.legacy_log_path.write_bytes(b'\n'.join(json_codec.dumps(item) for item in
+                                                    [news('a', 1), news('b', 2)]) + b'\n{"broken')
+    daily_log.legacy_index_path.write_text('{}')
+
+    assert daily_log.append([news('b', 2), news('c', 3)]) == 1
+
+    assert not daily_log.legacy_log_path.exists()
+    assert not daily_log.legacy_index_path.exists()
+    assert [path.name[:4] for path in daily_log.segments()] == ['0001', '0002']
+    assert [item['title'] for item in daily_log.read_all()] == ['c', 'b', 'a']
+
+
+def test_legacy_day_json_becomes_first_segment(tmp_path):
+    daily_log = DailyLog(tmp_path, DAY)
+    json_codec.dump_file(daily_log.json_path, [news('b', 2), news('a', 1)])
+    (tmp_path / f"{DAY}.json.gz").write_bytes(b'stale')
+
+    assert daily_log.append([news('c', 3)]) == 1
+
+    assert not daily_log.json_path.exists()
+    assert not (tmp_path / f"{DAY}.json.gz").exists()
+    assert [item['title'] for item in read_segment(daily_log.segments()[0])] == ['a', 'b']
+
+
+def test_replace_segment_keeps_sequence_and_drops_old_file(tmp_path):
+    daily_log = DailyLog(tmp_path, DAY)
+    daily_log.append([news('a', 1)])
+    old = daily_log.segments()[0]
+
+    new = daily_log.replace_segment(old, [news('a', 1, tags={'concept_ids': ['C1']})])
+
+    assert new != old and not old.exists()
+    assert new.name.startswith('0001-')
+    assert daily_log.read_all()[0]['tags'] == {'concept_ids': ['C1']}
+    # 内容不变时不换文件
+    assert daily_log.replace_segment(new, read_segment(new)) == new
@@ -0,0 +1,146 @@
+"""
+成组提交（user-018）：提交前崩溃回滚、写完日志后崩溃前滚；追加、删除重放多次结果不变
+崩溃用在应用操作中途抛异常来模拟（日志已落盘、部分操作已执行）
+"""
+
+import pytest
+
+from storage import group_commit, json_codec
+from storage.group_commit import JOURNAL_NAME, GroupCommit, recover, stage_path
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    (tmp_path / "archive").mkdir()
+    (tmp_path / "latest.json").write_bytes(b'["old"]')
+    (tmp_path / "archive" / "log.jsonl").write_bytes(b'line1\n')
+    (tmp_path / "stale.txt").write_bytes(b'stale')
+    return tmp_path
+
+
+def stage_all(data_dir):
+    commit = GroupCommit(data_dir)
+    commit.write_json(data_dir / "latest.json", ['new'])
+    commit.write_bytes(data_dir / "archive" / "0001-abc.jsonl", b'segment\n')
+    commit.append_bytes(data_dir / "archive" / "log.jsonl", b'line2\n', offset=6)
+    commit.delete(data_dir / "stale.txt")
+    return commit
+
+
+def assert_committed(data_dir):
+    assert json_codec.load_file(data_dir / "latest.json") == ['new']
+    assert (data_dir / "archive" / "0001-abc.jsonl").read_bytes() == b'segment\n'
+    assert (data_dir / "archive" / "log.jsonl").read_bytes() == b'line1\nline2\n'
+    assert not (data_dir / "stale.txt").exists()
+    assert not (data_dir / JOURNAL_NAME).exists()
+    assert list(data_dir.rglob("*.stage")) == []
+
+
+def assert_untouched(data_dir):
+    assert (data_dir / "latest.json").read_bytes() == b'["old"]'
+    assert not (data_dir / "archive" / "0001-abc.jsonl").exists()
+    assert (data_dir / "archive" / "log.jsonl").read_bytes() == b'line1\n'
+    assert (data_dir / "stale.txt").read_bytes() == b'stale'
+    assert list(data_dir.rglob("*.stage")) == []
+
+
+def test_commit_applies_every_op(data_dir):
+    commit = stage_all(data_dir)
+    # 提交前目标文件不变
+    assert (data_dir / "latest.json").read_bytes() == b'["old"]'
+
+    assert commit.commit() == 4
+    assert_committed(data_dir)
+    assert recover(data_dir) is None
+
+
+def test_crash_before_journal_rolls_back(data_dir):
+    stage_all(data_dir)
+    # 进程在 commit() 之前被杀：只留下暂存文件
+
+    assert recover(data_dir) == 'back'
+    assert_untouched(data_dir)
+
+
+def test_crash_while_writing_journal_rolls_back(data_dir, monkeypatch):
+    commit = stage_all(data_dir)
+
+    def crash(*args):
+        raise Crash()
+
+    # 日志的临时文件写完、还没换上正式名字时崩溃
+    monkeypatch.setattr(group_commit.os, 'replace', crash)
+    with pytest.raises(Crash):
+        commit.commit()
+    monkeypatch.undo()
+
+    assert not (data_dir / JOURNAL_NAME).exists()
+    assert recover(data_dir) == 'back'
+    assert_untouched(data_dir)
+
+
+@pytest.mark.parametrize('applied', [0, 1, 2, 3, 4])
+def test_crash_after_journal_rolls_forward(data_dir, monkeypatch, applied):
+    commit = stage_all(data_dir)
+    real_apply = group_commit._apply
+
+    def partial_apply(directory, ops):
+        real_apply(directory, ops[:applied])
+        raise Crash()
+
+    monkeypatch.setattr(group_commit, '_apply', partial_apply)
+    with pytest.raises(Crash):
+        commit.commit()
+    monkeypatch.undo()
+    assert (data_dir / JOURNAL_NAME).exists()
+
+    assert recover(data_dir) == 'forward'
+    assert_committed(data_dir)
+
+
+def test_replaying_an_append_does_not_duplicate(data_dir):
+    log_path = data_dir / "archive" / "log.jsonl"
+    commit = GroupCommit(data_dir)
+    commit.append_bytes(log_path, b'line2\n', offset=6)
+    ops = commit.ops
+    # 追加已执行、暂存文件还没删时崩溃：日志重放时截回偏移再追加
+    stage_path(log_path).write_bytes(b'line2\n')
+    log_path.write_bytes(b'line1\nline2\n')
+    json_codec.dump_file(data_dir / JOURNAL_NAME, {'ops': ops})
+
+    assert recover(data_dir) == 'forward'
+    assert log_path.read_bytes() == b'line1\nline2\n'
+    assert recover(data_dir) is None
+
+
+def test_corrupt_journal_is_discarded(data_dir):
+    stage_all(data_dir)
+    (data_dir / JOURNAL_NAME).write_bytes(b'{"ops": [')
+
+    assert recover(data_dir) == 'back'
+    assert_untouched(data_dir)
+
+
+def test_abort_removes_staged_files(data_dir):
+    commit = stage_all(data_dir)
+    commit.abort()
+
+    assert len(commit) == 0
+    assert commit.commit() == 0
+    assert_untouched(data_dir)
+
+
+def test_last_write_to_a_file_wins_and_double_append_is_refused(data_dir):
+    commit = GroupCommit(data_dir)
+    commit.write_json(data_dir / "latest.json", ['first'])
+    commit.write_json(data_dir / "latest.json", ['second'])
+    commit.append_bytes(data_dir / "archive" / "log.jsonl", b'x', offset=6)
+    with pytest.raises(ValueError):
+        commit.append_bytes(data_dir / "archive" / "log.jsonl", b'y', offset=7)
+
+    assert commit.commit() == 2
+    assert json_codec.load_file(data_dir / "latest.json") == ['second']
@@ -0,0 +1,149 @@
+"""
+热窗口（user-019）：淘汰过期条目、同标题换成更新的一条、按北京时间算窗口起点、窗口文件缺失或损坏时从归档初始化
+"""
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from storage import hot_window, json_codec
+from storage.daily_log import DailyLog
+from storage.group_commit import GroupCommit
+from storage.hot_window import HotWindow, feed_path, update_hot_windows
+from storage.news_time import beijing_now
+
+NOW = datetime(2026, 8, 22, 10, 0, 0)
+
+
+def news(title, hours_ago, **extra):
+    show_time = (NOW - timedelta(hours=hours_ago)).strftime("%Y-%m-%d %H:%M:%S")
+    return {'id': f"{title}-{hours_ago}", 'title': title, 'showTime': show_time, **extra}
+
+
+def feed(data_dir):
+    return json_codec.load_file(feed_path(data_dir))
+
+
+def write_feed(data_dir, items):
+    path = feed_path(data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    json_codec.dump_file(path, items)
+
+
+def test_evict_drops_items_older_than_the_window(tmp_path):
+    write_feed(tmp_path, [news('new', 1), news('edge', 24), news('old', 25), news('older', 30)])
+
+    stats = update_hot_windows(tmp_path, [], NOW)
+
+    assert [item['title'] for item in feed(tmp_path)] == ['new', 'edge']
+    assert (stats['kept'], stats['evicted'], stats['window'], stats['seeded']) == (4, 2, 2, 0)
+
+
+def test_evicted_title_can_come_back(tmp_path):
+    window = HotWindow(tmp_path)
+    window.insert([news('a', 30)])
+    window.evict(NOW)
+
+    assert window.items == [] and window.titles == {}
+    assert window.insert([news('a', 30)]) == 1
+
+
+def test_newer_item_replaces_same_title(tmp_path):
+    write_feed(tmp_path, [news('a', 2), news('b', 3)])
+
+    stats = update_hot_windows(tmp_path, [news('a', 1, summary='新版'), news('b', 5), news('c', 4)], NOW)
+
+    items = feed(tmp_path)
+    assert [(item['title'], item['id']) for item in items] == [('a', 'a-1'), ('b', 'b-3'), ('c', 'c-4')]
+    assert stats['inserted'] == 2
+
+
+def test_remove_picks_the_right_title_among_equal_times(tmp_path):
+    window = HotWindow(tmp_path)
+    window.insert([news('x', 3), news('y', 3), news('z', 3)])
+
+    window.insert([news('y', 1)])
+
+    assert [item['title'] for item in window.items] == ['x', 'z', 'y']
+    assert window.titles['y'] == news('y', 1)['showTime']
+
+
+def test_items_are_projected_to_feed_fields(tmp_path):
+    update_hot_windows(tmp_path, [news('a', 1, content='正文', raw_data={'big': 1}, tags={'concept_ids': ['C1']})],
+                       NOW)
+
+    assert feed(tmp_path) == [{'id': 'a-1', 'title': 'a', 'showTime': news('a', 1)['showTime'],
+                               'full_content': '正文', 'tags': {'concept_ids': ['C1']}}]
+
+
+@pytest.mark.parametrize('broken', [False, True])
+def test_missing_or_broken_feed_is_seeded_from_archive(tmp_path, broken):
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    # 昨天已收盘、今天还开着
+    json_codec.dump_file(archive_dir / "2026-08-21.json", [news('yesterday', 12), news('too-old', 26)])
+    DailyLog(archive_dir, '2026-08-22').append([news('today', 2)])
+    if broken:
+        feed_path(tmp_path).parent.mkdir(parents=True)
+        feed_path(tmp_path).write_bytes(b'[{"broken')
+
+    stats = update_hot_windows(tmp_path, [news('fresh', 0)], NOW)
+
+    assert [item['title'] for item in feed(tmp_path)] == ['fresh', 'today', 'yesterday']
+    assert (stats['seeded'], stats['inserted'], stats['evicted'], stats['window']) == (3, 1, 1, 3)
+
+
+def test_existing_feed_is_not_reseeded(tmp_path):
+    archive_dir = tmp_path / "archive"
+    DailyLog(archive_dir, '2026-08-22').append([news('archived', 2)])
+    write_feed(tmp_path, [])
+
+    stats = update_hot_windows(tmp_path, [], NOW)
+
+    assert stats['seeded'] == 0
+    assert feed(tmp_path) == []
+
+
+@pytest.mark.parametrize('use_commit', [False, True])
+def test_legacy_feeds_are_removed(tmp_path, use_commit):
+    for name in ('1h', '12h'):
+        write_feed(tmp_path, [])
+        feed_path(tmp_path).rename(feed_path(tmp_path, name))
+    commit = GroupCommit(tmp_path) if use_commit else None
+
+    update_hot_windows(tmp_path, [news('a', 1)], NOW, commit)
+    if commit is not None:
+        assert feed_path(tmp_path, '1h').exists()
+        commit.commit()
+
+    assert not feed_path(tmp_path, '1h').exists()
+    assert not feed_path(tmp_path, '12h').exists()
+    assert [item['title'] for item in feed(tmp_path)] == ['a']
+
+
+@pytest.fixture
+def new_york_tz():
+    previous = os.environ.get('TZ')
+    os.environ['TZ'] = 'America/New_York'
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ['TZ']
+    else:
+        os.environ['TZ'] = previous
+    time.tzset()
+
+
+@pytest.mark.skipif(not hasattr(time, 'tzset'), reason='需要 time.tzset')
+def test_window_cutoff_uses_beijing_time(tmp_path, new_york_tz, monkeypatch):
+    beijing = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=8)
+    assert abs(beijing_now() - beijing) < timedelta(minutes=1)
+
+    # 不传 now 时按北京时间：北京时间 23 小时前的条目还在窗口内，25 小时前的被淘汰
+    fixed = datetime(2026, 8, 22, 10, 0, 0)
+    monkeypatch.setattr(hot_window, 'beijing_now', lambda: fixed)
+    update_hot_windows(tmp_path, [news('in', 23), news('out', 25)])
+
+    assert [item['title'] for item in feed(tmp_path)] == ['in']
@@ -0,0 +1,95 @@
+"""
+关键词自动机（user-021）：随机关键词和文本下 find() 与逐个 `keyword in text` 完全一致；
+TagManager.match_news 的结果（含顺序和去重）与原来逐个关键词扫描的实现相同，从缓存加载后也一样
+"""
+
+import random
+
+import pytest
+
+from storage import json_codec
+from tags.keyword_automaton import KeywordAutomaton
+from tags.tag_manager import TagManager
+
+
+def random_text(rng, alphabet, low, high):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_find_matches_substring_check(seed):
+    rng = random.Random(seed)
+    # 字母表很小，关键词之间大量互为前缀、后缀、子串
+    alphabet = 'abc芯片' if seed % 2 else 'ab'
+    keywords = [random_text(rng, alphabet, 1, 5) for _ in range(rng.randint(1, 60))]
+    automaton = KeywordAutomaton(keywords)
+
+    for _ in range(50):
+        text = random_text(rng, alphabet + 'x', 0, 40)
+        expected = {index for index, keyword in enumerate(keywords) if keyword in text}
+        assert automaton.find(text) == expected, (keywords, text)
+
+
+def test_edge_cases():
+    automaton = KeywordAutomaton(['', 'AI', 'ai', '芯片', '芯片', '半导体芯片'])
+
+    # 空关键词总是出现；区分大小写；重复的关键词各有编号
+    assert automaton.find('') == {0}
+    assert automaton.find('ai 芯片') == {0, 2, 3, 4}
+    assert automaton.find('半导体芯片') == {0, 3, 4, 5}
+    assert KeywordAutomaton([]).find('任何文本') == set()
+
+
+def write_tags(path, rng):
+    words = ['人工智能', '智能', '机器人', '人形机器人', '半导体', '芯片', '汽车', '新能源汽车', '光伏', '储能',
+             '电池', '固态电池', 'AI', 'GPU', '算力', '数据中心']
+    industries = {'level1': [{'name': '制造业', 'level2': [
+        {'name': f"二级{j}", 'level3': [
+            {'id': f"I{j}{k}", 'name': f"行业{j}{k}", 'keywords': rng.sample(words, rng.randint(1, 3))}
+            for k in range(3)]}
+        for j in range(3)]}]}
+    concepts = [{'id': f"C{i}", 'name': f"概念{i}", 'keywords': rng.sample(words, rng.randint(1, 3))}
+                for i in range(12)]
+    json_codec.dump_file(path, {'version': '2026.08', 'industries': industries, 'concepts': concepts})
+    return words
+
+
+def scan_reference(manager, title, summary=''):
+    """原来的实现：按字典顺序逐个 `keyword in text`，再按 ID 去重"""
+    text = title + " " + (summary or "")
+    industries = [{**info, 'matched_keyword': keyword}
+                  for keyword, info in manager.industry_keywords.items() if keyword in text]
+    concepts = [{**info, 'matched_keyword': keyword}
+                for keyword, info in manager.concept_keywords.items() if keyword in text]
+    industries = list({item['id']: item for item in industries}.values())
+    concepts = list({item['id']: item for item in concepts}.values())
+    return {'industries': industries, 'concepts': concepts,
+            'industry_ids': [item['id'] for item in industries],
+            'concept_ids': [item['id'] for item in concepts]}
+
+
+def test_match_news_equals_keyword_scan(tmp_path):
+    rng = random.Random(21)
+    tags_path = tmp_path / "tags.json"
+    words = write_tags(tags_path, rng)
+    manager = TagManager(str(tags_path))
+    cached = TagManager(str(tags_path))
+    assert (tmp_path / "tags.cache").exists()
+
+    for _ in range(300):
+        title = ''.join(rng.choice(words + ['，', '公司', '发布']) for _ in range(rng.randint(0, 6)))
+        summary = ''.join(rng.choice(words + ['。']) for _ in range(rng.randint(0, 4)))
+        expected = scan_reference(manager, title, summary)
+        assert manager.match_news(title, summary) == expected
+        assert cached.match_news(title, summary) == expected
+
+
+def test_keyword_spanning_title_and_summary_is_not_matched(tmp_path):
+    rng = random.Random(1)
+    tags_path = tmp_path / "tags.json"
+    write_tags(tags_path, rng)
+    manager = TagManager(str(tags_path), use_cache=False)
+
+    # 标题和摘要之间有空格隔开，与原实现一致
+    assert manager.match_news('半导', '体') == scan_reference(manager, '半导', '体')
+    assert manager.match_news('半导', '体')['industry_ids'] == []
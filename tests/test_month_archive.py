@@ -0,0 +1,169 @@
+"""
+月归档整理（user-013）：过期日归档按月 k 路归并，与逐条合并的结果一致；失败时不丢数据；旧格式月文件的转换
+"""
+
+import gzip
+import random
+from datetime import date
+
+import pytest
+
+from storage import json_codec
+from storage.compression import compress, find_archive, month_archives
+from storage.group_commit import GroupCommit
+from storage.month_archive import compact_expired_days, is_normalized
+from storage.tag_table import load_news, write_normalized
+
+
+def news(title, day, minute, source='x'):
+    return {'id': f"{source}:{title}:{day}:{minute}", 'title': title,
+            'showTime': f"2026-08-{day:02d} 10:{minute:02d}:00"}
+
+
+def write_day(archive_dir, day, items):
+    path = archive_dir / f"2026-08-{day:02d}.json"
+    json_codec.dump_file(path, sorted(items, key=lambda item: item['showTime'], reverse=True))
+    return path
+
+
+def write_month(merged_dir, items, suffix='.json.xz'):
+    merged_dir.mkdir(parents=True, exist_ok=True)
+    path = merged_dir / f"2026-08{suffix}"
+    data = json_codec.dumps(sorted(items, key=lambda item: item['showTime'], reverse=True))
+    path.write_bytes(compress(data, 'xz') if suffix.endswith('.xz') else data)
+    return path
+
+
+def reference_merge(sources):
+    """逐条合并：同标题保留时间更新的，时间相同时保留先出现的（月文件、再按日期）"""
+    best = {}
+    for source in sources:
+        for item in source:
+            title = item['title']
+            if title not in best or item['showTime'] > best[title]['showTime']:
+                best[title] = item
+    return best
+
+
+def test_k_way_merge_matches_item_by_item_merge(tmp_path):
+    rng = random.Random(13)
+    archive_dir = tmp_path / "archive"
+    merged_dir = archive_dir / "merged"
+    archive_dir.mkdir()
+    titles = [f"t{i}" for i in range(60)]
+
+    month_items = [news(rng.choice(titles), rng.randint(1, 5), rng.randint(0, 59), 'month') for _ in range(40)]
+    write_month(merged_dir, month_items)
+    sources = [sorted(month_items, key=lambda item: item['showTime'], reverse=True)]
+    for day in range(6, 12):
+        # 时间故意与别的天重叠（跨天归档的条目），并有相同时间的同标题条目
+        items = [news(rng.choice(titles), rng.choice([day, day - 1]), rng.randint(0, 5), f"d{day}")
+                 for _ in range(30)]
+        write_day(archive_dir, day, items)
+        sources.append(sorted(items, key=lambda item: item['showTime'], reverse=True))
+
+    stats = compact_expired_days(archive_dir, merged_dir, date(2026, 8, 12))
+
+    merged = load_news(find_archive(merged_dir, '2026-08'))
+    expected = reference_merge(sources)
+    assert {item['title']: item['id'] for item in merged} == {title: item['id'] for title, item in expected.items()}
+    assert [item['showTime'] for item in merged] == sorted((item['showTime'] for item in merged), reverse=True)
+    assert stats['days'] == 6 and stats['months'] == 1
+    assert list(archive_dir.glob("2026-08-*.json")) == []
+
+
+def test_days_on_or_after_cutoff_stay(tmp_path):
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    old = write_day(archive_dir, 1, [news('a', 1, 1)])
+    (archive_dir / "2026-08-01.json.gz").write_bytes(b'old')
+    kept = write_day(archive_dir, 2, [news('b', 2, 1)])
+
+    compact_expired_days(archive_dir, archive_dir / "merged", date(2026, 8, 2))
+
+    assert not old.exists() and not (archive_dir / "2026-08-01.json.gz").exists()
+    assert kept.exists()
+    assert [item['title'] for item in load_news(find_archive(archive_dir / "merged", '2026-08'))] == ['a']
+
+
+def test_unsorted_day_file_is_sorted_before_merging(tmp_path):
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    # 老文件不是按时间倒序
+    json_codec.dump_file(archive_dir / "2026-08-01.json", [news('a', 1, 1), news('b', 1, 9), news('c', 1, 5)])
+
+    compact_expired_days(archive_dir, archive_dir / "merged", date(2026, 8, 2))
+
+    merged = load_news(find_archive(archive_dir / "merged", '2026-08'))
+    assert [item['title'] for item in merged] == ['b', 'c', 'a']
+
+
+def test_site_copy_and_tags_round_trip(tmp_path):
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    tagged = {**news('半导体设备订单', 1, 1), 'summary': '芯片',
+              'tags': {'industries': [{'id': 'I1', 'name': '半导体', 'level1': '制造业', 'level2': '电子',
+                                       'matched_keyword': '半导体'}],
+                       'concepts': [{'id': 'C1', 'name': '芯片', 'matched_keyword': '芯片'}],
+                       'industry_ids': ['I1'], 'concept_ids': ['C1']}}
+    write_day(archive_dir, 1, [tagged, news('plain', 1, 0)])
+
+    compact_expired_days(archive_dir, archive_dir / "merged", date(2026, 8, 2))
+
+    month_file = find_archive(archive_dir / "merged", '2026-08')
+    assert month_file.name == '2026-08.json.xz'
+    assert is_normalized(month_file)
+    assert load_news(month_file)[0] == tagged
+    with gzip.open(archive_dir / "merged" / "2026-08.json.gz", 'rb') as f:
+        assert json_codec.loads(f.read()) == load_news(month_file)
+
+
+def test_corrupt_month_file_keeps_day_files(tmp_path):
+    archive_dir = tmp_path / "archive"
+    merged_dir = archive_dir / "merged"
+    merged_dir.mkdir(parents=True)
+    (merged_dir / "2026-08.json.xz").write_bytes(b'not xz')
+    day_file = write_day(archive_dir, 1, [news('a', 1, 1)])
+
+    stats = compact_expired_days(archive_dir, merged_dir, date(2026, 8, 2))
+
+    assert stats['days'] == 0
+    assert day_file.exists()
+    assert (merged_dir / "2026-08.json.xz").read_bytes() == b'not xz'
+
+
+def test_legacy_month_files_are_converted(tmp_path):
+    archive_dir = tmp_path / "archive"
+    merged_dir = archive_dir / "merged"
+    archive_dir.mkdir()
+    # 未压缩的数组格式月文件 + 另一个月的数组格式 .json.xz
+    write_month(merged_dir, [news('a', 1, 1), news('b', 1, 2)], suffix='.json')
+    july = merged_dir / "2026-07.json.xz"
+    july.write_bytes(compress(json_codec.dumps([news('c', 1, 1)]), 'xz'))
+
+    compact_expired_days(archive_dir, merged_dir, date(2026, 8, 2))
+
+    assert [path.name for path in month_archives(merged_dir)] == ['2026-07.json.xz', '2026-08.json.xz']
+    assert all(is_normalized(path) for path in month_archives(merged_dir))
+    assert [item['title'] for item in load_news(merged_dir / "2026-08.json.xz")] == ['b', 'a']
+    assert [item['title'] for item in load_news(july)] == ['c']
+
+
+@pytest.mark.parametrize('use_commit', [False, True])
+def test_merge_into_existing_normalized_month(tmp_path, use_commit):
+    archive_dir = tmp_path / "archive"
+    merged_dir = archive_dir / "merged"
+    merged_dir.mkdir(parents=True)
+    with open(merged_dir / "2026-08.json", 'wb') as f:
+        write_normalized(f, [news('a', 1, 5, 'month'), news('b', 1, 1, 'month')])
+    compact_expired_days(archive_dir, merged_dir, date(2026, 8, 1))
+    write_day(archive_dir, 2, [news('a', 2, 0, 'day'), news('c', 2, 3, 'day')])
+
+    commit = GroupCommit(tmp_path) if use_commit else None
+    compact_expired_days(archive_dir, merged_dir, date(2026, 8, 3), commit)
+
+    merged = load_news(merged_dir / "2026-08.json.xz")
+    assert [(item['title'], item['id'].split(':')[0]) for item in merged] == \
+        [('c', 'day'), ('a', 'day'), ('b', 'month')]
+    assert not (archive_dir / "2026-08-02.json").exists()
+    assert not (merged_dir / "2026-08.json").exists()
@@ -0,0 +1,162 @@
+"""
+增量重打标签（user-023）：第一次只记基线；标签库没变时什么都不做；
+变化后只改写受影响的新闻和文件，结果与用新标签库全部重打相同
+"""
+
+from datetime import date
+
+import pytest
+
+from storage import json_codec
+from storage.daily_log import DailyLog
+from storage.month_archive import compact_expired_days
+from storage.search_index import SearchIndex
+from tags.retag import APPLIED_NAME, changed_keywords, retag_archive
+from tags.tag_manager import TagManager
+
+TAGS_V1 = {
+    'version': '1',
+    'industries': {'level1': [{'name': '制造业', 'level2': [{'name': '电子', 'level3': [
+        {'id': 'I1', 'name': '半导体设备', 'keywords': ['光刻机']}]}]}]},
+    'concepts': [
+        {'id': 'C1', 'name': '芯片', 'keywords': ['芯片', '半导体']},
+        {'id': 'C2', 'name': '机器人', 'keywords': ['机器人']},
+        {'id': 'C3', 'name': '新能源', 'keywords': ['光伏']},
+    ],
+}
+
+# 新增双字关键词、删除关键词、新增纯字母关键词、改名（关键词不变但对应的概念变了）、新增单字关键词
+TAGS_V2 = {
+    'version': '2',
+    'industries': TAGS_V1['industries'],
+    'concepts': [
+        {'id': 'C1', 'name': '芯片', 'keywords': ['芯片', 'GPU']},
+        {'id': 'C2', 'name': '人形机器人', 'keywords': ['机器人']},
+        {'id': 'C3', 'name': '新能源', 'keywords': ['光伏', '固态电池']},
+        {'id': 'C4', 'name': '黄金', 'keywords': ['金']},
+    ],
+}
+
+
+def news(title, day, minute, summary=''):
+    return {'id': f"{day}-{minute}", 'title': title, 'summary': summary,
+            'showTime': f"{day} 10:{minute:02d}:00"}
+
+
+def tag_all(manager, items):
+    return [manager.add_to_news(item) for item in items]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """7 月一个月归档、8 月 20 日的日归档、8 月 21 日（未收盘）两个段，全部用 v1 打好标签"""
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    json_codec.dump_file(tmp_path / "tags.json", TAGS_V1)
+    manager = TagManager(str(tmp_path / "tags.json"))
+
+    json_codec.dump_file(archive_dir / "2026-07-01.json", tag_all(manager, [
+        news('央行公开市场操作', '2026-07-01', 2), news('光刻机出口管制', '2026-07-01', 1)]))
+    compact_expired_days(archive_dir, archive_dir / "merged", date(2026, 8, 1))
+
+    json_codec.dump_file(archive_dir / "2026-08-20.json", tag_all(manager, [
+        news('半导体板块走强', '2026-08-20', 5),
+        news('固态电池量产提速', '2026-08-20', 4, summary='光伏储能'),
+        news('银行股分红', '2026-08-20', 3),
+    ]))
+    daily_log = DailyLog(archive_dir, '2026-08-21')
+    daily_log.append(tag_all(manager, [news('人形机器人订单', '2026-08-21', 1),
+                                       news('GPU 供不应求', '2026-08-21', 2)]))
+    daily_log.append(tag_all(manager, [news('港口吞吐量增长', '2026-08-21', 3)]))
+    return tmp_path
+
+
+def archive_items(data_dir):
+    return [item for _, _, load in SearchIndex.partitions(data_dir / "archive") for item in load()]
+
+
+def archive_bytes(data_dir):
+    archive_dir = data_dir / "archive"
+    return {path.relative_to(archive_dir).as_posix(): path.read_bytes()
+            for path in archive_dir.rglob('*') if path.is_file()}
+
+
+def tag_view(tags):
+    """比较用：除 version 以外的字段（matched_keyword 变了也算变化）"""
+    return {key: value for key, value in tags.items() if key != 'version'}
+
+
+def test_changed_keywords(data_dir):
+    json_codec.dump_file(data_dir / "v2.json", TAGS_V2)
+    old = TagManager(str(data_dir / "tags.json"), use_cache=False)
+    new = TagManager(str(data_dir / "v2.json"), use_cache=False)
+
+    assert changed_keywords(old, new) == sorted(['半导体', 'GPU', '机器人', '固态电池', '金'])
+    assert changed_keywords(old, old) == []
+
+
+def test_first_run_records_baseline_then_no_op(data_dir):
+    before = archive_bytes(data_dir)
+
+    assert retag_archive(data_dir)['baseline'] == 1
+    assert (data_dir / APPLIED_NAME).read_bytes() == (data_dir / "tags.json").read_bytes()
+
+    stats = retag_archive(data_dir)
+    assert stats == {'keywords': 0, 'partitions': 0, 'candidates': 0, 'retagged': 0, 'files': 0, 'baseline': 0}
+    assert archive_bytes(data_dir) == before
+
+
+def test_incremental_retag_matches_full_retag(data_dir):
+    retag_archive(data_dir)
+    before = archive_bytes(data_dir)
+    old_items = {item['id']: item for item in archive_items(data_dir)}
+    json_codec.dump_file(data_dir / "tags.json", TAGS_V2)
+
+    stats = retag_archive(data_dir)
+
+    manager = TagManager(str(data_dir / "tags.json"))
+    items = archive_items(data_dir)
+    changed = 0
+    for item in items:
+        expected = manager.match_news(item['title'], item['summary'])
+        assert tag_view(item['tags']) == tag_view(expected), item['title']
+        if tag_view(old_items[item['id']]['tags']) != tag_view(expected):
+            changed += 1
+            assert item['tags']['version'] == '2'
+    assert stats['keywords'] == 5
+    assert stats['retagged'] == changed == 4
+    assert (data_dir / APPLIED_NAME).read_bytes() == (data_dir / "tags.json").read_bytes()
+
+    after = archive_bytes(data_dir)
+    # 没有受影响新闻的文件一字节都不动：月归档、第二个段
+    assert after['merged/2026-07.json.xz'] == before['merged/2026-07.json.xz']
+    untouched_segment = sorted(name for name in before if name.startswith('2026-08-21/'))[1]
+    assert after[untouched_segment] == before[untouched_segment]
+    assert after['2026-08-20.json'] != before['2026-08-20.json']
+    assert stats['files'] == 2
+
+    # 再跑一次什么都不做
+    assert retag_archive(data_dir)['retagged'] == 0
+
+
+def test_old_tags_can_be_given_explicitly(data_dir):
+    json_codec.dump_file(data_dir / "old_tags.json", TAGS_V1)
+    json_codec.dump_file(data_dir / "tags.json", TAGS_V2)
+
+    stats = retag_archive(data_dir, old_tags_path=data_dir / "old_tags.json")
+
+    assert stats['baseline'] == 0
+    assert stats['retagged'] == 4
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_full_retag(data_dir, workers):
+    json_codec.dump_file(data_dir / "tags.json", TAGS_V2)
+
+    stats = retag_archive(data_dir, full=True, workers=workers)
+
+    manager = TagManager(str(data_dir / "tags.json"))
+    for item in archive_items(data_dir):
+        assert tag_view(item['tags']) == tag_view(manager.match_news(item['title'], item['summary']))
+    assert stats['retagged'] == 4
+    assert stats['partitions'] == 4
@@ -0,0 +1,184 @@
+"""
+全文检索索引（user-017）：查询结果与逐篇暴力匹配一致；只重建源文件变了的分区，删除已消失的分区；时间范围过滤
+"""
+
+import math
+import random
+
+from storage import json_codec
+from storage.daily_log import DailyLog
+from storage.search_index import TITLE_WEIGHT, SearchIndex, tokenize, update_search_index
+
+WORDS = ['人工智能', '机器人', '半导体', '新能源', '汽车', '芯片', '光伏', '储能', '订单', '业绩', 'ai', 'gpu']
+
+
+def make_news(rng, day, count, prefix):
+    items = []
+    for i in range(count):
+        title = ''.join(rng.sample(WORDS, 3)) + f"{prefix}{i}"
+        items.append({'id': f"{prefix}-{day}-{i}", 'title': title,
+                      'full_content': ''.join(rng.choice(WORDS) for _ in range(6)),
+                      'showTime': f"2026-08-{day:02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"})
+    return items
+
+
+def brute_force(news, query, start='', end=None):
+    """逐篇检查：查询的每个词都在标题或正文的词里，且时间在 [start, end) 内"""
+    terms = set(tokenize(query))
+    matched = set()
+    for item in news:
+        words = set(tokenize(item['title'])) | set(tokenize(item.get('full_content', '')))
+        if terms <= words and item['showTime'] >= start and (end is None or item['showTime'] < end):
+            matched.add(item['id'])
+    return matched
+
+
+def search_ids(index, query, start=None, end=None):
+    return {result['id'] for result in index.search(query, start, end, limit=10000)}
+
+
+def build_archive(archive_dir, rng):
+    archive_dir.mkdir(parents=True)
+    closed = make_news(rng, 20, 80, 'c')
+    json_codec.dump_file(archive_dir / "2026-08-20.json", closed)
+    daily_log = DailyLog(archive_dir, '2026-08-21')
+    first = make_news(rng, 21, 40, 'a')
+    second = make_news(rng, 21, 40, 'b')
+    daily_log.append(first)
+    daily_log.append(second)
+    return closed + first + second
+
+
+def test_results_match_brute_force(tmp_path):
+    rng = random.Random(17)
+    news = build_archive(tmp_path / "archive", rng)
+    index = SearchIndex(tmp_path / "search")
+    stats = index.update(tmp_path / "archive")
+
+    assert stats == {'segments': 3, 'rebuilt': 3, 'removed': 0, 'docs': len(news)}
+    for query in ['人工智能', '机器人 芯片', '新能源汽车', 'gpu', 'ai 储能', '量子计算']:
+        assert search_ids(index, query) == brute_force(news, query), query
+    assert search_ids(index, '芯片', '2026-08-21', '2026-08-21 12') == \
+        brute_force(news, '芯片', '2026-08-21', '2026-08-21 12')
+    index.close()
+
+
+def test_results_are_ranked_and_limited(tmp_path):
+    rng = random.Random(3)
+    build_archive(tmp_path / "archive", rng)
+    index = SearchIndex(tmp_path / "search")
+    index.update(tmp_path / "archive")
+
+    results = index.search('半导体', limit=5)
+    assert len(results) == 5
+    keys = [(result['score'], result['time']) for result in results]
+    assert keys == sorted(keys, reverse=True)
+    index.close()
+
+
+def test_single_character_query_scans_titles(tmp_path):
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    json_codec.dump_file(archive_dir / "2026-08-20.json", [
+        {'id': '1', 'title': '金价上涨', 'showTime': '2026-08-20 10:00:00'},
+        {'id': '2', 'title': '油价下跌', 'showTime': '2026-08-20 11:00:00'},
+        {'id': '3', 'title': '金融数据', 'showTime': '2026-08-20 12:00:00', 'full_content': '与金无关'},
+    ])
+    index = SearchIndex(tmp_path / "search")
+    index.update(archive_dir)
+
+    assert [result['id'] for result in index.search('金')] == ['3', '1']
+    index.close()
+
+
+def test_update_rebuilds_only_changed_partitions(tmp_path):
+    rng = random.Random(5)
+    archive_dir = tmp_path / "archive"
+    news = build_archive(archive_dir, rng)
+    search_dir = tmp_path / "search"
+    assert SearchIndex(search_dir).update(archive_dir)['rebuilt'] == 3
+
+    # 没有变化：不重建
+    index = SearchIndex(search_dir)
+    assert index.update(archive_dir)['rebuilt'] == 0
+
+    # 新增一个段：只建这一个
+    extra = make_news(rng, 21, 10, 'n')
+    DailyLog(archive_dir, '2026-08-21').append(extra)
+    stats = index.update(archive_dir)
+    assert (stats['rebuilt'], stats['removed'], stats['segments']) == (1, 0, 4)
+    news += extra
+    assert search_ids(index, '光伏') == brute_force(news, '光伏')
+
+    # 已收盘的日归档内容变了：只重建它
+    closed = json_codec.load_file(archive_dir / "2026-08-20.json")
+    closed[0] = {**closed[0], 'title': '固态电池突破'}
+    json_codec.dump_file(archive_dir / "2026-08-20.json", closed)
+    stats = SearchIndex(search_dir).update(archive_dir)
+    assert (stats['rebuilt'], stats['removed']) == (1, 0)
+    index.close()
+    index = SearchIndex(search_dir)
+    assert [result['id'] for result in index.search('固态电池')] == [closed[0]['id']]
+    index.close()
+
+
+def test_compacted_day_replaces_its_segments(tmp_path):
+    rng = random.Random(7)
+    archive_dir = tmp_path / "archive"
+    news = build_archive(archive_dir, rng)
+    search_dir = tmp_path / "search"
+    update_search_index(tmp_path)  # data_dir = tmp_path：archive/ 与 search/ 同级
+    assert len(list((search_dir / '2026-08-21').glob('*.seg'))) == 2
+
+    DailyLog(archive_dir, '2026-08-21').compact()
+    stats = update_search_index(tmp_path)
+
+    assert (stats['rebuilt'], stats['removed'], stats['segments']) == (1, 2, 2)
+    assert not (search_dir / '2026-08-21').exists()
+    index = SearchIndex(search_dir)
+    assert set(index.meta) == {'2026-08-20', '2026-08-21'}
+    # 收盘时按标题去重，结果仍与暴力匹配收盘后的内容一致
+    remaining = json_codec.load_file(archive_dir / "2026-08-20.json") + \
+        json_codec.load_file(archive_dir / "2026-08-21.json")
+    assert len(remaining) <= len(news)
+    assert search_ids(index, '订单') == brute_force(remaining, '订单')
+    index.close()
+
+
+def test_broken_meta_rebuilds_everything(tmp_path):
+    rng = random.Random(9)
+    archive_dir = tmp_path / "archive"
+    build_archive(archive_dir, rng)
+    search_dir = tmp_path / "search"
+    SearchIndex(search_dir).update(archive_dir)
+    (search_dir / "segments.json").write_text('{broken')
+
+    assert SearchIndex(search_dir).update(archive_dir)['rebuilt'] == 3
+
+
+def test_scores_do_not_depend_on_query_term_order(tmp_path):
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    # 8 月 20 日两个词都有；8 月 21 日只有"芯片"，它的文档频率也要计入
+    json_codec.dump_file(archive_dir / "2026-08-20.json", [
+        {'id': '1', 'title': '芯片光伏', 'showTime': '2026-08-20 10:00:00'},
+        {'id': '2', 'title': '光伏装机', 'showTime': '2026-08-20 11:00:00'},
+    ])
+    json_codec.dump_file(archive_dir / "2026-08-21.json", [
+        {'id': str(i), 'title': f"芯片订单{i}", 'showTime': f"2026-08-21 10:{i:02d}:00"} for i in range(3, 9)
+    ])
+    index = SearchIndex(tmp_path / "search")
+    index.update(archive_dir)
+
+    forward = index.search('芯片 光伏')
+    backward = index.search('光伏 芯片')
+
+    assert [result['id'] for result in forward] == ['1']
+    assert forward == backward
+    # 文档频率按全部分区统计：芯片 7 篇、光伏 2 篇，共 8 篇
+    idf = {df: math.log(1 + (8 - df + 0.5) / (df + 0.5)) for df in (7, 2)}
+    segment = index.segment('2026-08-20')
+    average_length = (segment.total_length + index.segment('2026-08-21').total_length) / 8
+    expected = sum(SearchIndex._term_score(idf[df], TITLE_WEIGHT, segment, 0, average_length) for df in (7, 2))
+    assert forward[0]['score'] == round(expected, 3)
+    index.close()
@@ -0,0 +1,117 @@
+"""
+标签索引缓存（user-022）：没有缓存时构建并写入、命中时不重新构建、tags.json 变了或缓存损坏时重建
+"""
+
+import pytest
+
+from storage import json_codec
+from tags.tag_manager import CACHE_MAGIC, TagManager
+
+TAGS = {
+    'version': '1',
+    'industries': {'level1': [{'name': '制造业', 'level2': [{'name': '电子', 'level3': [
+        {'id': 'I1', 'name': '半导体', 'keywords': ['半导体', '芯片']}]}]}]},
+    'concepts': [{'id': 'C1', 'name': '机器人', 'keywords': ['机器人']}],
+}
+
+
+@pytest.fixture
+def tags_path(tmp_path):
+    path = tmp_path / "tags.json"
+    json_codec.dump_file(path, TAGS)
+    return path
+
+
+def built(monkeypatch):
+    """记录 build_indexes 的调用次数"""
+    calls = []
+    original = TagManager.build_indexes
+
+    def build_indexes(self):
+        calls.append(1)
+        original(self)
+
+    monkeypatch.setattr(TagManager, 'build_indexes', build_indexes)
+    return calls
+
+
+def test_miss_builds_and_writes_cache(tags_path, monkeypatch):
+    calls = built(monkeypatch)
+
+    manager = TagManager(str(tags_path))
+
+    assert calls == [1]
+    assert manager.cache_path == tags_path.with_suffix('.cache')
+    data = manager.cache_path.read_bytes()
+    assert data.startswith(CACHE_MAGIC + manager.source_digest())
+    assert list(tags_path.parent.glob('*.tmp')) == []
+
+
+def test_hit_skips_build_and_matches_the_same(tags_path, monkeypatch):
+    fresh = TagManager(str(tags_path))
+    calls = built(monkeypatch)
+
+    cached = TagManager(str(tags_path))
+
+    assert calls == []
+    assert cached.version == '1'
+    assert cached.match_news('芯片和机器人') == fresh.match_news('芯片和机器人')
+    assert cached.tag_dictionary() == fresh.tag_dictionary()
+
+
+def test_stale_cache_is_rebuilt(tags_path, monkeypatch):
+    TagManager(str(tags_path))
+    json_codec.dump_file(tags_path, {**TAGS, 'version': '2',
+                                     'concepts': [{'id': 'C2', 'name': '光伏', 'keywords': ['光伏']}]})
+    calls = built(monkeypatch)
+
+    manager = TagManager(str(tags_path))
+
+    assert calls == [1]
+    assert manager.version == '2'
+    assert manager.match_news('光伏装机')['concept_ids'] == ['C2']
+    assert manager.match_news('机器人')['concept_ids'] == []
+    # 缓存已换成新版本
+    assert manager.cache_path.read_bytes().startswith(CACHE_MAGIC + manager.source_digest())
+
+
+def test_corrupt_cache_is_rebuilt(tags_path, monkeypatch, capsys):
+    manager = TagManager(str(tags_path))
+    header = CACHE_MAGIC + manager.source_digest()
+    manager.cache_path.write_bytes(header + b'not a pickle')
+    calls = built(monkeypatch)
+
+    rebuilt = TagManager(str(tags_path))
+
+    assert calls == [1]
+    assert '缓存读取失败' in capsys.readouterr().out
+    assert rebuilt.match_news('芯片')['industry_ids'] == ['I1']
+    assert rebuilt.cache_path.read_bytes() != header + b'not a pickle'
+
+
+def test_truncated_or_foreign_cache_is_ignored(tags_path, monkeypatch):
+    manager = TagManager(str(tags_path))
+    manager.cache_path.write_bytes(b'TAGIDX00' + manager.source_digest() + b'payload')
+    calls = built(monkeypatch)
+
+    TagManager(str(tags_path))
+
+    assert calls == [1]
+
+
+def test_use_cache_false_neither_reads_nor_writes(tags_path, monkeypatch):
+    calls = built(monkeypatch)
+
+    TagManager(str(tags_path), use_cache=False)
+
+    assert calls == [1]
+    assert not tags_path.with_suffix('.cache').exists()
+
+
+def test_broken_tags_file_is_not_cached(tags_path):
+    tags_path.write_text('{broken')
+
+    manager = TagManager(str(tags_path))
+
+    assert manager.match_news('芯片')['industry_ids'] == []
+    assert not manager.cache_path.exists()
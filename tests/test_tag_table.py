@@ -0,0 +1,137 @@
+"""
+归一化标签（user-024）：compact_tags / expand_tags 往返不变；不标准或与字典冲突的 tags 返回 None，
+这时整条新闻保持展开格式（文件里和 TagManager.add_to_news(normalized=True) 都是）
+"""
+
+import copy
+import io
+import random
+
+import pytest
+
+from storage import json_codec
+from storage.tag_table import (compact_tags, expand_news, expand_tags, normalize_news, tag_text,
+                               write_normalized)
+from tags.tag_manager import TagManager
+
+WORDS = ['半导体', '芯片', '机器人', '光伏', '汽车', '银行', '公司', '，']
+
+
+def industry(tag_id, name, keyword, level1='制造业', level2='电子'):
+    return {'id': tag_id, 'name': name, 'level1': level1, 'level2': level2, 'matched_keyword': keyword}
+
+
+def concept(tag_id, name, keyword):
+    return {'id': tag_id, 'name': name, 'matched_keyword': keyword}
+
+
+def tags_of(industries, concepts, version='1'):
+    return {'industries': industries, 'concepts': concepts,
+            'industry_ids': [entry['id'] for entry in industries],
+            'concept_ids': [entry['id'] for entry in concepts], 'version': version}
+
+
+def write_tags(path, shared_id=False):
+    json_codec.dump_file(path, {
+        'version': '1',
+        'industries': {'level1': [{'name': '制造业', 'level2': [{'name': '电子', 'level3': [
+            {'id': 'I1', 'name': '半导体', 'keywords': ['半导体', '芯片']},
+            {'id': 'I2', 'name': '汽车整车', 'keywords': ['汽车']}]}]}]},
+        'concepts': [{'id': 'I1' if shared_id else 'C1', 'name': '芯片概念', 'keywords': ['芯片']},
+                     {'id': 'C2', 'name': '机器人', 'keywords': ['机器人']},
+                     {'id': 'C3', 'name': '光伏', 'keywords': ['光伏', '太阳能']}],
+    })
+    return path
+
+
+def test_round_trip_of_tag_manager_output(tmp_path):
+    manager = TagManager(str(write_tags(tmp_path / "tags.json")))
+    rng = random.Random(24)
+    dictionary = {}
+    for _ in range(200):
+        item = {'title': ''.join(rng.choice(WORDS) for _ in range(rng.randint(0, 5))),
+                'summary': ''.join(rng.choice(WORDS) for _ in range(rng.randint(0, 3)))}
+        manager.add_to_news(item)
+        compact = compact_tags(item['tags'], tag_text(item), dictionary)
+
+        assert compact is not None
+        assert set(compact) == {'industry_ids', 'concept_ids', 'offsets', 'version'}
+        assert expand_tags(compact, tag_text(item), dictionary) == item['tags']
+    assert set(dictionary) <= set(manager.tag_dictionary())
+
+
+def test_keyword_not_in_text_is_stored_verbatim():
+    tags = tags_of([industry('I1', '半导体', '半导体')], [concept('C1', '芯片', '芯片')])
+    dictionary = {}
+
+    compact = compact_tags(tags, '芯片龙头 ', dictionary)
+
+    assert compact['offsets'] == ['半导体', [0, 2]]
+    assert dictionary == {'I1': {'name': '半导体', 'level1': '制造业', 'level2': '电子'}, 'C1': {'name': '芯片'}}
+    assert expand_tags(compact, '芯片龙头 ', dictionary) == tags
+
+
+def test_expanded_tags_pass_through_expand():
+    tags = tags_of([], [concept('C1', '芯片', '芯片')])
+    assert expand_tags(tags, '芯片', {}) is tags
+
+
+@pytest.mark.parametrize('broken', [
+    {'industries': [], 'concepts': [], 'industry_ids': [], 'concept_ids': [], 'extra': 1},
+    {'industries': [], 'concepts': [concept('C1', '芯片', '芯片')], 'industry_ids': [], 'concept_ids': []},
+    {'industries': None, 'concepts': [], 'industry_ids': [], 'concept_ids': []},
+    tags_of([], [{'id': 'C1', 'name': '芯片'}]),
+    {'industries': [], 'concepts': [{'name': '芯片', 'matched_keyword': '芯片'}], 'industry_ids': [],
+     'concept_ids': [None]},
+])
+def test_malformed_tags_are_not_compacted(broken):
+    dictionary = {}
+    assert compact_tags(broken, '芯片', dictionary) is None
+    assert dictionary == {}
+
+
+def test_conflicting_metadata_is_not_compacted():
+    # 行业和概念用了同一个 ID
+    shared = tags_of([industry('X1', '半导体', '芯片')], [concept('X1', '芯片', '芯片')])
+    assert compact_tags(shared, '芯片', {}) is None
+
+    # 与字典里已有的元数据冲突（另一个版本的标签库打的）时不动字典
+    dictionary = {'C1': {'name': '旧名字'}}
+    assert compact_tags(tags_of([], [concept('C1', '新名字', '芯片')]), '芯片', dictionary) is None
+    assert dictionary == {'C1': {'name': '旧名字'}}
+
+
+def test_conflicting_item_stays_expanded_in_file():
+    old = {'title': '芯片', 'tags': tags_of([], [concept('C1', '旧名字', '芯片')], '1')}
+    new = {'title': '芯片订单', 'tags': tags_of([], [concept('C1', '新名字', '芯片')], '2')}
+    news = [copy.deepcopy(old), copy.deepcopy(new)]
+
+    data = normalize_news(news)
+    assert 'offsets' in data['news'][0]['tags']
+    assert data['news'][1]['tags'] == new['tags']
+    # 归一化不修改传入的新闻
+    assert news == [old, new]
+
+    buffer = io.BytesIO()
+    assert write_normalized(buffer, news)[0] == 2
+    assert expand_news(json_codec.loads(buffer.getvalue())) == [old, new]
+    assert expand_news(data) == [old, new]
+
+
+def test_unknown_file_format_is_rejected():
+    with pytest.raises(ValueError):
+        expand_news({'format': 'something-else', 'news': []})
+    assert expand_news([{'title': 'a'}]) == [{'title': 'a'}]
+
+
+def test_add_to_news_keeps_expanded_tags_when_compaction_fails(tmp_path):
+    manager = TagManager(str(write_tags(tmp_path / "tags.json", shared_id=True)), use_cache=False)
+
+    item = manager.add_to_news({'title': '芯片订单'}, normalized=True)
+
+    assert item['tags'] is not None
+    assert item['tags']['industry_ids'] == ['I1'] and item['tags']['concept_ids'] == ['I1']
+    assert 'industries' in item['tags']
+
+    normal = manager.add_to_news({'title': '机器人订单'}, normalized=True)
+    assert normal['tags'] == {'industry_ids': [], 'concept_ids': ['C2'], 'offsets': [[0, 3]], 'version': '1'}